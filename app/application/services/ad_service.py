@@ -1,15 +1,24 @@
 """Ad Service - Application layer business logic"""
-from typing import List, Optional
-from app.domain.entities.ad import Ad, AdStatus
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from app.domain.entities.ad import Ad, AdStatus, StatusChangeOutcome, StatusChangeResult, VALID_TRANSITIONS
 from app.domain.repositories.ad_repository import IAdRepository
-from app.core.exceptions import NotFoundException, ForbiddenException, BusinessRuleException
+from app.domain.repositories.category_repository import ICategoryRepository
+from app.core.exceptions import NotFoundException, ForbiddenException, BusinessRuleException, ConflictException
 
 
 class AdService:
     """Service layer for Ad business logic - Single Responsibility Principle"""
     
-    def __init__(self, ad_repository: IAdRepository):
+    def __init__(self, ad_repository: IAdRepository, category_repository: ICategoryRepository):
         self._ad_repository = ad_repository
+        self._category_repository = category_repository
+    
+    @staticmethod
+    def _ensure_not_archived(ad: Ad) -> None:
+        """Archived ads are read-only (they can only be deleted)"""
+        if ad.archived:
+            raise ConflictException(f"Ad with ID {ad.id} is archived and cannot be changed")
     
     async def get_ad(self, ad_id: int) -> Ad:
         """Get ad by ID"""
@@ -41,17 +50,25 @@ class AdService:
             status=status
         )
     
-    async def list_user_ads(self, user_id: int) -> List[Ad]:
-        """List all ads from a user"""
-        return await self._ad_repository.get_by_user(user_id)
+    async def list_user_ads(
+        self,
+        user_id: int,
+        status: Optional[AdStatus] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Ad], Optional[str]]:
+        """List a page of a user's ads, returning the next page cursor"""
+        return await self._ad_repository.get_by_user(
+            user_id, status=status, limit=limit, cursor=cursor
+        )
     
-    async def create_ad(self, ad: Ad, category_exists: bool) -> Ad:
+    async def create_ad(self, ad: Ad) -> Ad:
         """Create new ad with validation
         
         If status is 'published', seller and location are required.
         For drafts, these fields are optional.
         """
-        if not category_exists:
+        if not await self._category_repository.exists(ad.category_id):
             raise NotFoundException(f"Category with ID {ad.category_id} not found")
         
         # Validate required fields for published ads
@@ -67,8 +84,7 @@ class AdService:
         self,
         ad_id: int,
         updates: dict,
-        current_user_id: int,
-        category_exists: bool = True
+        current_user_id: int
     ) -> Ad:
         """Update ad with ownership and validation checks"""
         # Get existing ad
@@ -77,9 +93,10 @@ class AdService:
         # Check ownership
         if not ad.is_owned_by(current_user_id):
             raise ForbiddenException("You don't have permission to edit this ad")
+        self._ensure_not_archived(ad)
         
         # Validate category if being updated
-        if "category_id" in updates and not category_exists:
+        if updates.get("category_id") and not await self._category_repository.exists(updates["category_id"]):
             raise NotFoundException(f"Category with ID {updates['category_id']} not found")
         
         # Apply updates
@@ -114,6 +131,7 @@ class AdService:
         # Check ownership
         if not ad.is_owned_by(current_user_id):
             raise ForbiddenException("You don't have permission to change this ad's status")
+        self._ensure_not_archived(ad)
         
         # Validate transition
         try:
@@ -130,3 +148,42 @@ class AdService:
             ad.published_at = datetime.utcnow()  # Marca nova data de publicação
         
         return await self._ad_repository.update(ad)
+    
+    async def bulk_change_ad_status(
+        self,
+        ad_ids: List[int],
+        new_status: AdStatus,
+        current_user_id: int
+    ) -> List[StatusChangeResult]:
+        """Change the status of many ads at once, reporting the outcome per id
+        
+        Ownership and transitions follow the same rules as change_ad_status;
+        ads that fail a check are reported and do not block the others.
+        """
+        ad_ids = list(dict.fromkeys(ad_ids))  # Drop duplicates, keep the order
+        current = await self._ad_repository.get_owners_and_statuses(ad_ids)
+        
+        results: Dict[int, StatusChangeResult] = {}
+        to_update: Dict[AdStatus, List[int]] = defaultdict(list)
+        for ad_id in ad_ids:
+            if ad_id not in current:
+                results[ad_id] = StatusChangeResult(ad_id, StatusChangeOutcome.NOT_FOUND)
+                continue
+            owner_id, status = current[ad_id]
+            if owner_id != current_user_id:
+                results[ad_id] = StatusChangeResult(ad_id, StatusChangeOutcome.FORBIDDEN)
+            elif new_status not in VALID_TRANSITIONS.get(status, []):
+                results[ad_id] = StatusChangeResult(ad_id, StatusChangeOutcome.INVALID_TRANSITION, status)
+            else:
+                to_update[status].append(ad_id)
+        
+        updated = set(await self._ad_repository.bulk_change_status(to_update, current_user_id, new_status))
+        for status, group in to_update.items():
+            for ad_id in group:
+                # Not updated: the ad changed between the read and the update
+                results[ad_id] = (
+                    StatusChangeResult(ad_id, StatusChangeOutcome.UPDATED, new_status)
+                    if ad_id in updated
+                    else StatusChangeResult(ad_id, StatusChangeOutcome.INVALID_TRANSITION, status)
+                )
+        return [results[ad_id] for ad_id in ad_ids]
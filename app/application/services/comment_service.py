@@ -1,5 +1,5 @@
 """Comment Service - Comment business logic"""
-from typing import List
+from typing import List, Optional, Tuple
 from app.domain.entities.comment import Comment
 from app.domain.repositories.comment_repository import ICommentRepository
 from app.domain.repositories.ad_repository import IAdRepository
@@ -24,13 +24,18 @@ class CommentService:
             raise NotFoundException(f"Comment with ID {comment_id} not found")
         return comment
     
-    async def list_ad_comments(self, ad_id: int) -> List[Comment]:
-        """List all comments for an ad"""
+    async def list_ad_comments(
+        self,
+        ad_id: int,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Comment], Optional[str]]:
+        """List a page of comments for an ad, returning the next page cursor"""
         # Verify ad exists
         if not await self._ad_repository.exists(ad_id):
             raise NotFoundException(f"Ad with ID {ad_id} not found")
         
-        return await self._comment_repository.get_by_ad(ad_id)
+        return await self._comment_repository.get_by_ad(ad_id, limit=limit, cursor=cursor)
     
     async def create_comment(self, comment: Comment) -> Comment:
         """Create new comment"""
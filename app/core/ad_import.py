@@ -0,0 +1,253 @@
+"""Importação em massa de anúncios (NDJSON ou CSV)
+
+Em vez de um `POST /api/ads` por anúncio (consulta da categoria, commit e
+refresh a cada um), o arquivo inteiro é validado com `AdCreate`, as
+categorias saem do registro em memória e as linhas válidas são gravadas com
+um INSERT `executemany` por lote, uma transação por lote. Cada linha recebe
+seu resultado (id criado ou erros), então uma linha ruim não derruba as demais.
+
+Formatos:
+- NDJSON: um objeto JSON por linha, com os campos de `AdCreate`;
+- CSV: cabeçalho com os mesmos nomes; `rules`, `amenities` e `images`
+  aceitam lista JSON ou valores separados por `|`; células vazias = nulo.
+Em ambos, `category_slug` pode substituir `category_id`.
+
+O corpo é lido com limite de tamanho (`read_body`): um arquivo acima do limite
+é recusado sem ser carregado inteiro na memória, e a leitura das linhas para
+assim que passa do máximo.
+"""
+import csv
+import io
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.category_registry import category_registry
+from app.db import models
+from app.db.counters import PUBLISHED, adjust_category_counts
+from app.schemas import ad as schemas
+
+LIST_FIELDS = ("rules", "amenities", "images")
+FORMATS = ("ndjson", "csv")
+
+
+class ImportFormatError(ValueError):
+    """Arquivo ilegível como um todo (formato desconhecido, excesso de linhas...)"""
+    pass
+
+
+class ImportTooLargeError(ImportFormatError):
+    """Corpo maior que o limite de bytes da importação"""
+    pass
+
+
+@dataclass
+class ParsedRow:
+    """Linha lida do arquivo, antes da validação"""
+    number: int
+    data: Optional[Dict[str, Any]] = None
+    errors: List[str] = field(default_factory=list)
+
+
+def detect_format(content_type: Optional[str], requested: Optional[str] = None) -> str:
+    """Formato pelo parâmetro explícito ou pelo Content-Type (NDJSON por padrão)"""
+    if requested:
+        if requested not in FORMATS:
+            raise ImportFormatError(f"Formato inválido: {requested} (use ndjson ou csv)")
+        return requested
+    return "csv" if content_type and "csv" in content_type else "ndjson"
+
+
+def _parse_ndjson(text: str) -> Iterator[ParsedRow]:
+    number = 0
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield ParsedRow(number, errors=[f"JSON inválido: {e.msg}"])
+            continue
+        if not isinstance(data, dict):
+            yield ParsedRow(number, errors=["Cada linha deve ser um objeto JSON"])
+            continue
+        yield ParsedRow(number, data)
+
+
+def _csv_list(value: str) -> List[str]:
+    if value.startswith("["):
+        return json.loads(value)
+    return [item.strip() for item in value.split("|") if item.strip()]
+
+
+def _parse_csv(text: str) -> Iterator[ParsedRow]:
+    reader = csv.DictReader(io.StringIO(text))
+    for number, record in enumerate(reader, start=1):
+        data: Dict[str, Any] = {}
+        try:
+            for key, value in record.items():
+                if key is None:
+                    raise ValueError("Mais colunas que o cabeçalho")
+                value = (value or "").strip()
+                if not value:
+                    continue
+                data[key.strip()] = _csv_list(value) if key.strip() in LIST_FIELDS else value
+        except (ValueError, json.JSONDecodeError) as e:
+            yield ParsedRow(number, errors=[str(e)])
+            continue
+        yield ParsedRow(number, data)
+
+
+async def read_body(
+    chunks: AsyncIterator[bytes], max_bytes: int, content_length: Optional[str] = None
+) -> bytes:
+    """Junta o corpo recebido; ImportTooLargeError assim que passar de `max_bytes`
+
+    Um Content-Length declarado acima do limite é recusado antes de ler qualquer byte.
+    """
+    too_large = ImportTooLargeError(f"Máximo de {max_bytes} bytes por importação")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise too_large
+    body = bytearray()
+    async for chunk in chunks:
+        body += chunk
+        if len(body) > max_bytes:
+            raise too_large
+    return bytes(body)
+
+
+def parse_rows(body: bytes, fmt: str, max_rows: int) -> List[ParsedRow]:
+    """Lê o arquivo em linhas; ImportFormatError se exceder `max_rows`
+
+    A leitura para na primeira linha além do máximo.
+    """
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ImportFormatError("O arquivo deve estar em UTF-8")
+    parsed = _parse_csv(text) if fmt == "csv" else _parse_ndjson(text)
+    rows = list(islice(parsed, max_rows + 1))
+    if len(rows) > max_rows:
+        raise ImportFormatError(f"Máximo de {max_rows} linhas por importação")
+    return rows
+
+
+def _format_errors(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in item['loc']) or 'linha'}: {item['msg']}"
+        for item in error.errors()
+    ]
+
+
+def validate_row(db: Session, row: ParsedRow) -> Tuple[Optional[schemas.AdCreate], List[str]]:
+    """Valida com AdCreate e as mesmas regras do `POST /api/ads`"""
+    if row.errors:
+        return None, row.errors
+    data = dict(row.data)
+    slug = data.pop("category_slug", None)
+    if slug and data.get("category_id") is None:
+        category = category_registry.get_by_slug(db, slug)
+        if category is None:
+            return None, [f"category_slug: categoria '{slug}' não encontrada"]
+        data["category_id"] = category.id
+
+    try:
+        ad = schemas.AdCreate.model_validate(data)
+    except ValidationError as e:
+        return None, _format_errors(e)
+
+    errors = []
+    if ad.status == schemas.AdStatus.PUBLISHED:
+        if not ad.seller:
+            errors.append("seller: obrigatório para anúncios publicados")
+        if not ad.location:
+            errors.append("location: obrigatório para anúncios publicados")
+    if not category_registry.exists(db, ad.category_id):
+        errors.append(f"category_id: categoria {ad.category_id} não encontrada")
+    return (None, errors) if errors else (ad, [])
+
+
+def _to_row(ad: schemas.AdCreate, user_id: int) -> Dict[str, Any]:
+    """Valores da tabela, com as listas em JSON como no `POST /api/ads`"""
+    values = ad.model_dump()
+    for name in LIST_FIELDS:
+        values[name] = json.dumps(values[name]) if values[name] else None
+    values["status"] = ad.status.value
+    values["user_id"] = user_id
+    return values
+
+
+def import_ads(
+    db: Session,
+    user_id: int,
+    rows: List[ParsedRow],
+    batch_size: int,
+    dry_run: bool = False
+) -> schemas.AdImportReport:
+    """Valida todas as linhas e grava as válidas em lotes (uma transação por lote)"""
+    results: Dict[int, schemas.AdImportRowResult] = {}
+    valid: List[Tuple[int, schemas.AdCreate]] = []
+    for row in rows:
+        ad, errors = validate_row(db, row)
+        if errors:
+            results[row.number] = schemas.AdImportRowResult(row=row.number, status="error", errors=errors)
+        else:
+            valid.append((row.number, ad))
+
+    for start in range(0, len(valid), batch_size):
+        batch = valid[start:start + batch_size]
+        if dry_run:
+            for number, _ in batch:
+                results[number] = schemas.AdImportRowResult(row=number, status="valid")
+            continue
+        _insert_batch(db, user_id, batch, results)
+
+    ordered = [results[row.number] for row in rows]
+    created = sum(1 for result in ordered if result.status == "created")
+    return schemas.AdImportReport(
+        total=len(ordered),
+        created=created,
+        failed=sum(1 for result in ordered if result.status == "error"),
+        dry_run=dry_run,
+        results=ordered,
+    )
+
+
+def _insert_batch(
+    db: Session,
+    user_id: int,
+    batch: List[Tuple[int, schemas.AdCreate]],
+    results: Dict[int, schemas.AdImportRowResult]
+) -> None:
+    published: Dict[int, int] = defaultdict(int)
+    for _, ad in batch:
+        if ad.status.value == PUBLISHED:
+            published[ad.category_id] += 1
+    try:
+        # INSERT Core (o bulk do ORM separa as linhas pelos campos nulos), que o
+        # SQLAlchemy envia como INSERT ... VALUES (...), (...) RETURNING id.
+        # `sort_by_parameter_order` faria um INSERT por linha no SQLite; como os
+        # ids saem crescentes na ordem dos VALUES, basta ordená-los.
+        table = models.Ad.__table__
+        ids = sorted(db.scalars(
+            insert(table).returning(table.c.id),
+            [_to_row(ad, user_id) for _, ad in batch],
+        ).all())
+        adjust_category_counts(db, published)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        for number, _ in batch:
+            results[number] = schemas.AdImportRowResult(
+                row=number, status="error", errors=[f"Falha ao gravar o lote: {e.__class__.__name__}"]
+            )
+        return
+    for (number, _), ad_id in zip(batch, ids):
+        results[number] = schemas.AdImportRowResult(row=number, status="created", id=ad_id)
@@ -0,0 +1,91 @@
+"""Leitura de anúncios ativos com fallback para o arquivo (`ads_archive`)
+
+Anúncios concluídos/cancelados antigos saem de `ads` para `ads_archive`
+(app.jobs.ad_archive), mantendo o id. Os endpoints de leitura por id e
+"meus anúncios" continuam enxergando ambos, sem o cliente saber onde estão.
+Arquivados são somente leitura: o dono pode apagá-los, mas editar ou mudar o
+status responde 409 (`ARCHIVED_READ_ONLY`).
+"""
+from datetime import datetime
+from typing import List, Optional, Tuple, Union
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.core.pagination import encode_cursor, keyset_page
+from app.db import models
+from app.db.counters import release_ad_ratings
+
+# Estados finais: os únicos que vão para o arquivo
+TERMINAL_STATUSES = ("completed", "cancelled")
+
+AnyAd = Union[models.Ad, models.ArchivedAd]
+
+ARCHIVED_READ_ONLY = "Anúncio arquivado não pode ser alterado, apenas apagado"
+
+
+def get_ad_or_archived(db: Session, ad_id: int) -> Optional[AnyAd]:
+    """Anúncio ativo pelo id ou, se não existir, o arquivado"""
+    ad = db.query(models.Ad).filter(models.Ad.id == ad_id).first()
+    if ad is None:
+        ad = db.query(models.ArchivedAd).filter(models.ArchivedAd.id == ad_id).first()
+    return ad
+
+
+def ad_exists(db: Session, ad_id: int) -> bool:
+    """Se o id existe entre os anúncios ativos ou arquivados"""
+    return any(
+        db.query(model.id).filter(model.id == ad_id).first() is not None
+        for model in (models.Ad, models.ArchivedAd)
+    )
+
+
+def delete_archived_ad(db: Session, ad: models.ArchivedAd) -> None:
+    """Apaga um anúncio arquivado e seus comentários (sem commit)
+
+    As avaliações saem do histograma do dono, como ao apagar um anúncio ativo;
+    `comments` não tem chave estrangeira para o arquivo, então os comentários
+    são apagados aqui.
+    """
+    release_ad_ratings(db, ad)
+    db.execute(delete(models.Comment).where(models.Comment.ad_id == ad.id))
+    db.delete(ad)
+
+
+def _position(ad: AnyAd) -> Tuple[datetime, int]:
+    return ad.created_at, ad.id
+
+
+def user_ads_page(
+    db: Session,
+    user_id: int,
+    status: Optional[str],
+    limit: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[AnyAd], Optional[str]]:
+    """Página de "meus anúncios" somando `ads` e `ads_archive` (mais recentes primeiro)
+
+    Cada tabela devolve sua própria página a partir do mesmo cursor (pelo
+    índice (user_id, created_at) de cada uma); a junção das duas, cortada em
+    `limit`, é a página pedida. Filtrando por um status não final, o arquivo
+    nem é consultado.
+    """
+    sources = [models.Ad]
+    if status is None or status in TERMINAL_STATUSES:
+        sources.append(models.ArchivedAd)
+
+    rows: List[AnyAd] = []
+    more = False
+    for model in sources:
+        query = db.query(model).filter(model.user_id == user_id)
+        if status:
+            query = query.filter(model.status == status)
+        page, next_cursor = keyset_page(query, model.created_at, model.id, limit, cursor)
+        rows += page
+        more = more or next_cursor is not None
+
+    rows.sort(key=_position, reverse=True)
+    if len(rows) > limit:
+        more = True
+        rows = rows[:limit]
+    return rows, encode_cursor(*_position(rows[-1])) if more and rows else None
@@ -0,0 +1,118 @@
+"""Registro de categorias em memória, compartilhado pelo processo
+
+Categorias são poucas e quase nunca mudam, mas eram consultadas a cada
+criação/edição de anúncio e a cada `GET /api/categories`. O registro carrega
+a tabela inteira uma vez (na inicialização) e passa a responder da memória.
+
+Consistência entre workers: toda escrita em categorias incrementa
+`cache_versions['categories']` na mesma transação. Cada worker confere essa
+versão (uma leitura por chave primária) no máximo a cada
+`CATEGORY_CACHE_CHECK_SECONDS` e recarrega só quando ela mudou; o worker
+que fez a escrita recarrega na hora. Uma categoria não encontrada força a
+conferência, então uma categoria recém-criada em outro worker nunca é
+recusada por cache desatualizado.
+"""
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.schemas.category import CategoryRead
+
+CACHE_NAME = "categories"
+
+
+def read_version(db: Session, name: str = CACHE_NAME) -> int:
+    """Versão atual no banco (0 se ainda não houve escrita)"""
+    version = db.scalar(select(models.CacheVersion.version).where(models.CacheVersion.name == name))
+    return version or 0
+
+
+def bump_version(db: Session, name: str = CACHE_NAME) -> None:
+    """Incrementa a versão na transação corrente (sem commit)"""
+    result = db.execute(
+        update(models.CacheVersion)
+        .where(models.CacheVersion.name == name)
+        .values(version=models.CacheVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        db.execute(insert(models.CacheVersion).values(name=name, version=1))
+
+
+class CategoryRegistry:
+    """Cópia em memória da tabela de categorias (leituras sem consultar o banco)"""
+
+    def __init__(self, check_interval_seconds: float):
+        self._check_interval_seconds = check_interval_seconds
+        self._lock = threading.Lock()
+        self._by_id: Dict[int, CategoryRead] = {}
+        self._by_slug: Dict[str, CategoryRead] = {}
+        self._ordered: List[CategoryRead] = []
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+
+    @property
+    def version(self) -> Optional[int]:
+        """Versão carregada (None antes do primeiro carregamento)"""
+        return self._version
+
+    def load(self, db: Session) -> None:
+        """(Re)carrega todas as categorias e a versão correspondente"""
+        version = read_version(db)
+        categories = db.query(models.Category).order_by(models.Category.id).all()
+        ordered = [CategoryRead.model_validate(category) for category in categories]
+        with self._lock:
+            # Troca as referências de uma vez: leitores nunca veem um estado parcial
+            self._ordered = ordered
+            self._by_id = {category.id: category for category in ordered}
+            self._by_slug = {category.slug: category for category in ordered}
+            self._version = version
+            self._checked_at = time.monotonic()
+
+    def refresh(self, db: Session, force: bool = False) -> None:
+        """Recarrega se a versão no banco mudou (conferida no máximo a cada intervalo)"""
+        now = time.monotonic()
+        if self._version is not None and not force and now - self._checked_at < self._check_interval_seconds:
+            return
+        if self._version is None or read_version(db) != self._version:
+            self.load(db)
+        else:
+            self._checked_at = now
+
+    def all(self, db: Session) -> List[CategoryRead]:
+        """Todas as categorias, por id"""
+        self.refresh(db)
+        return self._ordered
+
+    def get(self, db: Session, category_id: int) -> Optional[CategoryRead]:
+        """Categoria pelo id (None se não existir)"""
+        self.refresh(db)
+        category = self._by_id.get(category_id)
+        if category is None:
+            # Pode ter sido criada agora por outro worker
+            self.refresh(db, force=True)
+            category = self._by_id.get(category_id)
+        return category
+
+    def get_by_slug(self, db: Session, slug: str) -> Optional[CategoryRead]:
+        """Categoria pelo slug (None se não existir)"""
+        self.refresh(db)
+        category = self._by_slug.get(slug)
+        if category is None:
+            self.refresh(db, force=True)
+            category = self._by_slug.get(slug)
+        return category
+
+    def exists(self, db: Session, category_id: int) -> bool:
+        return self.get(db, category_id) is not None
+
+    def changed(self, db: Session) -> None:
+        """Marca a alteração de categorias na transação corrente (chame antes do commit)"""
+        bump_version(db)
+
+
+category_registry = CategoryRegistry(check_interval_seconds=settings.CATEGORY_CACHE_CHECK_SECONDS)
@@ -13,6 +13,75 @@ class Settings(BaseSettings):
     # API
     API_V1_PREFIX: str = "/api"
     PROJECT_NAME: str = "Tem Vaga Aí API"
+    ADS_REFACTORED_ENABLED: bool = True  # Router /ads-refactored; desligado, nem é importado no boot
+    
+    # Uploads
+    STORAGE_BACKEND: str = "local"  # local | s3
+    UPLOAD_DIR: str = "uploads"  # Diretório do armazenamento local
+    UPLOAD_TMP_DIR: Optional[str] = None  # Arquivos temporários (padrão: UPLOAD_DIR/.tmp)
+    
+    # Armazenamento S3 compatível (AWS S3, MinIO...)
+    S3_BUCKET: str = ""
+    S3_ENDPOINT_URL: Optional[str] = None  # Ex.: http://localhost:9000 para MinIO
+    S3_REGION: Optional[str] = None
+    S3_ACCESS_KEY_ID: Optional[str] = None
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+    S3_PUBLIC_URL: str = ""  # Base pública dos objetos (CDN); padrão: URL do próprio bucket
+    S3_PRESIGN_EXPIRES_SECONDS: int = 900
+    
+    # Imagens
+    IMAGE_DERIVATIVE_WORKERS: int = 2  # Threads que geram miniaturas/versões médias
+    IMAGE_MAX_SIDE: int = 10000  # Maior lado aceito, em pixels
+    IMAGE_MAX_PIXELS: int = 50_000_000  # Largura x altura máxima (barra bombas de descompressão)
+    
+    # Importação em massa de anúncios (POST /api/ads/import)
+    AD_IMPORT_MAX_ROWS: int = 5000  # Linhas por requisição
+    AD_IMPORT_MAX_BYTES: int = 10 * 1024 * 1024  # Tamanho máximo do corpo (recusado antes de ser lido inteiro)
+    AD_IMPORT_BATCH_SIZE: int = 500  # Linhas por INSERT (executemany) e por transação
+    
+    # Métricas por rota no formato do Prometheus (cada worker expõe as suas)
+    METRICS_ENABLED: bool = True
+    METRICS_PATH: str = "/metrics"
+    
+    # Registro de categorias em memória: intervalo máximo para notar alterações feitas por outro worker
+    CATEGORY_CACHE_CHECK_SECONDS: float = 5.0
+    
+    # Jobs em segundo plano (desative em todos os workers menos um, se rodar vários)
+    BACKGROUND_JOBS_ENABLED: bool = True
+    
+    # Coleta de uploads órfãos
+    UPLOAD_GC_ENABLED: bool = True
+    UPLOAD_GC_INTERVAL_SECONDS: int = 3600
+    UPLOAD_GC_GRACE_HOURS: float = 24  # Não apaga órfãos mais novos que isso
+    UPLOAD_GC_BATCH_SIZE: int = 100  # Arquivos apagados por lote
+    UPLOAD_GC_PAUSE_SECONDS: float = 1.0  # Pausa entre lotes (limita a taxa de I/O)
+    UPLOAD_GC_SCAN_LIMIT: int = 5000  # Arquivos examinados por execução
+    
+    # Reconciliação dos contadores desnormalizados dos anúncios
+    COUNTER_RECONCILE_ENABLED: bool = True
+    COUNTER_RECONCILE_INTERVAL_SECONDS: int = 6 * 3600
+    COUNTER_RECONCILE_BATCH_SIZE: int = 500  # Anúncios conferidos por transação
+    COUNTER_RECONCILE_PAUSE_SECONDS: float = 0.1  # Pausa entre lotes
+    
+    # Exclusão de contas (a conta é desativada na hora; os dados saem aos poucos)
+    ACCOUNT_PURGE_ENABLED: bool = True
+    ACCOUNT_PURGE_INTERVAL_SECONDS: int = 300  # Também é acionado a cada pedido de exclusão
+    ACCOUNT_PURGE_BATCH_SIZE: int = 200  # Linhas apagadas por transação
+    ACCOUNT_PURGE_PAUSE_SECONDS: float = 0.05  # Pausa entre lotes (libera o lock de escrita)
+    
+    # Expiração de anúncios publicados há muito tempo (passam para cancelled)
+    AD_EXPIRY_ENABLED: bool = True
+    AD_EXPIRY_INTERVAL_SECONDS: int = 3600
+    AD_EXPIRY_MAX_AGE_DAYS: float = 90  # Idade desde a última publicação
+    AD_EXPIRY_BATCH_SIZE: int = 200  # Anúncios expirados por transação
+    AD_EXPIRY_PAUSE_SECONDS: float = 0.05  # Pausa entre lotes
+    
+    # Arquivamento de anúncios concluídos/cancelados (ads -> ads_archive)
+    AD_ARCHIVE_ENABLED: bool = True
+    AD_ARCHIVE_INTERVAL_SECONDS: int = 6 * 3600
+    AD_ARCHIVE_MIN_AGE_DAYS: float = 180  # Dias sem alteração antes de arquivar
+    AD_ARCHIVE_BATCH_SIZE: int = 200  # Anúncios movidos por transação
+    AD_ARCHIVE_PAUSE_SECONDS: float = 0.05  # Pausa entre lotes
     
     class Config:
         env_file = ".env"
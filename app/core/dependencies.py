@@ -5,9 +5,11 @@ from app.db.database import get_db
 from app.domain.repositories.ad_repository import IAdRepository
 from app.domain.repositories.user_repository import IUserRepository
 from app.domain.repositories.comment_repository import ICommentRepository
+from app.domain.repositories.category_repository import ICategoryRepository
 from app.infrastructure.repositories.ad_repository import SQLAlchemyAdRepository
 from app.infrastructure.repositories.user_repository import SQLAlchemyUserRepository
 from app.infrastructure.repositories.comment_repository import SQLAlchemyCommentRepository
+from app.infrastructure.repositories.category_repository import RegistryCategoryRepository
 from app.application.services.ad_service import AdService
 from app.application.services.user_service import UserService
 from app.application.services.comment_service import CommentService
@@ -42,11 +44,18 @@ class ServiceContainer:
             self._repositories['comment_repository'] = SQLAlchemyCommentRepository(self._db)
         return self._repositories['comment_repository']
     
+    def get_category_repository(self) -> ICategoryRepository:
+        """Get Category Repository instance (served from the in-memory registry)"""
+        if 'category_repository' not in self._repositories:
+            self._repositories['category_repository'] = RegistryCategoryRepository(self._db)
+        return self._repositories['category_repository']
+    
     def get_ad_service(self) -> AdService:
         """Get Ad Service instance"""
         if 'ad_service' not in self._services:
             self._services['ad_service'] = AdService(
-                ad_repository=self.get_ad_repository()
+                ad_repository=self.get_ad_repository(),
+                category_repository=self.get_category_repository()
             )
         return self._services['ad_service']
     
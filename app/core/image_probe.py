@@ -0,0 +1,203 @@
+"""Inspeção de imagens pelo cabeçalho - formato e dimensões sem decodificar os pixels
+
+Lê só os primeiros KB do arquivo: confere os magic bytes (não confia na extensão
+nem no content-type do cliente) e extrai largura/altura de JPEG, PNG e WebP.
+Isso barra "bombas de descompressão" (arquivos pequenos com dimensões enormes)
+antes de qualquer decodificação e permite guardar as dimensões junto da imagem.
+"""
+import struct
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Optional
+
+from app.core.config import settings
+
+HEADER_CHUNK_SIZE = 4 * 1024
+# APP1/EXIF pode ocupar até 64KB antes do SOF em fotos de celular
+MAX_HEADER_SIZE = 192 * 1024
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# SOF0..SOF15, exceto DHT (C4), JPG (C8) e DAC (CC)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+JPEG_STANDALONE_MARKERS = {0x01, 0xD8} | set(range(0xD0, 0xD8))
+# Orientações EXIF em que a imagem é exibida girada 90°
+EXIF_ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+class InvalidImageError(ValueError):
+    """Arquivo não é uma imagem suportada ou excede os limites"""
+    pass
+
+
+class _NeedMoreData(Exception):
+    """O cabeçalho lido ainda não contém as dimensões"""
+    pass
+
+
+@dataclass(frozen=True)
+class ImageInfo:
+    """Formato e dimensões (já considerando a orientação EXIF) de uma imagem"""
+    format: str
+    width: int
+    height: int
+
+    @property
+    def extension(self) -> str:
+        return FORMAT_EXTENSIONS[self.format]
+
+    @property
+    def content_type(self) -> str:
+        return FORMAT_CONTENT_TYPES[self.format]
+
+
+FORMAT_EXTENSIONS = {"jpeg": ".jpg", "png": ".png", "webp": ".webp"}
+FORMAT_CONTENT_TYPES = {"jpeg": "image/jpeg", "png": "image/png", "webp": "image/webp"}
+
+
+def _need(data: bytes, end: int) -> None:
+    if len(data) < end:
+        raise _NeedMoreData()
+
+
+def _probe_png(data: bytes) -> ImageInfo:
+    _need(data, 24)
+    if data[12:16] != b"IHDR":
+        raise InvalidImageError("PNG inválido")
+    width, height = struct.unpack(">II", data[16:24])
+    return ImageInfo("png", width, height)
+
+
+def _probe_webp(data: bytes) -> ImageInfo:
+    _need(data, 30)
+    chunk = data[12:16]
+    if chunk == b"VP8 ":
+        # Quadro-chave VP8: start code 9d 01 2a seguido de 14 bits de largura/altura
+        if data[23:26] != b"\x9d\x01\x2a":
+            raise InvalidImageError("WebP inválido")
+        width, height = struct.unpack("<HH", data[26:30])
+        return ImageInfo("webp", width & 0x3FFF, height & 0x3FFF)
+    if chunk == b"VP8L":
+        if data[20] != 0x2F:
+            raise InvalidImageError("WebP inválido")
+        bits = int.from_bytes(data[21:25], "little")
+        return ImageInfo("webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+    if chunk == b"VP8X":
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return ImageInfo("webp", width, height)
+    raise InvalidImageError("WebP inválido")
+
+
+def _exif_orientation(segment: bytes) -> Optional[int]:
+    """Orientação da tag 0x0112 no IFD0 de um segmento APP1 'Exif'"""
+    tiff = segment[6:]
+    if len(tiff) < 8:
+        return None
+    order = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if order is None:
+        return None
+    ifd_offset = struct.unpack(order + "I", tiff[4:8])[0]
+    if ifd_offset + 2 > len(tiff):
+        return None
+    count = struct.unpack(order + "H", tiff[ifd_offset:ifd_offset + 2])[0]
+    for i in range(count):
+        entry = ifd_offset + 2 + i * 12
+        if entry + 12 > len(tiff):
+            return None
+        tag, _, _ = struct.unpack(order + "HHI", tiff[entry:entry + 8])
+        if tag == 0x0112:
+            return struct.unpack(order + "H", tiff[entry + 8:entry + 10])[0]
+    return None
+
+
+def _probe_jpeg(data: bytes) -> ImageInfo:
+    orientation = None
+    pos = 2
+    while True:
+        _need(data, pos + 2)
+        if data[pos] != 0xFF:
+            raise InvalidImageError("JPEG inválido")
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            pos += 1  # Byte de preenchimento
+            continue
+        if marker in JPEG_STANDALONE_MARKERS:
+            pos += 2
+            continue
+        if marker in (0xD9, 0xDA):
+            # Fim da imagem ou início dos dados comprimidos sem ter visto o SOF
+            raise InvalidImageError("JPEG sem dimensões")
+        _need(data, pos + 4)
+        length = struct.unpack(">H", data[pos + 2:pos + 4])[0]
+        if length < 2:
+            raise InvalidImageError("JPEG inválido")
+        segment_end = pos + 2 + length
+        if marker in JPEG_SOF_MARKERS:
+            _need(data, pos + 9)
+            height, width = struct.unpack(">HH", data[pos + 5:pos + 9])
+            if orientation in EXIF_ROTATED_ORIENTATIONS:
+                width, height = height, width
+            return ImageInfo("jpeg", width, height)
+        if marker == 0xE1 and orientation is None:
+            _need(data, segment_end)
+            segment = data[pos + 4:segment_end]
+            if segment.startswith(b"Exif\x00\x00"):
+                orientation = _exif_orientation(segment)
+        pos = segment_end
+
+
+def _probe(data: bytes) -> ImageInfo:
+    if data.startswith(b"\xff\xd8\xff"):
+        return _probe_jpeg(data)
+    if data.startswith(PNG_SIGNATURE):
+        return _probe_png(data)
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return _probe_webp(data)
+    if len(data) < 12:
+        raise _NeedMoreData()
+    raise InvalidImageError("Formato de imagem não suportado")
+
+
+def check_limits(info: ImageInfo) -> None:
+    """Rejeita dimensões nulas ou acima dos limites configurados"""
+    if info.width <= 0 or info.height <= 0:
+        raise InvalidImageError("Imagem sem dimensões válidas")
+    if max(info.width, info.height) > settings.IMAGE_MAX_SIDE:
+        raise InvalidImageError(
+            f"Imagem muito grande: {info.width}x{info.height} (lado máximo: {settings.IMAGE_MAX_SIDE}px)"
+        )
+    if info.width * info.height > settings.IMAGE_MAX_PIXELS:
+        raise InvalidImageError(
+            f"Imagem muito grande: {info.width}x{info.height} (máximo: {settings.IMAGE_MAX_PIXELS} pixels)"
+        )
+
+
+def probe_image(read: Callable[[int], bytes]) -> ImageInfo:
+    """Identifica formato e dimensões lendo o mínimo possível do início do arquivo.
+
+    `read(n)` devolve os primeiros `n` bytes. Começa com 4KB e só lê mais
+    (até MAX_HEADER_SIZE) quando metadados grandes vêm antes das dimensões.
+    """
+    size = HEADER_CHUNK_SIZE
+    while True:
+        data = read(size)
+        try:
+            info = _probe(data)
+        except _NeedMoreData:
+            if len(data) < size or size >= MAX_HEADER_SIZE:
+                raise InvalidImageError("Cabeçalho de imagem incompleto")
+            size = min(size * 4, MAX_HEADER_SIZE)
+            continue
+        check_limits(info)
+        return info
+
+
+def probe_stream(stream: BinaryIO) -> ImageInfo:
+    """`probe_image` sobre um arquivo aberto (a posição volta ao início)"""
+    def read(n: int) -> bytes:
+        stream.seek(0)
+        return stream.read(n)
+
+    try:
+        return probe_image(read)
+    finally:
+        stream.seek(0)
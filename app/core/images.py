@@ -0,0 +1,149 @@
+"""Derivados de imagem - miniaturas e versões médias em WebP geradas fora da requisição"""
+import logging
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from app.core.config import settings
+from app.infrastructure.storage import get_storage, temp_dir
+
+logger = logging.getLogger(__name__)
+
+# Tamanhos fixos (caixa máxima, mantendo proporção)
+DERIVATIVE_SIZES: Dict[str, Tuple[int, int]] = {
+    "thumb": (320, 240),
+    "medium": (960, 720),
+}
+WEBP_QUALITY = 80
+# Dimensões gravadas no nome do blob: '<hash>.800x600.jpg'
+DIMENSIONS_RE = re.compile(r"\.(\d+)x(\d+)\.[^./]+$")
+
+
+def derivative_name(filename: str, size: str) -> str:
+    """Nome do derivado: 'abc.jpg' -> 'abc.thumb.webp'"""
+    return f"{Path(filename).stem}.{size}.webp"
+
+
+def derivative_url(url: str, size: str) -> str:
+    """URL (ou chave) do derivado, ao lado do original: '/uploads/abc.jpg' -> '/uploads/abc.thumb.webp'"""
+    head, sep, name = url.rpartition("/")
+    return f"{head}{sep}{derivative_name(name, size)}"
+
+
+def image_dimensions(url: str) -> Optional[Tuple[int, int]]:
+    """(largura, altura) do original, quando gravadas no nome do arquivo"""
+    match = DIMENSIONS_RE.search(url)
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+def image_variants(url: str) -> Dict[str, Union[str, int, None]]:
+    """Retorna original + derivados de uma URL de imagem, e as dimensões do original.
+
+    URLs externas (fora do armazenamento de uploads) não têm derivados e apontam para o original.
+    """
+    variants: Dict[str, Union[str, int, None]] = {"original": url}
+    managed = get_storage().key_from_url(url) is not None
+    for size in DERIVATIVE_SIZES:
+        variants[size] = derivative_url(url, size) if managed else url
+    dimensions = image_dimensions(url) if managed else None
+    variants["width"], variants["height"] = dimensions or (None, None)
+    return variants
+
+
+def missing_derivatives(key: str) -> List[str]:
+    """Tamanhos cujo derivado ainda não existe no armazenamento"""
+    storage = get_storage()
+    return [size for size in DERIVATIVE_SIZES if not storage.exists(derivative_url(key, size))]
+
+
+def generate_derivatives(key: str) -> List[str]:
+    """Gera os derivados WebP de uma imagem armazenada (idempotente)"""
+    # Import tardio: Pillow só é carregado quando há imagem para processar
+    from PIL import Image, ImageOps
+
+    storage = get_storage()
+    pending = {size: DERIVATIVE_SIZES[size] for size in missing_derivatives(key)}
+    if not pending:
+        return []
+
+    created = []
+    with storage.open(key) as source, Image.open(source) as img:
+        # Em JPEG, decodifica já reduzido (DCT scaling) - muito mais barato que decodificar tudo
+        img.draft("RGB", max(DERIVATIVE_SIZES.values()))
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "RGBA"):
+            has_alpha = "A" in img.getbands() or "transparency" in img.info
+            img = img.convert("RGBA" if has_alpha else "RGB")
+
+        for size, box in pending.items():
+            variant = img.copy()
+            variant.thumbnail(box, Image.Resampling.LANCZOS)
+            # Escreve em arquivo temporário e só então publica: nunca servimos um derivado pela metade
+            fd, tmp_name = tempfile.mkstemp(dir=temp_dir(), suffix=".webp")
+            os.close(fd)
+            try:
+                variant.save(tmp_name, format="WEBP", quality=WEBP_QUALITY, method=4)
+                target = derivative_url(key, size)
+                storage.put_file(target, Path(tmp_name), "image/webp")
+            finally:
+                if os.path.exists(tmp_name):
+                    os.unlink(tmp_name)
+            created.append(target)
+    return created
+
+
+def remove_derivatives(key: str) -> None:
+    """Remove os derivados de uma imagem (se existirem)"""
+    storage = get_storage()
+    for size in DERIVATIVE_SIZES:
+        storage.delete(derivative_url(key, size))
+
+
+class ImageDerivativeWorker:
+    """Pool de workers que gera derivados em segundo plano.
+
+    Usa threads: o Pillow libera o GIL durante decode/resize/encode, e threads
+    evitam o custo de serializar imagens entre processos.
+    """
+
+    def __init__(self, max_workers: int):
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix="image-derivatives"
+                )
+            return self._executor
+
+    def submit(self, key: str) -> Future:
+        """Agenda a geração dos derivados da imagem `key`"""
+        future = self._get_executor().submit(generate_derivatives, key)
+        future.add_done_callback(lambda f: self._log_failure(f, key))
+        return future
+
+    @staticmethod
+    def _log_failure(future: Future, key: str) -> None:
+        exc = future.exception()
+        if exc is not None:
+            logger.warning("Falha ao gerar derivados de %s: %s", key, exc)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Finaliza o pool (aguarda tarefas pendentes por padrão)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+derivative_worker = ImageDerivativeWorker(max_workers=settings.IMAGE_DERIVATIVE_WORKERS)
@@ -0,0 +1,229 @@
+"""Métricas por rota no formato de texto do Prometheus (`GET /metrics`)
+
+Um middleware ASGI puro (sem `BaseHTTPMiddleware`, que cria uma tarefa e um
+stream por requisição) conta, para cada método + rota + status:
+- requisições (`http_requests_total`);
+- latência até o último pedaço do corpo (`http_request_duration_seconds`);
+- bytes do corpo da resposta (`http_response_size_bytes`).
+
+A rota é o modelo declarado (`/api/ads/{ad_id}`), não o caminho pedido, para
+que ids não criem uma série nova a cada anúncio; caminhos sem rota entram
+todos em `<unmatched>` e métodos fora dos padrões HTTP em `OTHER`. O custo
+por requisição é uma busca em dicionário e duas buscas binárias nos limites
+dos histogramas; o texto só é montado quando `/metrics` é lido, junto com o
+estado do pool de conexões do banco.
+
+Os contadores ficam na memória de cada worker (não há lock: só o loop de
+eventos do worker os altera) e recomeçam do zero a cada reinício.
+"""
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Limites dos histogramas (o último balde, +Inf, é implícito)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+UNMATCHED_ROUTE = "<unmatched>"
+# Qualquer outro método (inclusive inventado pelo cliente) vira OTHER: o
+# rótulo não pode crescer sem limite
+KNOWN_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+OTHER_METHOD = "OTHER"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+SeriesKey = Tuple[str, str, str]  # (método, rota, status)
+
+
+class _Series:
+    """Contadores de uma combinação método/rota/status"""
+    __slots__ = ("count", "duration_sum", "duration_buckets", "size_sum", "size_buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.duration_sum = 0.0
+        self.duration_buckets = [0] * (len(DURATION_BUCKETS) + 1)
+        self.size_sum = 0
+        self.size_buckets = [0] * (len(SIZE_BUCKETS) + 1)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _histogram(
+    lines: List[str], name: str, labels: str, bounds: Sequence[float], buckets: List[int], total: float, count: int
+) -> None:
+    cumulative = 0
+    for bound, observed in zip(bounds, buckets):
+        cumulative += observed
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+    lines.append(f"{name}_sum{{{labels}}} {_number(total)}")
+    lines.append(f"{name}_count{{{labels}}} {count}")
+
+
+class MetricsRegistry:
+    """Séries de métricas HTTP do processo"""
+
+    def __init__(self):
+        self._series: Dict[SeriesKey, _Series] = {}
+
+    def observe(self, method: str, route: str, status: int, duration: float, size: int) -> None:
+        key = (method, route, str(status))
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series()
+        series.count += 1
+        series.duration_sum += duration
+        series.duration_buckets[bisect_left(DURATION_BUCKETS, duration)] += 1
+        series.size_sum += size
+        series.size_buckets[bisect_left(SIZE_BUCKETS, size)] += 1
+
+    def clear(self) -> None:
+        self._series.clear()
+
+    def render(self, engine: Optional[Engine] = None) -> str:
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)"""
+        series = sorted(self._series.items())
+        labels = {
+            key: f'method="{_escape(key[0])}",route="{_escape(key[1])}",status="{key[2]}"'
+            for key, _ in series
+        }
+        lines = [
+            "# HELP http_requests_total Requisições HTTP atendidas",
+            "# TYPE http_requests_total counter",
+        ]
+        lines += [f"http_requests_total{{{labels[key]}}} {value.count}" for key, value in series]
+
+        lines += [
+            "# HELP http_request_duration_seconds Tempo até o fim da resposta",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for key, value in series:
+            _histogram(
+                lines, "http_request_duration_seconds", labels[key],
+                DURATION_BUCKETS, value.duration_buckets, value.duration_sum, value.count
+            )
+
+        lines += [
+            "# HELP http_response_size_bytes Tamanho do corpo da resposta",
+            "# TYPE http_response_size_bytes histogram",
+        ]
+        for key, value in series:
+            _histogram(
+                lines, "http_response_size_bytes", labels[key],
+                SIZE_BUCKETS, value.size_buckets, value.size_sum, value.count
+            )
+
+        if engine is not None:
+            lines += _pool_gauges(engine)
+        return "\n".join(lines) + "\n"
+
+
+# Medidores do pool de conexões: (métrica, método do pool, descrição)
+POOL_GAUGES = (
+    ("db_pool_size", "size", "Conexões mantidas abertas pelo pool"),
+    ("db_pool_checked_out", "checkedout", "Conexões em uso"),
+    ("db_pool_checked_in", "checkedin", "Conexões livres no pool"),
+    ("db_pool_overflow", "overflow", "Conexões além do tamanho do pool (negativo: vagas ainda não abertas)"),
+)
+
+
+def _pool_gauges(engine: Engine) -> List[str]:
+    """Estado atual do pool (pools sem esses métodos, como o NullPool, são omitidos)"""
+    pool = engine.pool
+    lines = []
+    for name, method, description in POOL_GAUGES:
+        reader = getattr(pool, method, None)
+        if not callable(reader):
+            continue
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} gauge", f"{name} {reader()}"]
+    return lines
+
+
+def route_template(scope: Scope, root_path: str) -> str:
+    """Modelo da rota que atendeu a requisição (preenchido pelo roteamento no próprio scope)"""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    mounted = scope.get("root_path", "")
+    if mounted != root_path:
+        # Aplicação montada (ex.: /uploads): o roteador acrescenta o prefixo ao root_path
+        return f"{mounted[len(root_path):]}/{{path}}"
+    return UNMATCHED_ROUTE
+
+
+registry = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """Registra cada requisição HTTP e serve as métricas em `path`"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        engine: Optional[Engine] = None,
+        path: str = "/metrics",
+        registry: MetricsRegistry = registry
+    ):
+        self.app = app
+        self.engine = engine
+        self.path = path
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if scope["path"] == self.path and scope["method"] in ("GET", "HEAD"):
+            await self._serve(scope, send)
+            return
+
+        started = time.perf_counter()
+        finished: Optional[float] = None
+        status = 500
+        size = 0
+        root_path = scope.get("root_path", "")
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal finished, status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+                if not message.get("more_body", False):
+                    # Tarefas em segundo plano rodam depois disso: não contam na latência
+                    finished = time.perf_counter()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            method = scope["method"]
+            self.registry.observe(
+                method if method in KNOWN_METHODS else OTHER_METHOD,
+                route_template(scope, root_path),
+                status,
+                (finished or time.perf_counter()) - started,
+                size
+            )
+
+    async def _serve(self, scope: Scope, send: Send) -> None:
+        body = self.registry.render(self.engine).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", CONTENT_TYPE.encode()),
+                (b"content-length", str(len(body)).encode()),
+                (b"cache-control", b"no-store"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body if scope["method"] == "GET" else b""})
@@ -0,0 +1,87 @@
+"""Paginação por cursor (keyset) - mais recentes primeiro, desempate por id
+
+Em vez de OFFSET (que relê e descarta todas as linhas anteriores), cada página
+continua a partir do último item da anterior: `WHERE (criado, id) < (cursor)`
+com `ORDER BY criado DESC, id DESC`, o que um índice composto resolve direto.
+O cursor é opaco para o cliente e volta no cabeçalho `X-Next-Cursor`.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+
+from fastapi import Response
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    """Cursor opaco a partir da posição (data, id) do último item da página"""
+    raw = json.dumps([created_at.isoformat(sep=" "), item_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Posição (data, id) de um cursor; ValueError se for inválido"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor de paginação inválido") from e
+
+
+def _bind_datetime(query: Query, value: datetime) -> Any:
+    """Valor comparável com a coluna no banco em uso
+
+    O SQLite guarda datas como texto e CURRENT_TIMESTAMP não tem
+    microssegundos; comparar com o mesmo formato textual preserva a ordem.
+    """
+    bind = query.session.get_bind()
+    if bind.dialect.name == "sqlite":
+        return value.replace(tzinfo=None).isoformat(sep=" ")
+    return value
+
+
+def keyset_page(
+    query: Query,
+    created_column,
+    id_column,
+    limit: int,
+    cursor: Optional[str] = None,
+    position: Optional[Callable[[Any], Tuple[datetime, int]]] = None
+) -> Tuple[List[Any], Optional[str]]:
+    """Busca uma página (`limit` linhas) e o cursor da próxima (None na última)
+
+    `position` extrai (data, id) de uma linha; por padrão lê os atributos
+    com o nome das colunas (consultas que retornam a própria entidade).
+    """
+    if cursor:
+        created_at, item_id = decode_cursor(cursor)
+        value = _bind_datetime(query, created_at)
+        query = query.filter(or_(
+            created_column < value,
+            and_(created_column == value, id_column < item_id)
+        ))
+
+    rows = query.order_by(created_column.desc(), id_column.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    if position is None:
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, created_column.key), getattr(last, id_column.key))
+    else:
+        next_cursor = encode_cursor(*position(rows[-1]))
+    return rows, next_cursor
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """Publica o cursor da próxima página no cabeçalho da resposta"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
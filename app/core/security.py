@@ -1,22 +1,29 @@
+import logging
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-import bcrypt
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+# `jose` (que carrega o backend `cryptography`) e `bcrypt` são importados
+# dentro das funções: só pesam na primeira autenticação, não no boot do worker
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica se a senha corresponde ao hash"""
+    import bcrypt
     try:
         # Converte strings para bytes
         password_bytes = plain_password.encode('utf-8')
         hash_bytes = hashed_password.encode('utf-8')
         return bcrypt.checkpw(password_bytes, hash_bytes)
     except Exception as e:
-        print(f"Erro na verificação de senha: {e}")
+        # Hash malformado ou de outro algoritmo: trata como senha errada
+        logger.warning("Erro na verificação de senha: %s", e)
         return False
 
 def get_password_hash(password: str) -> str:
     """Gera hash da senha"""
+    import bcrypt
     try:
         # Converte para bytes e gera hash
         password_bytes = password.encode('utf-8')
@@ -24,11 +31,12 @@ def get_password_hash(password: str) -> str:
         hashed = bcrypt.hashpw(password_bytes, salt)
         return hashed.decode('utf-8')
     except Exception as e:
-        print(f"Erro ao gerar hash: {e}")
+        logger.error("Erro ao gerar hash: %s", e)
         raise
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Cria token JWT"""
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -41,6 +49,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 def decode_access_token(token: str) -> Optional[dict]:
     """Decodifica token JWT"""
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
@@ -0,0 +1,200 @@
+"""Servidor de arquivos estáticos para uploads imutáveis
+
+Os uploads são endereçados por conteúdo (o nome muda se o conteúdo mudar), então
+podem ser cacheados "para sempre" por navegadores e proxies:
+- `Cache-Control: public, max-age=<1 ano>, immutable`
+- ETag forte derivada do hash do conteúdo
+- Suporte a `Range` (um intervalo por requisição) e `If-Range`
+- Variantes pré-comprimidas (`.br`/`.gz`) para tipos compressíveis
+"""
+import os
+import re
+import stat
+from email.utils import formatdate
+from mimetypes import guess_type
+from typing import Dict, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+ONE_YEAR = 365 * 24 * 60 * 60
+CONTENT_HASH_RE = re.compile(r"^[0-9a-f]{64}")
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Imagens já são comprimidas: só procuramos variantes .br/.gz para estes tipos
+COMPRESSIBLE_TYPES = {
+    "image/svg+xml",
+    "application/json",
+    "text/plain",
+    "text/css",
+    "text/javascript",
+    "application/javascript",
+}
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def strong_etag(path: str, stat_result: os.stat_result, encoding: Optional[str] = None) -> str:
+    """ETag forte: nome endereçado por conteúdo (hash + variante) ou mtime/tamanho"""
+    name = os.path.basename(path)
+    if CONTENT_HASH_RE.match(name):
+        tag = name
+    else:
+        tag = f"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"
+    if encoding:
+        tag = f"{tag}+{encoding}"
+    return f'"{tag}"'
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Converte `bytes=a-b` em (início, fim) inclusivos.
+
+    Retorna None quando o cabeçalho deve ser ignorado (sintaxe inválida ou
+    múltiplos intervalos: respondemos 200 com o arquivo inteiro, como permite
+    a RFC 9110). Levanta ValueError se o intervalo não for satisfazível.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Sufixo: "bytes=-500" são os últimos 500 bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("Intervalo vazio")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError("Intervalo fora do arquivo")
+    return start, min(end, size - 1)
+
+
+class PartialFileResponse(FileResponse):
+    """Resposta 206 com um único intervalo de bytes do arquivo"""
+
+    def __init__(self, path: str, start: int, end: int, **kwargs):
+        super().__init__(path, status_code=206, **kwargs)
+        self.start = start
+        self.end = end
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        remaining = self.end - self.start + 1
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": remaining > 0,
+                })
+        if remaining > 0:
+            # Arquivo encolheu durante a leitura: encerra o corpo mesmo assim
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles com cache de longo prazo para arquivos imutáveis"""
+
+    def __init__(self, *args, max_age: int = ONE_YEAR, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = f"public, max-age={max_age}, immutable"
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        media_type = guess_type(full_path)[0] or "text/plain"
+
+        headers: Dict[str, str] = {
+            "cache-control": self.cache_control,
+            "accept-ranges": "bytes",
+        }
+        encoding = None
+        if media_type in COMPRESSIBLE_TYPES:
+            headers["vary"] = "Accept-Encoding"
+            full_path, stat_result, encoding = self._precompressed(
+                full_path, stat_result, request_headers
+            )
+            if encoding:
+                headers["content-encoding"] = encoding
+
+        etag = strong_etag(full_path, stat_result, encoding)
+        headers["etag"] = etag
+        headers["last-modified"] = formatdate(stat_result.st_mtime, usegmt=True)
+
+        if self.is_not_modified(Headers(headers), request_headers):
+            return NotModifiedResponse(Headers(headers))
+
+        range_header = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        if range_header and status_code == 200 and (if_range is None or if_range == etag):
+            size = stat_result.st_size
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                return Response(
+                    status_code=416,
+                    headers={"content-range": f"bytes */{size}", **headers},
+                )
+            if byte_range is not None:
+                start, end = byte_range
+                headers["content-range"] = f"bytes {start}-{end}/{size}"
+                headers["content-length"] = str(end - start + 1)
+                return PartialFileResponse(
+                    full_path, start, end,
+                    headers=headers,
+                    media_type=media_type,
+                    stat_result=stat_result,
+                )
+
+        return FileResponse(
+            full_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=stat_result,
+        )
+
+    @staticmethod
+    def _precompressed(
+        full_path: str,
+        stat_result: os.stat_result,
+        request_headers: Headers,
+    ) -> Tuple[str, os.stat_result, Optional[str]]:
+        """Troca pelo arquivo `.br`/`.gz` ao lado do original, se o cliente aceitar"""
+        accepted = {
+            token.split(";")[0].strip()
+            for token in request_headers.get("accept-encoding", "").split(",")
+        }
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding not in accepted:
+                continue
+            try:
+                variant_stat = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            if stat.S_ISREG(variant_stat.st_mode):
+                return full_path + suffix, variant_stat, encoding
+        return full_path, stat_result, None
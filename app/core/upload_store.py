@@ -0,0 +1,71 @@
+"""Armazenamento de uploads endereçado por conteúdo (SHA-256), deduplicado e com shards"""
+import hashlib
+import os
+import tempfile
+from mimetypes import guess_type
+from pathlib import Path
+from typing import BinaryIO, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.infrastructure.storage import IFileStorage, temp_dir
+
+CHUNK_SIZE = 64 * 1024  # 64KB por leitura
+
+
+def blob_key(digest: str, ext: str, width: Optional[int] = None, height: Optional[int] = None) -> str:
+    """Caminho relativo do blob: 'ab12…', '.jpg', 800, 600 -> 'ab/12/ab12….800x600.jpg'
+
+    Dois níveis de shard (256 x 256 diretórios) evitam um único diretório
+    gigante em `uploads/`. As dimensões no nome deixam o frontend reservar o
+    espaço da imagem sem consultar o banco nem baixar o arquivo.
+    """
+    dimensions = f".{width}x{height}" if width and height else ""
+    return f"{digest[:2]}/{digest[2:4]}/{digest}{dimensions}{ext}"
+
+
+def store_stream(
+    source: BinaryIO,
+    storage: IFileStorage,
+    ext: str,
+    width: Optional[int] = None,
+    height: Optional[int] = None
+) -> Tuple[str, bool]:
+    """Copia o stream calculando o SHA-256 e grava o blob sob o hash do conteúdo.
+
+    Retorna (chave relativa, criado). Se o mesmo conteúdo já existe, o arquivo
+    temporário é descartado e `criado` é False.
+    """
+    hasher = hashlib.sha256()
+    fd, tmp_name = tempfile.mkstemp(dir=temp_dir())
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while chunk := source.read(CHUNK_SIZE):
+                hasher.update(chunk)
+                buffer.write(chunk)
+
+        key = blob_key(hasher.hexdigest(), ext, width, height)
+        if storage.exists(key):
+            os.unlink(tmp_name)
+            # Renova o mtime: o coletor de órfãos respeita a carência a partir daqui
+            storage.touch(key)
+            return key, False
+
+        # No disco local é um rename atômico: leitores nunca veem um blob incompleto
+        storage.put_file(key, Path(tmp_name), guess_type(key)[0])
+        return key, True
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def count_references(db: Session, url: str) -> int:
+    """Quantos anúncios (ativos ou arquivados) referenciam a URL no JSON de `images`"""
+    # As imagens são gravadas com json.dumps, então a URL aparece entre aspas
+    return sum(
+        db.query(func.count(model.id)).filter(model.images.like(f'%"{url}"%')).scalar()
+        for model in (models.Ad, models.ArchivedAd)
+    )
@@ -0,0 +1,205 @@
+"""Contadores desnormalizados (favoritos, comentários e avaliações)
+
+Os contadores são atualizados com `UPDATE ... SET col = col + n` na mesma
+transação da escrita que os altera: incrementos atômicos não perdem
+atualizações concorrentes e dispensam `COUNT(*)`/`GROUP BY` nas leituras.
+Cada anúncio guarda soma, quantidade e histograma (1 a 5 estrelas) das
+avaliações; o dono do anúncio guarda o histograma de tudo que recebeu.
+A quantidade de anúncios publicados por categoria fica em `category_ad_counts`.
+O job `app.jobs.counter_reconcile` corrige eventuais desvios.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+RATING_STARS = range(1, 6)
+PUBLISHED = "published"
+
+
+def star_column(star: int) -> str:
+    """Coluna do histograma para uma nota: 4 -> 'rating_4_count'"""
+    return f"rating_{star}_count"
+
+
+STAR_COLUMNS = tuple(star_column(star) for star in RATING_STARS)
+
+
+def rating_deltas(old: Optional[int], new: Optional[int], weight: int = 1) -> Dict[str, int]:
+    """Deltas de soma, quantidade e histograma ao trocar a nota `old` por `new`
+
+    `weight` aplica o mesmo efeito a vários comentários de uma vez.
+    """
+    deltas: Dict[str, int] = defaultdict(int)
+    for rating, sign in ((old, -1), (new, 1)):
+        if rating is None:
+            continue
+        deltas["rating_sum"] += sign * rating * weight
+        deltas["rating_count"] += sign * weight
+        deltas[star_column(rating)] += sign * weight
+    return {column: delta for column, delta in deltas.items() if delta}
+
+
+def adjust_ad_counters(
+    db: Session,
+    ad_id: int,
+    favorites: int = 0,
+    comments: int = 0,
+    ratings: Optional[Dict[str, int]] = None
+) -> None:
+    """Soma os deltas aos contadores do anúncio (sem commit)"""
+    deltas = dict(ratings or {})
+    if favorites:
+        deltas["favorites_count"] = favorites
+    if comments:
+        deltas["comments_count"] = comments
+    if not deltas:
+        return
+    db.execute(
+        update(models.Ad)
+        .where(models.Ad.id == ad_id)
+        .values({
+            column: getattr(models.Ad, column) + delta
+            for column, delta in deltas.items()
+        })
+        .execution_options(synchronize_session=False)
+    )
+
+
+def adjust_owner_ratings(db: Session, ad_id: int, ratings: Dict[str, int]) -> None:
+    """Aplica os deltas do histograma ao dono do anúncio, sem buscá-lo antes (sem commit)"""
+    stars = {
+        column: getattr(models.User, column) + delta
+        for column, delta in ratings.items()
+        if column in STAR_COLUMNS
+    }
+    if not stars:
+        return
+    # O anúncio pode já estar no arquivo (ads_archive); os comentários continuam valendo
+    owner_id = func.coalesce(
+        select(models.Ad.user_id).where(models.Ad.id == ad_id).scalar_subquery(),
+        select(models.ArchivedAd.user_id).where(models.ArchivedAd.id == ad_id).scalar_subquery(),
+    )
+    db.execute(
+        update(models.User)
+        .where(models.User.id == owner_id)
+        .values(stars)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def record_comment_change(
+    db: Session,
+    ad_id: int,
+    old_rating: Optional[int],
+    new_rating: Optional[int],
+    comments: int = 0
+) -> None:
+    """Atualiza anúncio e dono após criar (comments=1), editar ou apagar (comments=-1) um comentário"""
+    ratings = rating_deltas(old_rating, new_rating)
+    adjust_ad_counters(db, ad_id, comments=comments, ratings=ratings)
+    adjust_owner_ratings(db, ad_id, ratings)
+
+
+def release_ad_ratings(db: Session, ad: models.Ad) -> None:
+    """Desconta do dono as avaliações de um anúncio que será apagado (sem commit)"""
+    stars = {
+        star_column(star): -(getattr(ad, star_column(star)) or 0)
+        for star in RATING_STARS
+    }
+    adjust_owner_ratings(db, ad.id, {column: delta for column, delta in stars.items() if delta})
+
+
+def release_favorites(db: Session, ad_ids: Iterable[int]) -> None:
+    """Desconta um favorito de cada anúncio de `ad_ids` (sem commit)"""
+    ad_ids = list(ad_ids)
+    if not ad_ids:
+        return
+    db.execute(
+        update(models.Ad)
+        .where(models.Ad.id.in_(ad_ids))
+        .values(favorites_count=models.Ad.favorites_count - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def release_comments(db: Session, rows: Iterable[Tuple[int, Optional[int], int]]) -> None:
+    """Desconta dos anúncios (e de seus donos) comentários que serão apagados em massa
+
+    `rows` traz (ad_id, nota, quantidade), como num `GROUP BY ad_id, rating` (sem commit).
+    """
+    per_ad: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for ad_id, rating, count in rows:
+        per_ad[ad_id]["comments_count"] -= count
+        for column, delta in rating_deltas(rating, None, weight=count).items():
+            per_ad[ad_id][column] += delta
+    for ad_id, deltas in per_ad.items():
+        comments = deltas.pop("comments_count")
+        adjust_ad_counters(db, ad_id, comments=comments, ratings=deltas)
+        adjust_owner_ratings(db, ad_id, deltas)
+
+
+def _status_value(status) -> Optional[str]:
+    """'published' tanto para o texto quanto para os enums de status"""
+    return getattr(status, "value", status)
+
+
+def dialect_insert(db: Session):
+    """`insert` do dialeto em uso, com suporte a ON CONFLICT (SQLite 3.24+ e PostgreSQL)"""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert
+
+
+def adjust_category_counts(db: Session, deltas: Dict[int, int]) -> None:
+    """Soma os deltas à quantidade de anúncios publicados de cada categoria (sem commit)
+
+    Um único INSERT ... ON CONFLICT DO UPDATE por categoria: se a linha ainda
+    não existe (categoria criada fora da API), duas transações concorrentes
+    não tentam inseri-la ao mesmo tempo. A reconciliação acerta o total de
+    linhas criadas aqui com um delta negativo.
+    """
+    table = models.CategoryAdCount
+    insert_stmt = dialect_insert(db)
+    for category_id, delta in deltas.items():
+        if not delta:
+            continue
+        statement = insert_stmt(table).values(category_id=category_id, published_count=max(delta, 0))
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[table.category_id],
+            set_={"published_count": table.published_count + delta}
+        ))
+
+
+def record_listing_change(
+    db: Session,
+    old_status=None,
+    old_category_id: Optional[int] = None,
+    new_status=None,
+    new_category_id: Optional[int] = None
+) -> None:
+    """Atualiza as contagens por categoria após criar (sem `old_*`), editar ou apagar (sem `new_*`)
+
+    Só anúncios publicados contam; trocar status ou categoria move o anúncio
+    entre as contagens (sem commit).
+    """
+    deltas: Dict[int, int] = defaultdict(int)
+    if _status_value(old_status) == PUBLISHED and old_category_id is not None:
+        deltas[old_category_id] -= 1
+    if _status_value(new_status) == PUBLISHED and new_category_id is not None:
+        deltas[new_category_id] += 1
+    adjust_category_counts(db, deltas)
+
+
+def release_listings(db: Session, rows: Iterable[Tuple[object, Optional[int]]]) -> None:
+    """Desconta das categorias os anúncios (status, category_id) apagados em massa (sem commit)"""
+    deltas: Dict[int, int] = defaultdict(int)
+    for status, category_id in rows:
+        if _status_value(status) == PUBLISHED and category_id is not None:
+            deltas[category_id] -= 1
+    adjust_category_counts(db, deltas)
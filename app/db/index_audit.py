@@ -0,0 +1,98 @@
+"""Auditoria de chaves estrangeiras sem índice
+
+Uma FK sem índice faz cada cascata (`ON DELETE CASCADE`, delete-orphan) e cada
+busca pela coluna (ex.: comentários de um anúncio) varrer a tabela inteira.
+Uma FK conta como indexada quando suas colunas são o prefixo à esquerda de
+algum índice, chave primária ou restrição UNIQUE.
+
+Uso (CI ou manual; sai com código 1 se encontrar FKs sem índice):
+    python -m app.db.index_audit              # confere os modelos (Base.metadata)
+    python -m app.db.index_audit --database   # confere o banco configurado
+
+Em bancos existentes, os índices faltantes são criados por `python migrate.py`.
+"""
+import argparse
+import sys
+from dataclasses import dataclass
+from typing import Iterable, List, Sequence, Tuple
+
+from sqlalchemy import MetaData, PrimaryKeyConstraint, UniqueConstraint, inspect
+from sqlalchemy.engine import Engine
+
+@dataclass(frozen=True)
+class UnindexedForeignKey:
+    """FK cujas colunas não iniciam nenhum índice"""
+    table: str
+    columns: Tuple[str, ...]
+    referred_table: str
+
+    def __str__(self) -> str:
+        return f"{self.table}({', '.join(self.columns)}) -> {self.referred_table}"
+
+
+def _covered(columns: Sequence[str], indexed: Iterable[Sequence[str]]) -> bool:
+    """As colunas da FK são prefixo à esquerda de algum índice?"""
+    size = len(columns)
+    return any(tuple(index[:size]) == tuple(columns) for index in indexed)
+
+
+def audit_metadata(metadata: MetaData) -> List[UnindexedForeignKey]:
+    """FKs sem índice declaradas nos modelos"""
+    missing = []
+    for table in metadata.sorted_tables:
+        indexed = [[column.name for column in index.columns] for index in table.indexes]
+        indexed += [
+            [column.name for column in constraint.columns]
+            for constraint in table.constraints
+            if isinstance(constraint, (PrimaryKeyConstraint, UniqueConstraint))
+        ]
+        # `Column(..., index=True)`/`unique=True` viram Index/UniqueConstraint acima
+        for fk in table.foreign_key_constraints:
+            columns = [column.name for column in fk.columns]
+            if not _covered(columns, indexed):
+                missing.append(UnindexedForeignKey(table.name, tuple(columns), fk.referred_table.name))
+    return missing
+
+
+def audit_database(engine: Engine) -> List[UnindexedForeignKey]:
+    """FKs sem índice no banco de fato (pega bancos criados antes dos índices)"""
+    inspector = inspect(engine)
+    missing = []
+    for table in inspector.get_table_names():
+        indexed = [index["column_names"] for index in inspector.get_indexes(table)]
+        indexed += [constraint["column_names"] for constraint in inspector.get_unique_constraints(table)]
+        primary_key = inspector.get_pk_constraint(table).get("constrained_columns")
+        if primary_key:
+            indexed.append(primary_key)
+        for fk in inspector.get_foreign_keys(table):
+            columns = fk["constrained_columns"]
+            if not _covered(columns, indexed):
+                missing.append(UnindexedForeignKey(table, tuple(columns), fk["referred_table"]))
+    return missing
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lista chaves estrangeiras sem índice")
+    parser.add_argument("--database", action="store_true", help="Confere o banco configurado em vez dos modelos")
+    args = parser.parse_args()
+
+    if args.database:
+        from app.db.database import engine
+        missing = audit_database(engine)
+        source = "banco"
+    else:
+        from app.db import models
+        missing = audit_metadata(models.Base.metadata)
+        source = "modelos"
+
+    if not missing:
+        print(f"✓ Todas as chaves estrangeiras têm índice ({source})")
+        return
+    print(f"✗ {len(missing)} chave(s) estrangeira(s) sem índice ({source}):")
+    for fk in missing:
+        print(f"  - {fk}")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Migrações de esquema versionadas (aplique com `python migrate.py`)"""
@@ -0,0 +1,140 @@
+"""Operações idempotentes usadas pelas migrações
+
+Cada operação confere o banco antes de alterar, então reaplicar uma migração
+(ou aplicá-la a um banco criado já no formato novo) não tem efeito.
+"""
+import time
+from contextlib import contextmanager
+from typing import Collection, Iterator, List, Tuple
+
+from sqlalchemy import MetaData, Table, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateColumn
+
+
+def add_missing_columns(engine: Engine, table: Table) -> List[str]:
+    """Adiciona à tabela existente as colunas de `table` que ainda não existem
+
+    Colunas NOT NULL precisam de `server_default` para preencher as linhas antigas.
+    """
+    existing = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    added = []
+    with engine.begin() as connection:
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = CreateColumn(column).compile(dialect=engine.dialect)
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+            added.append(column.name)
+    return added
+
+
+def missing_indexes(engine: Engine, metadata: MetaData) -> List:
+    """Índices declarados em `metadata` que ainda não existem no banco"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing += [index for index in table.indexes if index.name not in existing]
+    return missing
+
+
+def create_missing_indexes(engine: Engine, metadata: MetaData) -> List[Tuple[str, float]]:
+    """Cria os índices faltantes; retorna (nome, segundos) de cada um"""
+    created = []
+    for index in missing_indexes(engine, metadata):
+        started = time.perf_counter()
+        index.create(bind=engine, checkfirst=True)
+        created.append((index.name, time.perf_counter() - started))
+    if created and engine.dialect.name == "sqlite":
+        # Atualiza as estatísticas para o planejador escolher os índices novos
+        with engine.begin() as connection:
+            connection.execute(text("ANALYZE"))
+    return created
+
+
+def foreign_keys(connection: Connection, table_name: str) -> List[Tuple]:
+    """Chaves estrangeiras da tabela em forma comparável"""
+    return sorted(
+        (
+            tuple(fk["constrained_columns"]), fk["referred_table"], tuple(fk["referred_columns"]),
+            tuple(sorted((fk.get("options") or {}).items())),
+        )
+        for fk in inspect(connection).get_foreign_keys(table_name)
+    )
+
+
+@contextmanager
+def sqlite_foreign_keys_off(engine: Engine) -> Iterator[Connection]:
+    """Conexão com `PRAGMA foreign_keys` desligado enquanto o bloco roda
+
+    Com o pragma ligado, o DROP TABLE de uma recriação apagaria em cascata as
+    linhas que referenciam a tabela. O pragma só muda fora de transação: o
+    bloco abre a sua com `connection.begin()`.
+    """
+    with engine.connect() as connection:
+        enforced = connection.exec_driver_sql("PRAGMA foreign_keys").scalar()
+        if enforced:
+            connection.exec_driver_sql("PRAGMA foreign_keys = OFF")
+        connection.commit()
+        try:
+            yield connection
+        finally:
+            if enforced:
+                connection.exec_driver_sql("PRAGMA foreign_keys = ON")
+                connection.commit()
+
+
+def rebuild_sqlite_table(
+    connection: Connection,
+    table_name: str,
+    drop_foreign_keys: Collection[str] = (),
+    **table_kwargs
+) -> None:
+    """Recria uma tabela do SQLite a partir dela mesma (procedimento da documentação do SQLite)
+
+    Só reflexão, sem os modelos: a tabela nova tem as mesmas colunas, chaves
+    estrangeiras (menos as das colunas em `drop_foreign_keys`) e índices, mais
+    as opções de `table_kwargs` (ex.: `sqlite_autoincrement=True`). Cria a
+    nova, copia as linhas com INSERT ... SELECT, apaga a antiga e renomeia. As
+    chaves estrangeiras resultantes são conferidas antes do commit. Deve rodar
+    dentro de uma transação com as chaves estrangeiras desligadas
+    (`sqlite_foreign_keys_off`).
+    """
+    rebuilt_name = f"{table_name}_rebuilt"
+    # Sobra de uma execução interrompida antes da cópia
+    connection.execute(text(f"DROP TABLE IF EXISTS {rebuilt_name}"))
+    expected = [fk for fk in foreign_keys(connection, table_name) if not set(fk[0]) & set(drop_foreign_keys)]
+    metadata = MetaData()
+    # Reflete também as tabelas referenciadas pelas chaves estrangeiras copiadas
+    old = Table(table_name, metadata, autoload_with=connection)
+    index_ddl = list(connection.scalars(
+        text("SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = :name AND sql IS NOT NULL"),
+        {"name": table_name}
+    ))
+    # Column._copy() não leva as chaves estrangeiras refletidas: são copiadas à parte
+    new = Table(
+        rebuilt_name, metadata,
+        *[column._copy() for column in old.columns],
+        *[
+            constraint._copy() for constraint in old.foreign_key_constraints
+            if not set(constraint.column_keys) & set(drop_foreign_keys)
+        ],
+        **table_kwargs
+    )
+    new.create(bind=connection)
+
+    # INSERT ... SELECT copia os valores como estão (datas no formato original)
+    columns = ", ".join(f'"{column.name}"' for column in old.columns)
+    connection.execute(text(f"INSERT INTO {rebuilt_name} ({columns}) SELECT {columns} FROM {table_name}"))
+    connection.execute(text(f"DROP TABLE {table_name}"))
+    connection.execute(text(f"ALTER TABLE {rebuilt_name} RENAME TO {table_name}"))
+    for ddl in index_ddl:
+        connection.execute(text(ddl))
+
+    rebuilt = foreign_keys(connection, table_name)
+    if rebuilt != expected:
+        raise RuntimeError(f"Chaves estrangeiras de {table_name} erradas na recriação: {expected} -> {rebuilt}")
@@ -0,0 +1,115 @@
+"""Execução das migrações versionadas
+
+As versões aplicadas ficam na tabela `schema_migrations`. Cada script em
+`app/db/migrations/versions/` (`vNNNN_descricao.py`) expõe `upgrade(engine)`
+e roda uma única vez, em ordem; os scripts são idempotentes, então uma
+migração interrompida pode simplesmente ser executada de novo.
+"""
+import importlib
+import logging
+import pkgutil
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import ModuleType
+from typing import List, Optional
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, select
+from sqlalchemy.engine import Engine
+
+from app.db.migrations import versions as versions_package
+
+logger = logging.getLogger(__name__)
+
+VERSION_RE = re.compile(r"^v(\d{4})_\w+$")
+
+# Fora de Base.metadata: o controle das migrações não é uma migração
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", String, primary_key=True),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Um script de migração (o módulo só é importado quando usado)"""
+    version: str
+    name: str
+
+    @property
+    def module(self) -> ModuleType:
+        return importlib.import_module(f"{versions_package.__name__}.{self.name}")
+
+    @property
+    def description(self) -> str:
+        return (self.module.__doc__ or self.name).strip().splitlines()[0]
+
+
+def discover() -> List[Migration]:
+    """Scripts disponíveis, em ordem de versão"""
+    migrations = []
+    for info in pkgutil.iter_modules(versions_package.__path__):
+        match = VERSION_RE.match(info.name)
+        if not match:
+            continue
+        migrations.append(Migration(match.group(1), info.name))
+    migrations.sort(key=lambda migration: migration.version)
+    counts = Counter(migration.version for migration in migrations)
+    duplicated = [version for version, count in counts.items() if count > 1]
+    if duplicated:
+        raise RuntimeError(f"Versões de migração duplicadas: {', '.join(sorted(duplicated))}")
+    return migrations
+
+
+def applied_versions(engine: Engine) -> List[str]:
+    """Versões já aplicadas (lista vazia em um banco nunca migrado)"""
+    if not inspect(engine).has_table(schema_migrations.name):
+        return []
+    with engine.connect() as connection:
+        return list(connection.scalars(select(schema_migrations.c.version).order_by(schema_migrations.c.version)))
+
+
+def pending_migrations(engine: Engine) -> List[Migration]:
+    """Migrações ainda não aplicadas"""
+    applied = set(applied_versions(engine))
+    return [migration for migration in discover() if migration.version not in applied]
+
+
+def upgrade(engine: Engine, target: Optional[str] = None) -> List[Migration]:
+    """Aplica as migrações pendentes (até `target`, inclusive); retorna as aplicadas"""
+    schema_migrations.create(bind=engine, checkfirst=True)
+    applied = []
+    for migration in pending_migrations(engine):
+        if target is not None and migration.version > target:
+            break
+        started = time.perf_counter()
+        migration.module.upgrade(engine)
+        with engine.begin() as connection:
+            connection.execute(schema_migrations.insert().values(
+                version=migration.version,
+                applied_at=datetime.now(timezone.utc)
+            ))
+        logger.info(
+            "Migração %s aplicada em %.1f ms: %s",
+            migration.name, (time.perf_counter() - started) * 1000, migration.description
+        )
+        applied.append(migration)
+    return applied
+
+
+def warn_pending_migrations(engine: Engine) -> None:
+    """Checagem de inicialização (uma consulta): avisa se o banco está desatualizado"""
+    try:
+        pending = pending_migrations(engine)
+    except Exception as e:  # Diagnóstico; a falha dele não derruba a API
+        logger.warning("Não foi possível conferir as migrações: %s", e)
+        return
+    if pending:
+        logger.warning(
+            "Banco com %d migração(ões) pendente(s) (%s). Rode `python migrate.py`",
+            len(pending), ", ".join(migration.name for migration in pending)
+        )
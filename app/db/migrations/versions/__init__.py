@@ -0,0 +1 @@
+"""Scripts de migração: `vNNNN_descricao.py`, cada um com `upgrade(engine)`"""
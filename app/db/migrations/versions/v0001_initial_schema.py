@@ -0,0 +1,110 @@
+"""Cria as tabelas que ainda não existem
+
+Em um banco novo cria o esquema inteiro como era nesta versão (as migrações
+seguintes levam ao formato atual); em bancos criados pelo antigo
+`create_all` na inicialização, só acrescenta as tabelas que faltam.
+
+As tabelas são descritas aqui, e não pelos modelos atuais, para que a
+migração continue igual quando os modelos mudarem.
+"""
+from sqlalchemy import (
+    Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, MetaData, String, Table, Text, func
+)
+from sqlalchemy.engine import Engine
+
+STARS = range(1, 6)
+
+
+def _counter(name: str) -> Column:
+    return Column(name, Integer, nullable=False, default=0, server_default="0")
+
+
+def _star_columns():
+    return [_counter(f"rating_{star}_count") for star in STARS]
+
+
+def _timestamps():
+    return [
+        Column("created_at", DateTime(timezone=True), server_default=func.now()),
+        Column("updated_at", DateTime(timezone=True)),
+    ]
+
+
+metadata = MetaData()
+Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, nullable=True),
+    Column("email", String, unique=True, index=True, nullable=False),
+    Column("hashed_password", String, nullable=False),
+    Column("is_active", Boolean),
+    *_timestamps(),
+    *_star_columns(),
+)
+Table(
+    "categories", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, unique=True, nullable=False),
+    Column("slug", String, unique=True, nullable=False),
+    Column("description", Text, nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+Table(
+    "ads", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("category_id", Integer, ForeignKey("categories.id"), nullable=False, index=True),
+    Column("title", String, nullable=False, index=True),
+    Column("description", Text, nullable=False),
+    Column("seller", String, nullable=True),
+    Column("location", String, nullable=True, index=True),
+    Column("cep", String, nullable=True),
+    Column("price", Float, nullable=True),
+    Column("bedrooms", Integer, nullable=True),
+    Column("bathrooms", Integer, nullable=True),
+    Column("rules", Text, nullable=True),
+    Column("amenities", Text, nullable=True),
+    Column("custom_rules", Text, nullable=True),
+    Column("custom_amenities", Text, nullable=True),
+    Column("images", Text, nullable=True),
+    Column("status", String),
+    *_timestamps(),
+    Column("published_at", DateTime(timezone=True), nullable=True),
+    _counter("favorites_count"),
+    _counter("comments_count"),
+    _counter("rating_sum"),
+    _counter("rating_count"),
+    *_star_columns(),
+    Index("ix_ads_user_id_created_at", "user_id", "created_at"),
+)
+Table(
+    "comments", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("ad_id", Integer, ForeignKey("ads.id", ondelete="CASCADE"), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("content", Text, nullable=False),
+    Column("rating", Integer, nullable=True),
+    *_timestamps(),
+    Index("ix_comments_ad_id_created_at", "ad_id", "created_at"),
+)
+Table(
+    "favorites", metadata,
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("ad_id", Integer, ForeignKey("ads.id", ondelete="CASCADE"), primary_key=True, index=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Index("ix_favorites_user_id_created_at", "user_id", "created_at"),
+)
+Table(
+    "category_ad_counts", metadata,
+    Column("category_id", Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True),
+    _counter("published_count"),
+)
+Table(
+    "cache_versions", metadata,
+    Column("name", String, primary_key=True),
+    _counter("version"),
+)
+
+
+def upgrade(engine: Engine) -> None:
+    metadata.create_all(bind=engine, checkfirst=True)
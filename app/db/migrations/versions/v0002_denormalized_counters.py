@@ -0,0 +1,76 @@
+"""Colunas dos contadores desnormalizados (favoritos, comentários e avaliações)
+
+Adiciona às tabelas antigas as colunas de contadores dos anúncios e o
+histograma de avaliações dos usuários e calcula os valores a partir dos dados
+existentes. O cálculo roda sempre, não só quando as colunas foram criadas
+agora: uma execução interrompida entre o ALTER TABLE e o preenchimento é
+completada ao rodar de novo.
+
+As tabelas são descritas aqui como eram nesta versão (e não pelos modelos
+atuais), para que a migração continue igual quando os modelos mudarem. Nesta
+versão ainda não há `ads_archive`: os comentários contam só para `ads`.
+"""
+from sqlalchemy import Column, Integer, MetaData, Table, func, select, update
+from sqlalchemy.engine import Engine
+
+from app.db.migrations.operations import add_missing_columns
+
+STARS = range(1, 6)
+
+
+def _counter(name: str) -> Column:
+    return Column(name, Integer, nullable=False, default=0, server_default="0")
+
+
+def _star_columns():
+    return [_counter(f"rating_{star}_count") for star in STARS]
+
+
+metadata = MetaData()
+ads = Table(
+    "ads", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, nullable=False),
+    _counter("favorites_count"),
+    _counter("comments_count"),
+    _counter("rating_sum"),
+    _counter("rating_count"),
+    *_star_columns(),
+)
+users = Table("users", metadata, Column("id", Integer, primary_key=True), *_star_columns())
+favorites = Table("favorites", metadata, Column("user_id", Integer), Column("ad_id", Integer))
+comments = Table(
+    "comments", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("ad_id", Integer),
+    Column("rating", Integer),
+)
+
+
+def _recompute(engine: Engine) -> None:
+    """Regrava todos os contadores com subconsultas correlacionadas"""
+    same_ad = comments.c.ad_id == ads.c.id
+    owned = select(func.count(comments.c.id)).select_from(comments.join(ads, same_ad))
+    with engine.begin() as connection:
+        connection.execute(update(ads).values(
+            favorites_count=select(func.count()).where(favorites.c.ad_id == ads.c.id).scalar_subquery(),
+            comments_count=select(func.count(comments.c.id)).where(same_ad).scalar_subquery(),
+            rating_sum=select(func.coalesce(func.sum(comments.c.rating), 0)).where(same_ad).scalar_subquery(),
+            rating_count=select(func.count(comments.c.rating)).where(same_ad).scalar_subquery(),
+            **{
+                f"rating_{star}_count": select(func.count(comments.c.id))
+                .where(same_ad, comments.c.rating == star).scalar_subquery()
+                for star in STARS
+            }
+        ))
+        connection.execute(update(users).values(**{
+            f"rating_{star}_count": owned
+            .where(ads.c.user_id == users.c.id, comments.c.rating == star).scalar_subquery()
+            for star in STARS
+        }))
+
+
+def upgrade(engine: Engine) -> None:
+    add_missing_columns(engine, ads)
+    add_missing_columns(engine, users)
+    _recompute(engine)
@@ -0,0 +1,40 @@
+"""Índices das chaves estrangeiras e dos compostos usados pela paginação
+
+`create_all` só cria índices junto com tabelas novas; bancos antigos ficam
+sem os índices de comments.user_id, ads.category_id e favorites.ad_id e sem
+os compostos (fk, created_at) de comentários, anúncios e favoritos. Os
+índices são descritos aqui como eram nesta versão, sem os modelos atuais.
+"""
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, Table
+from sqlalchemy.engine import Engine
+
+from app.db.migrations.operations import create_missing_indexes
+
+metadata = MetaData()
+Table(
+    "ads", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer),
+    Column("category_id", Integer, index=True),
+    Column("created_at", DateTime(timezone=True)),
+    Index("ix_ads_user_id_created_at", "user_id", "created_at"),
+)
+Table(
+    "comments", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("ad_id", Integer),
+    Column("user_id", Integer, index=True),
+    Column("created_at", DateTime(timezone=True)),
+    Index("ix_comments_ad_id_created_at", "ad_id", "created_at"),
+)
+Table(
+    "favorites", metadata,
+    Column("user_id", Integer, primary_key=True),
+    Column("ad_id", Integer, primary_key=True, index=True),
+    Column("created_at", DateTime(timezone=True)),
+    Index("ix_favorites_user_id_created_at", "user_id", "created_at"),
+)
+
+
+def upgrade(engine: Engine) -> None:
+    create_missing_indexes(engine, metadata)
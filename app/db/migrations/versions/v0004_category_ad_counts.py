@@ -0,0 +1,39 @@
+"""Preenche `category_ad_counts` com os anúncios publicados de cada categoria
+
+Cria a linha de contagem de toda categoria que ainda não tem uma (as
+escritas seguintes só a incrementam) e recalcula todas as contagens. As
+tabelas são descritas como eram nesta versão, sem os modelos atuais.
+"""
+from sqlalchemy import Column, Integer, MetaData, String, Table, func, insert, literal, select, update
+from sqlalchemy.engine import Engine
+
+PUBLISHED = "published"
+
+metadata = MetaData()
+categories = Table("categories", metadata, Column("id", Integer, primary_key=True))
+ads = Table(
+    "ads", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("category_id", Integer),
+    Column("status", String),
+)
+counts = Table(
+    "category_ad_counts", metadata,
+    Column("category_id", Integer, primary_key=True),
+    Column("published_count", Integer, nullable=False),
+)
+
+
+def upgrade(engine: Engine) -> None:
+    with engine.begin() as connection:
+        connection.execute(insert(counts).from_select(
+            ["category_id", "published_count"],
+            select(categories.c.id, literal(0)).where(
+                ~select(counts.c.category_id).where(counts.c.category_id == categories.c.id).exists()
+            )
+        ))
+        connection.execute(update(counts).values(
+            published_count=select(func.count(ads.c.id)).where(
+                ads.c.category_id == counts.c.category_id, ads.c.status == PUBLISHED
+            ).scalar_subquery()
+        ))
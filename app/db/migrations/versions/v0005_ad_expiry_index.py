@@ -0,0 +1,23 @@
+"""Índice (status, published_at) para a expiração de anúncios antigos
+
+O job `app.jobs.ad_expiry` procura anúncios publicados com `published_at`
+antigo (ou nulo); sem o índice, cada lote varre todos os publicados. O índice
+é descrito aqui como era nesta versão, sem os modelos atuais.
+"""
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table
+from sqlalchemy.engine import Engine
+
+from app.db.migrations.operations import create_missing_indexes
+
+metadata = MetaData()
+Table(
+    "ads", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("status", String),
+    Column("published_at", DateTime(timezone=True)),
+    Index("ix_ads_status_published_at", "status", "published_at"),
+)
+
+
+def upgrade(engine: Engine) -> None:
+    create_missing_indexes(engine, metadata)
@@ -0,0 +1,54 @@
+"""Tabela `ads_archive` para anúncios concluídos/cancelados antigos (app.jobs.ad_archive)
+
+Mesmas colunas de `ads` (com o mesmo id, sem autoincremento) mais
+`archived_at`. A tabela é descrita aqui como era nesta versão, sem os modelos
+atuais.
+"""
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, MetaData, String, Table, Text, func
+from sqlalchemy.engine import Engine
+
+STARS = range(1, 6)
+
+
+def _counter(name: str) -> Column:
+    return Column(name, Integer, nullable=False, default=0, server_default="0")
+
+
+metadata = MetaData()
+# Só para as chaves estrangeiras: não são criadas aqui
+Table("users", metadata, Column("id", Integer, primary_key=True))
+Table("categories", metadata, Column("id", Integer, primary_key=True))
+archive = Table(
+    "ads_archive", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("category_id", Integer, ForeignKey("categories.id"), nullable=False, index=True),
+    Column("title", String, nullable=False),
+    Column("description", Text, nullable=False),
+    Column("seller", String, nullable=True),
+    Column("location", String, nullable=True),
+    Column("cep", String, nullable=True),
+    Column("price", Float, nullable=True),
+    Column("bedrooms", Integer, nullable=True),
+    Column("bathrooms", Integer, nullable=True),
+    Column("rules", Text, nullable=True),
+    Column("amenities", Text, nullable=True),
+    Column("custom_rules", Text, nullable=True),
+    Column("custom_amenities", Text, nullable=True),
+    Column("images", Text, nullable=True),
+    Column("status", String, nullable=False),
+    Column("created_at", DateTime(timezone=True)),
+    Column("updated_at", DateTime(timezone=True)),
+    Column("published_at", DateTime(timezone=True), nullable=True),
+    Column("archived_at", DateTime(timezone=True), server_default=func.now()),
+    _counter("favorites_count"),
+    _counter("comments_count"),
+    _counter("rating_sum"),
+    _counter("rating_count"),
+    *[_counter(f"rating_{star}_count") for star in STARS],
+    Index("ix_ads_archive_user_id_created_at", "user_id", "created_at"),
+)
+
+
+def upgrade(engine: Engine) -> None:
+    archive.create(bind=engine, checkfirst=True)
@@ -0,0 +1,54 @@
+"""`ads` com AUTOINCREMENT no SQLite: ids de anúncios nunca voltam atrás
+
+Sem AUTOINCREMENT o SQLite usa max(id) + 1, então apagar o anúncio de maior
+id devolvia esse id (e os anteriores, se também apagados) para novos
+anúncios, inclusive ids que já estão em `ads_archive`. A tabela é recriada
+com AUTOINCREMENT (procedimento de recriação da documentação do SQLite: cria
+a nova, copia as linhas com INSERT ... SELECT, apaga a antiga e renomeia) e o
+contador do SQLite passa a começar acima do maior id arquivado.
+
+Só leitura do próprio banco (reflexão), sem os modelos atuais: a tabela é
+recriada exatamente com as colunas, chaves estrangeiras e índices que tem
+hoje (as chaves estrangeiras são conferidas antes do commit). Em outros
+bancos as sequências já não voltam atrás e nada é feito.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.migrations.operations import rebuild_sqlite_table, sqlite_foreign_keys_off
+
+TABLE = "ads"
+ARCHIVE = "ads_archive"
+
+
+def _has_autoincrement(connection: Connection) -> bool:
+    sql = connection.scalar(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": TABLE}
+    )
+    return "AUTOINCREMENT" in (sql or "").upper()
+
+
+def _raise_sequence(connection: Connection) -> None:
+    """Próximo id acima de todo id já usado, ativo ou arquivado"""
+    tables = set(inspect(connection).get_table_names())
+    high = connection.scalar(text(f"SELECT COALESCE(MAX(id), 0) FROM {TABLE}"))
+    if ARCHIVE in tables:
+        high = max(high, connection.scalar(text(f"SELECT COALESCE(MAX(id), 0) FROM {ARCHIVE}")))
+    current = connection.scalar(text("SELECT seq FROM sqlite_sequence WHERE name = :name"), {"name": TABLE})
+    if current is None:
+        connection.execute(
+            text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"), {"name": TABLE, "seq": high}
+        )
+    elif current < high:
+        connection.execute(
+            text("UPDATE sqlite_sequence SET seq = :seq WHERE name = :name"), {"name": TABLE, "seq": high}
+        )
+
+
+def upgrade(engine: Engine) -> None:
+    if engine.dialect.name != "sqlite":
+        return
+    with sqlite_foreign_keys_off(engine) as connection, connection.begin():
+        if not _has_autoincrement(connection):
+            rebuild_sqlite_table(connection, TABLE, sqlite_autoincrement=True)
+        _raise_sequence(connection)
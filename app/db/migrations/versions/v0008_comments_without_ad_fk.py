@@ -0,0 +1,39 @@
+"""Remove a chave estrangeira de comments.ad_id (comentários de anúncios arquivados)
+
+O job `app.jobs.ad_archive` move anúncios de `ads` para `ads_archive` e mantém
+os comentários, que passam a apontar para o id arquivado. Com a chave
+estrangeira `comments.ad_id -> ads.id ON DELETE CASCADE`, apagar a linha de
+`ads` apagaria os comentários (PostgreSQL, ou SQLite com `foreign_keys`
+ligado) ou deixaria a chave violada. A coluna fica sem chave estrangeira; as
+demais chaves de `comments` são mantidas.
+
+No SQLite a tabela é recriada a partir dela mesma (`rebuild_sqlite_table`),
+sem os modelos; nos outros bancos a restrição é apagada pelo nome.
+"""
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+from app.db.migrations.operations import rebuild_sqlite_table, sqlite_foreign_keys_off
+
+TABLE = "comments"
+COLUMN = "ad_id"
+
+
+def _ad_foreign_keys(inspector) -> list:
+    return [fk for fk in inspector.get_foreign_keys(TABLE) if COLUMN in fk["constrained_columns"]]
+
+
+def upgrade(engine: Engine) -> None:
+    inspector = inspect(engine)
+    if TABLE not in inspector.get_table_names() or not _ad_foreign_keys(inspector):
+        return
+    if engine.dialect.name == "sqlite":
+        with sqlite_foreign_keys_off(engine) as connection, connection.begin():
+            rebuild_sqlite_table(connection, TABLE, drop_foreign_keys=[COLUMN])
+        return
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as connection:
+        for fk in _ad_foreign_keys(inspector):
+            connection.exec_driver_sql(
+                f"ALTER TABLE {preparer.quote(TABLE)} DROP CONSTRAINT {preparer.quote(fk['name'])}"
+            )
@@ -0,0 +1,26 @@
+"""Coluna `users.deletion_requested_at`: contas com exclusão pedida
+
+`DELETE /api/users/me` passa a marcar o pedido, e `app.jobs.account_purge`
+só apaga as contas marcadas (antes, toda conta com `is_active = False`). A
+tabela é descrita como era nesta versão, sem os modelos atuais.
+
+Contas já desativadas não são marcadas: não há como distinguir um pedido de
+exclusão de uma desativação feita por outro motivo.
+"""
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, Table
+from sqlalchemy.engine import Engine
+
+from app.db.migrations.operations import add_missing_columns, create_missing_indexes
+
+metadata = MetaData()
+users = Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("deletion_requested_at", DateTime(timezone=True), nullable=True),
+    Index("ix_users_deletion_requested_at", "deletion_requested_at"),
+)
+
+
+def upgrade(engine: Engine) -> None:
+    add_missing_columns(engine, users)
+    create_missing_indexes(engine, metadata)
@@ -1,15 +1,21 @@
-from sqlalchemy import Boolean, Column, Integer, String, Float, Text, DateTime, ForeignKey, Table
+from sqlalchemy import Boolean, Column, Integer, String, Float, Text, DateTime, ForeignKey, Table, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
 
+def _rating_histogram(row):
+    """Histograma a partir das colunas rating_<n>_count (sem consultar comentários)"""
+    return {star: getattr(row, f"rating_{star}_count") or 0 for star in range(1, 6)}
+
 # Tabela de associação para favoritos (many-to-many)
 favorites_table = Table(
     'favorites',
     Base.metadata,
     Column('user_id', Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
-    Column('ad_id', Integer, ForeignKey('ads.id', ondelete='CASCADE'), primary_key=True),
-    Column('created_at', DateTime(timezone=True), server_default=func.now())
+    Column('ad_id', Integer, ForeignKey('ads.id', ondelete='CASCADE'), primary_key=True, index=True),
+    Column('created_at', DateTime(timezone=True), server_default=func.now()),
+    # "Meus favoritos" paginado (mais recentes primeiro)
+    Index('ix_favorites_user_id_created_at', 'user_id', 'created_at')
 )
 
 class User(Base):
@@ -21,12 +27,37 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
+    # Pedido de exclusão da conta (DELETE /api/users/me); app.jobs.account_purge apaga as marcadas
+    deletion_requested_at = Column(DateTime(timezone=True), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Histograma das avaliações recebidas em todos os anúncios (app.db.counters)
+    rating_1_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_2_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_3_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_4_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_5_count = Column(Integer, nullable=False, default=0, server_default="0")
+    
     # Relacionamentos
     ads = relationship("Ad", back_populates="owner", cascade="all, delete-orphan")
     favorites = relationship("Ad", secondary=favorites_table, back_populates="favorited_by")
+    
+    @property
+    def rating_histogram(self):
+        """Quantidade de avaliações recebidas por nota: {1: n1, ..., 5: n5}"""
+        return _rating_histogram(self)
+    
+    @property
+    def rating_count(self):
+        return sum(self.rating_histogram.values())
+    
+    @property
+    def rating_average(self):
+        """Média das avaliações recebidas (None se não houver nenhuma)"""
+        histogram = self.rating_histogram
+        total = sum(histogram.values())
+        return round(sum(star * n for star, n in histogram.items()) / total, 2) if total else None
 
 class Category(Base):
     """Modelo de Categoria"""
@@ -44,10 +75,18 @@ class Category(Base):
 class Ad(Base):
     """Modelo de Anúncio"""
     __tablename__ = "ads"
+    __table_args__ = (
+        # "Meus anúncios" paginado (mais recentes primeiro)
+        Index("ix_ads_user_id_created_at", "user_id", "created_at"),
+        # Expiração de anúncios publicados antigos (app.jobs.ad_expiry)
+        Index("ix_ads_status_published_at", "status", "published_at"),
+        # Ids nunca reaproveitados no SQLite (também os que estão em ads_archive)
+        {"sqlite_autoincrement": True},
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False, index=True)
     
     title = Column(String, nullable=False, index=True)
     description = Column(Text, nullable=False)
@@ -71,19 +110,49 @@ class Ad(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     published_at = Column(DateTime(timezone=True), nullable=True)  # Data da última publicação
     
+    # Contadores desnormalizados (mantidos por app.db.counters)
+    favorites_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comments_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_1_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_2_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_3_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_4_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_5_count = Column(Integer, nullable=False, default=0, server_default="0")
+    
     # Relacionamentos
     owner = relationship("User", back_populates="ads")
     category = relationship("Category", back_populates="ads")
     favorited_by = relationship("User", secondary=favorites_table, back_populates="favorites")
-    comments = relationship("Comment", back_populates="ad", cascade="all, delete-orphan")
+    comments = relationship(
+        "Comment", primaryjoin="Ad.id == foreign(Comment.ad_id)", back_populates="ad",
+        cascade="all, delete-orphan"
+    )
+    
+    @property
+    def rating_average(self):
+        """Média das avaliações (None se não houver nenhuma)"""
+        return round(self.rating_sum / self.rating_count, 2) if self.rating_count else None
+    
+    @property
+    def rating_histogram(self):
+        """Quantidade de avaliações por nota: {1: n1, ..., 5: n5}"""
+        return _rating_histogram(self)
 
 class Comment(Base):
     """Modelo de Comentário"""
     __tablename__ = "comments"
+    __table_args__ = (
+        # Listagem paginada por anúncio (mais recentes primeiro)
+        Index("ix_comments_ad_id_created_at", "ad_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    ad_id = Column(Integer, ForeignKey("ads.id", ondelete="CASCADE"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # Sem chave estrangeira: o anúncio pode estar em `ads` ou em `ads_archive`
+    # (app.jobs.ad_archive move o anúncio e mantém os comentários)
+    ad_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     
     content = Column(Text, nullable=False)
     rating = Column(Integer, nullable=True)  # 1-5 estrelas
@@ -92,5 +161,92 @@ class Comment(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relacionamentos
-    ad = relationship("Ad", back_populates="comments")
+    ad = relationship("Ad", primaryjoin="foreign(Comment.ad_id) == Ad.id", back_populates="comments")
     user = relationship("User")
+
+class ArchivedAd(Base):
+    """Anúncio concluído/cancelado antigo, movido de `ads` por app.jobs.ad_archive
+    
+    Mesmas colunas (e o mesmo id) do anúncio original, para que `ads` e seus
+    índices guardem só os anúncios ativos. Somente leitura: os comentários
+    continuam em `comments`, apontando para o mesmo id.
+    """
+    __tablename__ = "ads_archive"
+    __table_args__ = (
+        # "Meus anúncios" paginado (mais recentes primeiro)
+        Index("ix_ads_archive_user_id_created_at", "user_id", "created_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False, index=True)
+    
+    title = Column(String, nullable=False)
+    description = Column(Text, nullable=False)
+    seller = Column(String, nullable=True)
+    location = Column(String, nullable=True)
+    cep = Column(String, nullable=True)
+    price = Column(Float, nullable=True)
+    
+    bedrooms = Column(Integer, nullable=True)
+    bathrooms = Column(Integer, nullable=True)
+    
+    rules = Column(Text, nullable=True)  # JSON string
+    amenities = Column(Text, nullable=True)  # JSON string
+    custom_rules = Column(Text, nullable=True)
+    custom_amenities = Column(Text, nullable=True)
+    images = Column(Text, nullable=True)  # JSON string
+    
+    status = Column(String, nullable=False)  # completed, cancelled
+    
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    published_at = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Contadores no momento do arquivamento
+    favorites_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comments_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_1_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_2_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_3_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_4_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_5_count = Column(Integer, nullable=False, default=0, server_default="0")
+    
+    # Relacionamentos
+    owner = relationship("User", viewonly=True)
+    category = relationship("Category", viewonly=True)
+    
+    @property
+    def rating_average(self):
+        """Média das avaliações (None se não houver nenhuma)"""
+        return round(self.rating_sum / self.rating_count, 2) if self.rating_count else None
+    
+    @property
+    def rating_histogram(self):
+        """Quantidade de avaliações por nota: {1: n1, ..., 5: n5}"""
+        return _rating_histogram(self)
+
+class CategoryAdCount(Base):
+    """Quantidade de anúncios publicados por categoria (mantida por app.db.counters)
+    
+    Tabela separada de `categories` para que a contagem, que muda a cada
+    publicação, não invalide o registro de categorias em memória.
+    """
+    __tablename__ = "category_ad_counts"
+    
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    published_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+class CacheVersion(Base):
+    """Versão de dados mantidos em cache na memória de cada worker
+    
+    Incrementada na mesma transação que altera os dados; os workers comparam
+    com a versão que carregaram para saber quando recarregar.
+    """
+    __tablename__ = "cache_versions"
+    
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
@@ -14,6 +14,32 @@ class AdStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+# Allowed status transitions (current status -> possible next statuses)
+VALID_TRANSITIONS = {
+    AdStatus.DRAFT: [AdStatus.PUBLISHED, AdStatus.CANCELLED],
+    AdStatus.PUBLISHED: [AdStatus.RESERVED, AdStatus.CANCELLED],
+    AdStatus.RESERVED: [AdStatus.COMPLETED, AdStatus.PUBLISHED],
+    AdStatus.COMPLETED: [],
+    AdStatus.CANCELLED: [AdStatus.DRAFT, AdStatus.PUBLISHED]
+}
+
+
+class StatusChangeOutcome(str, Enum):
+    """Per-ad result of a bulk status change"""
+    UPDATED = "updated"
+    NOT_FOUND = "not_found"
+    FORBIDDEN = "forbidden"
+    INVALID_TRANSITION = "invalid_transition"
+
+
+@dataclass
+class StatusChangeResult:
+    """Outcome of a bulk status change for one ad"""
+    ad_id: int
+    outcome: StatusChangeOutcome
+    status: Optional[AdStatus] = None  # Status after the operation (None if not found)
+
+
 @dataclass
 class Ad:
     """Pure domain entity for Ad - No ORM, No framework dependencies"""
@@ -40,6 +66,15 @@ class Ad:
     updated_at: Optional[datetime] = None
     published_at: Optional[datetime] = None  # Data da última publicação
     
+    # Read-only counters (maintained by the persistence layer)
+    favorites_count: int = 0
+    comments_count: int = 0
+    rating_sum: int = 0
+    rating_count: int = 0
+    
+    # Moved to ads_archive: read-only, can only be deleted
+    archived: bool = False
+    
     def __post_init__(self):
         """Validate business rules"""
         if self.price < 0:
@@ -51,20 +86,18 @@ class Ad:
         if self.bathrooms is not None and self.bathrooms < 0:
             raise ValueError("Bathrooms cannot be negative")
     
+    @property
+    def rating_average(self) -> Optional[float]:
+        """Average rating (None when there are no ratings)"""
+        return round(self.rating_sum / self.rating_count, 2) if self.rating_count else None
+    
     def is_owned_by(self, user_id: int) -> bool:
         """Check if ad belongs to user"""
         return self.user_id == user_id
     
     def can_transition_to(self, new_status: AdStatus) -> bool:
         """Validate status transitions according to business rules"""
-        valid_transitions = {
-            AdStatus.DRAFT: [AdStatus.PUBLISHED, AdStatus.CANCELLED],
-            AdStatus.PUBLISHED: [AdStatus.RESERVED, AdStatus.CANCELLED],
-            AdStatus.RESERVED: [AdStatus.COMPLETED, AdStatus.PUBLISHED],
-            AdStatus.COMPLETED: [],
-            AdStatus.CANCELLED: [AdStatus.DRAFT, AdStatus.PUBLISHED]
-        }
-        return new_status in valid_transitions.get(self.status, [])
+        return new_status in VALID_TRANSITIONS.get(self.status, [])
     
     def change_status(self, new_status: AdStatus) -> None:
         """Change status with validation"""
@@ -1,6 +1,6 @@
 """Ad Repository Interface - Defines contract for ad persistence"""
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from app.domain.entities.ad import Ad, AdStatus
 
 
@@ -28,8 +28,14 @@ class IAdRepository(ABC):
         pass
     
     @abstractmethod
-    async def get_by_user(self, user_id: int) -> List[Ad]:
-        """Get all ads from a user"""
+    async def get_by_user(
+        self,
+        user_id: int,
+        status: Optional[AdStatus] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Ad], Optional[str]]:
+        """Get a page of a user's ads (newest first) and the next page cursor"""
         pass
     
     @abstractmethod
@@ -42,6 +48,25 @@ class IAdRepository(ABC):
         """Update existing ad"""
         pass
     
+    @abstractmethod
+    async def get_owners_and_statuses(self, ad_ids: List[int]) -> Dict[int, Tuple[int, AdStatus]]:
+        """Get (owner id, status) of each existing ad in ad_ids, in a single query"""
+        pass
+    
+    @abstractmethod
+    async def bulk_change_status(
+        self,
+        ad_ids_by_status: Dict[AdStatus, List[int]],
+        owner_id: int,
+        new_status: AdStatus
+    ) -> List[int]:
+        """Move the owner's ads to new_status in set-based updates
+        
+        Ads are grouped by their current status; an ad whose owner or status
+        changed in the meantime is left untouched. Returns the updated ids.
+        """
+        pass
+    
     @abstractmethod
     async def delete(self, ad_id: int) -> bool:
         """Delete ad"""
@@ -0,0 +1,11 @@
+"""Category Repository Interface"""
+from abc import ABC, abstractmethod
+
+
+class ICategoryRepository(ABC):
+    """Repository interface for categories (read-only for the ad flows)"""
+    
+    @abstractmethod
+    async def exists(self, category_id: int) -> bool:
+        """Check if a category exists"""
+        pass
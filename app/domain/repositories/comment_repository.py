@@ -1,6 +1,6 @@
 """Comment Repository Interface"""
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from app.domain.entities.comment import Comment
 
 
@@ -13,8 +13,13 @@ class ICommentRepository(ABC):
         pass
     
     @abstractmethod
-    async def get_by_ad(self, ad_id: int) -> List[Comment]:
-        """Get all comments for an ad"""
+    async def get_by_ad(
+        self,
+        ad_id: int,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Comment], Optional[str]]:
+        """Get a page of comments for an ad (newest first) and the next page cursor"""
         pass
     
     @abstractmethod
@@ -1,10 +1,16 @@
 """SQLAlchemy Ad Repository Implementation"""
 import json
-from typing import List, Optional
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from app.domain.entities.ad import Ad, AdStatus
 from app.domain.repositories.ad_repository import IAdRepository
 from app.db import models
+from app.db.counters import PUBLISHED, adjust_category_counts, record_listing_change, release_ad_ratings
+from app.core.archived_ads import AnyAd, delete_archived_ad, get_ad_or_archived
+from app.core.pagination import keyset_page
 
 
 class SQLAlchemyAdRepository(IAdRepository):
@@ -13,7 +19,7 @@ class SQLAlchemyAdRepository(IAdRepository):
     def __init__(self, db: Session):
         self._db = db
     
-    def _to_domain(self, db_ad: models.Ad) -> Ad:
+    def _to_domain(self, db_ad: AnyAd) -> Ad:
         """Convert ORM model to domain entity"""
         return Ad(
             id=db_ad.id,
@@ -35,7 +41,12 @@ class SQLAlchemyAdRepository(IAdRepository):
             status=AdStatus(db_ad.status),
             created_at=db_ad.created_at,
             updated_at=db_ad.updated_at,
-            published_at=db_ad.published_at
+            published_at=db_ad.published_at,
+            favorites_count=db_ad.favorites_count or 0,
+            comments_count=db_ad.comments_count or 0,
+            rating_sum=db_ad.rating_sum or 0,
+            rating_count=db_ad.rating_count or 0,
+            archived=isinstance(db_ad, models.ArchivedAd)
         )
     
     def _to_orm(self, ad: Ad) -> models.Ad:
@@ -62,8 +73,8 @@ class SQLAlchemyAdRepository(IAdRepository):
         )
     
     async def get_by_id(self, ad_id: int) -> Optional[Ad]:
-        """Get ad by ID"""
-        db_ad = self._db.query(models.Ad).filter(models.Ad.id == ad_id).first()
+        """Get ad by ID (falls back to ads_archive)"""
+        db_ad = get_ad_or_archived(self._db, ad_id)
         return self._to_domain(db_ad) if db_ad else None
     
     async def get_all(
@@ -100,18 +111,27 @@ class SQLAlchemyAdRepository(IAdRepository):
         
         return [self._to_domain(ad) for ad in db_ads]
     
-    async def get_by_user(self, user_id: int) -> List[Ad]:
-        """Get all ads from a user"""
-        db_ads = self._db.query(models.Ad).filter(
-            models.Ad.user_id == user_id
-        ).order_by(models.Ad.created_at.desc()).all()
-        
-        return [self._to_domain(ad) for ad in db_ads]
+    async def get_by_user(
+        self,
+        user_id: int,
+        status: Optional[AdStatus] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Ad], Optional[str]]:
+        """Get a page of a user's ads (keyset on created_at/id)"""
+        query = self._db.query(models.Ad).filter(models.Ad.user_id == user_id)
+        if status:
+            query = query.filter(models.Ad.status == status.value)
+        db_ads, next_cursor = keyset_page(
+            query, models.Ad.created_at, models.Ad.id, limit, cursor
+        )
+        return [self._to_domain(ad) for ad in db_ads], next_cursor
     
     async def create(self, ad: Ad) -> Ad:
         """Create new ad"""
         db_ad = self._to_orm(ad)
         self._db.add(db_ad)
+        record_listing_change(self._db, new_status=db_ad.status, new_category_id=db_ad.category_id)
         self._db.commit()
         self._db.refresh(db_ad)
         return self._to_domain(db_ad)
@@ -120,6 +140,7 @@ class SQLAlchemyAdRepository(IAdRepository):
         """Update existing ad"""
         db_ad = self._db.query(models.Ad).filter(models.Ad.id == ad.id).first()
         if db_ad:
+            record_listing_change(self._db, db_ad.status, db_ad.category_id, ad.status, ad.category_id)
             # Update fields
             db_ad.title = ad.title
             db_ad.description = ad.description
@@ -142,10 +163,64 @@ class SQLAlchemyAdRepository(IAdRepository):
             return self._to_domain(db_ad)
         return ad
     
+    async def get_owners_and_statuses(self, ad_ids: List[int]) -> Dict[int, Tuple[int, AdStatus]]:
+        """Get (owner id, status) of each existing ad, without loading full rows"""
+        rows = self._db.execute(
+            select(models.Ad.id, models.Ad.user_id, models.Ad.status)
+            .where(models.Ad.id.in_(ad_ids))
+        ).all()
+        return {ad_id: (user_id, AdStatus(status)) for ad_id, user_id, status in rows}
+    
+    async def bulk_change_status(
+        self,
+        ad_ids_by_status: Dict[AdStatus, List[int]],
+        owner_id: int,
+        new_status: AdStatus
+    ) -> List[int]:
+        """One UPDATE ... RETURNING per current status, all in one transaction"""
+        now = datetime.utcnow()
+        values = {"status": new_status.value, "updated_at": now}
+        if new_status == AdStatus.PUBLISHED:
+            values["published_at"] = now
+        
+        updated: List[int] = []
+        category_deltas: Dict[int, int] = defaultdict(int)
+        for old_status, ad_ids in ad_ids_by_status.items():
+            if not ad_ids:
+                continue
+            # The status/owner guard keeps concurrent changes from being overwritten
+            rows = self._db.execute(
+                update(models.Ad)
+                .where(
+                    models.Ad.id.in_(ad_ids),
+                    models.Ad.user_id == owner_id,
+                    models.Ad.status == old_status.value
+                )
+                .values(values)
+                .returning(models.Ad.id, models.Ad.category_id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            for ad_id, category_id in rows:
+                updated.append(ad_id)
+                if old_status.value == PUBLISHED:
+                    category_deltas[category_id] -= 1
+                if new_status.value == PUBLISHED:
+                    category_deltas[category_id] += 1
+        
+        adjust_category_counts(self._db, category_deltas)
+        self._db.commit()
+        return updated
+    
     async def delete(self, ad_id: int) -> bool:
-        """Delete ad"""
-        db_ad = self._db.query(models.Ad).filter(models.Ad.id == ad_id).first()
+        """Delete ad (active or archived)"""
+        db_ad = get_ad_or_archived(self._db, ad_id)
+        if isinstance(db_ad, models.ArchivedAd):
+            delete_archived_ad(self._db, db_ad)
+            self._db.commit()
+            return True
         if db_ad:
+            release_ad_ratings(self._db, db_ad)
+            record_listing_change(self._db, old_status=db_ad.status, old_category_id=db_ad.category_id)
             self._db.delete(db_ad)
             self._db.commit()
             return True
@@ -0,0 +1,16 @@
+"""Category Repository backed by the in-memory category registry"""
+from sqlalchemy.orm import Session
+from app.core.category_registry import CategoryRegistry, category_registry
+from app.domain.repositories.category_repository import ICategoryRepository
+
+
+class RegistryCategoryRepository(ICategoryRepository):
+    """Answers from the process-wide registry; the session is only used for version checks"""
+    
+    def __init__(self, db: Session, registry: CategoryRegistry = category_registry):
+        self._db = db
+        self._registry = registry
+    
+    async def exists(self, category_id: int) -> bool:
+        """Check if a category exists"""
+        return self._registry.exists(self._db, category_id)
@@ -1,9 +1,11 @@
 """SQLAlchemy Comment Repository Implementation"""
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
 from app.domain.entities.comment import Comment
 from app.domain.repositories.comment_repository import ICommentRepository
 from app.db import models
+from app.db.counters import record_comment_change
+from app.core.pagination import keyset_page
 
 
 class SQLAlchemyCommentRepository(ICommentRepository):
@@ -41,18 +43,25 @@ class SQLAlchemyCommentRepository(ICommentRepository):
         ).first()
         return self._to_domain(db_comment) if db_comment else None
     
-    async def get_by_ad(self, ad_id: int) -> List[Comment]:
-        """Get all comments for an ad"""
-        db_comments = self._db.query(models.Comment).filter(
-            models.Comment.ad_id == ad_id
-        ).order_by(models.Comment.created_at.desc()).all()
-        
-        return [self._to_domain(c) for c in db_comments]
+    async def get_by_ad(
+        self,
+        ad_id: int,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Comment], Optional[str]]:
+        """Get a page of comments for an ad (keyset on created_at/id)"""
+        query = self._db.query(models.Comment).filter(models.Comment.ad_id == ad_id)
+        db_comments, next_cursor = keyset_page(
+            query, models.Comment.created_at, models.Comment.id, limit, cursor
+        )
+        return [self._to_domain(c) for c in db_comments], next_cursor
     
     async def create(self, comment: Comment) -> Comment:
         """Create new comment"""
         db_comment = self._to_orm(comment)
         self._db.add(db_comment)
+        # Counters change in the same transaction as the comment
+        record_comment_change(self._db, db_comment.ad_id, None, db_comment.rating, comments=1)
         self._db.commit()
         self._db.refresh(db_comment)
         return self._to_domain(db_comment)
@@ -63,6 +72,7 @@ class SQLAlchemyCommentRepository(ICommentRepository):
             models.Comment.id == comment.id
         ).first()
         if db_comment:
+            record_comment_change(self._db, db_comment.ad_id, db_comment.rating, comment.rating)
             db_comment.content = comment.content
             db_comment.rating = comment.rating
             
@@ -77,6 +87,7 @@ class SQLAlchemyCommentRepository(ICommentRepository):
             models.Comment.id == comment_id
         ).first()
         if db_comment:
+            record_comment_change(self._db, db_comment.ad_id, db_comment.rating, None, comments=-1)
             self._db.delete(db_comment)
             self._db.commit()
             return True
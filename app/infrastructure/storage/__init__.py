@@ -0,0 +1,47 @@
+"""Upload storage backends - local filesystem or S3-compatible object storage"""
+from functools import lru_cache
+from pathlib import Path
+
+from app.core.config import settings
+from app.infrastructure.storage.base import IFileStorage, PresignedUpload, StoredObject
+
+
+TMP_DIR_NAME = ".tmp"
+
+
+def temp_dir() -> Path:
+    """Directory for temporary upload files (same filesystem as local storage)"""
+    path = Path(settings.UPLOAD_TMP_DIR) if settings.UPLOAD_TMP_DIR else Path(settings.UPLOAD_DIR) / TMP_DIR_NAME
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _s3_public_url() -> str:
+    """Public base URL for objects: CDN if configured, else the bucket itself"""
+    if settings.S3_PUBLIC_URL:
+        return settings.S3_PUBLIC_URL
+    if settings.S3_ENDPOINT_URL:
+        return f"{settings.S3_ENDPOINT_URL.rstrip('/')}/{settings.S3_BUCKET}"
+    region = settings.S3_REGION or "us-east-1"
+    return f"https://{settings.S3_BUCKET}.s3.{region}.amazonaws.com"
+
+
+@lru_cache
+def get_storage() -> IFileStorage:
+    """Process-wide storage selected by STORAGE_BACKEND"""
+    if settings.STORAGE_BACKEND == "s3":
+        from app.infrastructure.storage.s3 import S3FileStorage
+        return S3FileStorage(
+            bucket=settings.S3_BUCKET,
+            public_url=_s3_public_url(),
+            endpoint_url=settings.S3_ENDPOINT_URL or None,
+            region=settings.S3_REGION or None,
+            access_key_id=settings.S3_ACCESS_KEY_ID or None,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY or None
+        )
+    
+    from app.infrastructure.storage.local import LocalFileStorage
+    return LocalFileStorage(Path(settings.UPLOAD_DIR))
+
+
+__all__ = ["IFileStorage", "PresignedUpload", "StoredObject", "get_storage", "temp_dir"]
@@ -0,0 +1,86 @@
+"""File Storage Interface - Defines contract for upload blob persistence"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional
+
+
+@dataclass
+class StoredObject:
+    """Object listed from the storage backend"""
+    key: str
+    size: int
+    modified: float  # Unix timestamp
+
+
+@dataclass
+class PresignedUpload:
+    """Instructions for a direct-to-storage upload"""
+    key: str
+    url: str
+    method: str = "PUT"
+    headers: Dict[str, str] = field(default_factory=dict)
+    expires_in: int = 0
+
+
+class IFileStorage(ABC):
+    """Storage interface for uploaded files - keys are relative paths like 'ab/cd/<hash>.jpg'"""
+    
+    #: Prefix of the public URLs of stored objects (e.g. '/uploads/')
+    url_prefix: str = ""
+    
+    def url_for(self, key: str) -> str:
+        """Public URL of an object"""
+        return f"{self.url_prefix}{key}"
+    
+    def key_from_url(self, url: str) -> Optional[str]:
+        """Key of an object from its public URL (None if not managed by this storage)"""
+        if isinstance(url, str) and url.startswith(self.url_prefix):
+            return url[len(self.url_prefix):]
+        return None
+    
+    @abstractmethod
+    def put_file(self, key: str, path: Path, content_type: Optional[str] = None) -> None:
+        """Store a local file under `key` (the local file is consumed)"""
+        pass
+    
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """Open an object for reading (seekable)"""
+        pass
+    
+    def read_head(self, key: str, length: int) -> bytes:
+        """First `length` bytes of an object"""
+        with self.open(key) as f:
+            return f.read(length)
+    
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Check if an object exists"""
+        pass
+    
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Delete an object, returns False if it did not exist"""
+        pass
+    
+    @abstractmethod
+    def touch(self, key: str) -> None:
+        """Refresh the object's modification time"""
+        pass
+    
+    @abstractmethod
+    def iter_objects(self, after: str = "") -> Iterator[StoredObject]:
+        """Iterate over objects in a stable order, resuming after key `after`"""
+        pass
+    
+    def presign_upload(
+        self,
+        key: str,
+        content_type: str,
+        content_length: int,
+        checksum_sha256: str,
+        expires_in: int
+    ) -> PresignedUpload:
+        """Presigned direct upload (not every backend supports it)"""
+        raise NotImplementedError("Storage backend does not support direct uploads")
@@ -0,0 +1,76 @@
+"""Local filesystem storage - Files served by the app itself under /uploads"""
+import os
+import shutil
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from app.infrastructure.storage.base import IFileStorage, StoredObject
+
+
+class LocalFileStorage(IFileStorage):
+    """Concrete storage writing to a local directory"""
+    
+    url_prefix = "/uploads/"
+    
+    def __init__(self, root: Path):
+        self.root = root
+    
+    def _path(self, key: str) -> Path:
+        """Resolve key inside the root directory, rejecting path traversal"""
+        root = self.root.resolve()
+        path = (root / key).resolve()
+        if root not in path.parents:
+            raise ValueError("Caminho de arquivo inválido")
+        return path
+    
+    def put_file(self, key: str, path: Path, content_type: Optional[str] = None) -> None:
+        """Move the file into place (atomic rename when on the same filesystem)"""
+        target = self._path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(path, target)
+        except OSError:
+            shutil.move(str(path), str(target))
+    
+    def open(self, key: str) -> BinaryIO:
+        return self._path(key).open("rb")
+    
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+    
+    def delete(self, key: str) -> bool:
+        try:
+            self._path(key).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+    
+    def touch(self, key: str) -> None:
+        os.utime(self._path(key))
+    
+    def iter_objects(self, after: str = "") -> Iterator[StoredObject]:
+        """Walk the tree in lexicographic order, only descending into unvisited directories"""
+        def walk(directory: str, prefix: Tuple[str, ...], after: Tuple[str, ...]):
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+            for entry in entries:
+                if after and entry.name < after[0]:
+                    continue
+                resume = after[1:] if after and entry.name == after[0] else ()
+                if entry.is_dir(follow_symlinks=False):
+                    yield from walk(entry.path, prefix + (entry.name,), resume)
+                elif entry.is_file(follow_symlinks=False):
+                    if after and entry.name == after[0]:
+                        continue  # The cursor itself, already visited
+                    try:
+                        stat_result = entry.stat(follow_symlinks=False)
+                    except FileNotFoundError:
+                        continue
+                    yield StoredObject(
+                        key="/".join(prefix + (entry.name,)),
+                        size=stat_result.st_size,
+                        modified=stat_result.st_mtime
+                    )
+        
+        if self.root.is_dir():
+            yield from walk(str(self.root), (), tuple(after.split("/")) if after else ())
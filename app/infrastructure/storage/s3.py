@@ -0,0 +1,153 @@
+"""S3-compatible storage (AWS S3, MinIO, ...) - Bytes never flow through the API workers"""
+import base64
+import io
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+from app.infrastructure.storage.base import IFileStorage, PresignedUpload, StoredObject
+
+# Objects are content-addressed, so they can be cached forever
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+LIST_PAGE_SIZE = 1000
+
+
+class S3FileStorage(IFileStorage):
+    """Concrete storage backed by an S3-compatible bucket"""
+    
+    def __init__(
+        self,
+        bucket: str,
+        public_url: str,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        client=None
+    ):
+        if client is None:
+            try:
+                import boto3  # Optional dependency, only needed for this backend
+            except ImportError as e:
+                raise RuntimeError(
+                    "STORAGE_BACKEND=s3 requer o pacote boto3 (pip install boto3)"
+                ) from e
+            client = boto3.client(
+                "s3",
+                endpoint_url=endpoint_url,
+                region_name=region,
+                aws_access_key_id=access_key_id,
+                aws_secret_access_key=secret_access_key
+            )
+        self._client = client
+        self.bucket = bucket
+        self.url_prefix = public_url.rstrip("/") + "/"
+    
+    def _is_missing(self, error) -> bool:
+        code = error.response.get("Error", {}).get("Code")
+        return code in ("404", "NoSuchKey", "NotFound")
+    
+    def put_file(self, key: str, path: Path, content_type: Optional[str] = None) -> None:
+        extra_args = {"CacheControl": CACHE_CONTROL}
+        if content_type:
+            extra_args["ContentType"] = content_type
+        self._client.upload_file(str(path), self.bucket, key, ExtraArgs=extra_args)
+        Path(path).unlink(missing_ok=True)
+    
+    def open(self, key: str) -> BinaryIO:
+        # Images are small (<= 5MB); buffering gives Pillow the seekable file it needs
+        body = self._client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        try:
+            return io.BytesIO(body.read())
+        finally:
+            body.close()
+    
+    def read_head(self, key: str, length: int) -> bytes:
+        # Ranged GET: inspecting a header does not download the whole object
+        body = self._client.get_object(
+            Bucket=self.bucket, Key=key, Range=f"bytes=0-{length - 1}"
+        )["Body"]
+        try:
+            return body.read()
+        finally:
+            body.close()
+    
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if self._is_missing(e):
+                return False
+            raise
+    
+    def delete(self, key: str) -> bool:
+        if not self.exists(key):
+            return False
+        self._client.delete_object(Bucket=self.bucket, Key=key)
+        return True
+    
+    def touch(self, key: str) -> None:
+        # Server-side copy onto itself refreshes LastModified without moving bytes through us
+        head = self._client.head_object(Bucket=self.bucket, Key=key)
+        self._client.copy_object(
+            Bucket=self.bucket,
+            Key=key,
+            CopySource={"Bucket": self.bucket, "Key": key},
+            MetadataDirective="REPLACE",
+            ContentType=head.get("ContentType", "application/octet-stream"),
+            CacheControl=CACHE_CONTROL,
+            Metadata=head.get("Metadata", {})
+        )
+    
+    def iter_objects(self, after: str = "") -> Iterator[StoredObject]:
+        """S3 lists keys in lexicographic order; StartAfter resumes the walk"""
+        paginator = self._client.get_paginator("list_objects_v2")
+        params = {"Bucket": self.bucket, "PaginationConfig": {"PageSize": LIST_PAGE_SIZE}}
+        if after:
+            params["StartAfter"] = after
+        for page in paginator.paginate(**params):
+            for item in page.get("Contents", []):
+                yield StoredObject(
+                    key=item["Key"],
+                    size=item["Size"],
+                    modified=item["LastModified"].timestamp()
+                )
+    
+    def presign_upload(
+        self,
+        key: str,
+        content_type: str,
+        content_length: int,
+        checksum_sha256: str,
+        expires_in: int
+    ) -> PresignedUpload:
+        """Presigned PUT bound to the exact size, type and SHA-256 of the content
+        
+        The storage rejects bodies whose checksum differs, so the content-addressed
+        key can be trusted without the bytes passing through the API.
+        """
+        checksum_b64 = base64.b64encode(bytes.fromhex(checksum_sha256)).decode()
+        url = self._client.generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": key,
+                "ContentType": content_type,
+                "ContentLength": content_length,
+                "CacheControl": CACHE_CONTROL,
+                "ChecksumSHA256": checksum_b64
+            },
+            ExpiresIn=expires_in
+        )
+        return PresignedUpload(
+            key=key,
+            url=url,
+            method="PUT",
+            headers={
+                "Content-Type": content_type,
+                "Cache-Control": CACHE_CONTROL,
+                "x-amz-checksum-sha256": checksum_b64
+            },
+            expires_in=expires_in
+        )
@@ -0,0 +1,51 @@
+"""Jobs de manutenção em segundo plano (também executáveis via `python -m app.jobs.<job>`)"""
+from app.core.config import settings
+from app.jobs.scheduler import JobScheduler, PeriodicJob
+
+
+def register_jobs(scheduler: JobScheduler) -> None:
+    """Registra os jobs periódicos habilitados nas configurações"""
+    if settings.UPLOAD_GC_ENABLED:
+        from app.jobs.upload_gc import run_upload_gc
+        scheduler.register(PeriodicJob(
+            name="upload_gc",
+            func=run_upload_gc,
+            interval_seconds=settings.UPLOAD_GC_INTERVAL_SECONDS,
+            initial_delay_seconds=60,
+        ))
+
+    if settings.COUNTER_RECONCILE_ENABLED:
+        from app.jobs.counter_reconcile import run_counter_reconcile
+        scheduler.register(PeriodicJob(
+            name="counter_reconcile",
+            func=run_counter_reconcile,
+            interval_seconds=settings.COUNTER_RECONCILE_INTERVAL_SECONDS,
+            initial_delay_seconds=300,
+        ))
+
+    if settings.ACCOUNT_PURGE_ENABLED:
+        from app.jobs.account_purge import run_account_purge
+        scheduler.register(PeriodicJob(
+            name="account_purge",
+            func=run_account_purge,
+            interval_seconds=settings.ACCOUNT_PURGE_INTERVAL_SECONDS,
+            initial_delay_seconds=30,
+        ))
+
+    if settings.AD_EXPIRY_ENABLED:
+        from app.jobs.ad_expiry import run_ad_expiry
+        scheduler.register(PeriodicJob(
+            name="ad_expiry",
+            func=run_ad_expiry,
+            interval_seconds=settings.AD_EXPIRY_INTERVAL_SECONDS,
+            initial_delay_seconds=120,
+        ))
+
+    if settings.AD_ARCHIVE_ENABLED:
+        from app.jobs.ad_archive import run_ad_archive
+        scheduler.register(PeriodicJob(
+            name="ad_archive",
+            func=run_ad_archive,
+            interval_seconds=settings.AD_ARCHIVE_INTERVAL_SECONDS,
+            initial_delay_seconds=600,
+        ))
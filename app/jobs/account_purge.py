@@ -0,0 +1,212 @@
+"""Exclusão de contas em segundo plano, em lotes pequenos
+
+`DELETE /api/users/me` só desativa a conta (`is_active = False`) e marca o
+pedido de exclusão (`deletion_requested_at`): o login e os tokens deixam de
+valer na hora. Só as contas marcadas são apagadas (uma conta apenas
+desativada continua intacta). Este job apaga depois os dados da conta em
+transações curtas, com pausa entre elas, para que uma conta grande não
+segure o lock de escrita do SQLite e bloqueie as outras escritas:
+
+1. anúncios, ativos e arquivados (e os comentários/favoritos de terceiros
+   neles), para que saiam das listagens o quanto antes;
+2. comentários do usuário em anúncios de terceiros (descontando os contadores);
+3. favoritos do usuário (descontando os contadores);
+4. a própria conta.
+
+Cada lote é independente: se o processo cair no meio, a próxima execução
+continua de onde parou. As imagens dos anúncios não são apagadas aqui: sem
+referências, a coleta de órfãos (app.jobs.upload_gc) as remove depois do
+prazo de carência, como qualquer upload descartado.
+
+Uso manual:
+    python -m app.jobs.account_purge
+"""
+import argparse
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, List
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.db.counters import release_comments, release_favorites, release_listings
+from app.db.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PurgeReport:
+    """Resultado de uma execução"""
+    accounts: int = 0
+    ads: int = 0
+    comments: int = 0
+    favorites: int = 0
+
+
+def _pending_filter():
+    """Exclusão pedida e conta ainda desativada"""
+    return models.User.deletion_requested_at.isnot(None), models.User.is_active.is_(False)
+
+
+def pending_accounts(db: Session) -> List[int]:
+    """Contas com exclusão pedida (`DELETE /api/users/me`) aguardando a limpeza"""
+    return list(db.scalars(
+        select(models.User.id).where(*_pending_filter()).order_by(models.User.id)
+    ))
+
+
+class AccountPurger:
+    """Apaga os dados das contas com exclusão pedida, um lote (e uma transação) por vez"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: int = 200,
+        pause_seconds: float = 0.05,
+    ):
+        self._session_factory = session_factory
+        self._batch_size = batch_size
+        self._pause_seconds = pause_seconds
+
+    def run_once(self) -> PurgeReport:
+        """Apaga todas as contas pendentes"""
+        report = PurgeReport()
+        db = self._session_factory()
+        try:
+            user_ids = pending_accounts(db)
+        finally:
+            db.close()
+        for user_id in user_ids:
+            self.purge_account(user_id, report)
+        return report
+
+    def purge_account(self, user_id: int, report: PurgeReport) -> None:
+        """Apaga os dados de uma conta e, por último, a própria conta"""
+        for step in (self._purge_ads, self._purge_archived_ads, self._purge_comments, self._purge_favorites):
+            while self._run_batch(step, user_id, report):
+                time.sleep(self._pause_seconds)
+
+        with self._session_factory() as db:
+            # Só apaga se o pedido continuar valendo (nada a fazer se já tiver sumido)
+            result = db.execute(
+                delete(models.User)
+                .where(models.User.id == user_id, *_pending_filter())
+            )
+            db.commit()
+        report.accounts += result.rowcount
+
+    def _run_batch(self, step, user_id: int, report: PurgeReport) -> bool:
+        with self._session_factory() as db:
+            more = step(db, user_id, report)
+            db.commit()
+        return more
+
+    def _purge_ads(self, db: Session, user_id: int, report: PurgeReport) -> bool:
+        return self._purge_ads_from(models.Ad, db, user_id, report)
+
+    def _purge_archived_ads(self, db: Session, user_id: int, report: PurgeReport) -> bool:
+        return self._purge_ads_from(models.ArchivedAd, db, user_id, report)
+
+    def _purge_ads_from(self, model, db: Session, user_id: int, report: PurgeReport) -> bool:
+        """Um lote de anúncios de `model`: primeiro os filhos (em lotes), depois os anúncios"""
+        rows = db.execute(
+            select(model.id, model.status, model.category_id)
+            .where(model.user_id == user_id)
+            .order_by(model.id)
+            .limit(self._batch_size)
+        ).all()
+        if not rows:
+            return False
+        ad_ids = [row.id for row in rows]
+
+        # Comentários de terceiros nesses anúncios podem ser muitos: lotes próprios.
+        # Contadores dos anúncios e o histograma do dono não importam (ambos somem).
+        while True:
+            comment_ids = list(db.scalars(
+                select(models.Comment.id)
+                .where(models.Comment.ad_id.in_(ad_ids))
+                .limit(self._batch_size)
+            ))
+            if not comment_ids:
+                break
+            db.execute(delete(models.Comment).where(models.Comment.id.in_(comment_ids)))
+            db.commit()
+            time.sleep(self._pause_seconds)
+
+        favorites = models.favorites_table
+        db.execute(delete(favorites).where(favorites.c.ad_id.in_(ad_ids)))
+        release_listings(db, [(row.status, row.category_id) for row in rows])
+        db.execute(
+            delete(model)
+            .where(model.id.in_(ad_ids))
+            .execution_options(synchronize_session=False)
+        )
+        report.ads += len(ad_ids)
+        return len(rows) == self._batch_size
+
+    def _purge_comments(self, db: Session, user_id: int, report: PurgeReport) -> bool:
+        """Um lote de comentários do usuário em anúncios de terceiros"""
+        rows = db.execute(
+            select(models.Comment.id, models.Comment.ad_id, models.Comment.rating)
+            .where(models.Comment.user_id == user_id)
+            .order_by(models.Comment.id)
+            .limit(self._batch_size)
+        ).all()
+        if not rows:
+            return False
+        release_comments(db, [(ad_id, rating, 1) for _, ad_id, rating in rows])
+        db.execute(delete(models.Comment).where(models.Comment.id.in_([row[0] for row in rows])))
+        report.comments += len(rows)
+        return len(rows) == self._batch_size
+
+    def _purge_favorites(self, db: Session, user_id: int, report: PurgeReport) -> bool:
+        """Um lote de favoritos do usuário"""
+        favorites = models.favorites_table
+        ad_ids = list(db.scalars(
+            select(favorites.c.ad_id)
+            .where(favorites.c.user_id == user_id)
+            .order_by(favorites.c.ad_id)
+            .limit(self._batch_size)
+        ))
+        if not ad_ids:
+            return False
+        release_favorites(db, ad_ids)
+        db.execute(delete(favorites).where(favorites.c.user_id == user_id, favorites.c.ad_id.in_(ad_ids)))
+        report.favorites += len(ad_ids)
+        return len(ad_ids) == self._batch_size
+
+
+def run_account_purge() -> PurgeReport:
+    """Ponto de entrada do agendador"""
+    report = AccountPurger(
+        batch_size=settings.ACCOUNT_PURGE_BATCH_SIZE,
+        pause_seconds=settings.ACCOUNT_PURGE_PAUSE_SECONDS,
+    ).run_once()
+    if report.accounts:
+        logger.info(
+            "Exclusão de contas: %d conta(s), %d anúncio(s), %d comentário(s), %d favorito(s)",
+            report.accounts, report.ads, report.comments, report.favorites
+        )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apaga os dados das contas com exclusão pedida")
+    parser.add_argument("--batch-size", type=int, default=settings.ACCOUNT_PURGE_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=settings.ACCOUNT_PURGE_PAUSE_SECONDS)
+    args = parser.parse_args()
+
+    report = AccountPurger(
+        batch_size=args.batch_size,
+        pause_seconds=args.pause,
+    ).run_once()
+    print(f"Contas apagadas: {report.accounts}")
+    print(f"Anúncios: {report.ads} | Comentários: {report.comments} | Favoritos: {report.favorites}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Arquivamento de anúncios concluídos/cancelados antigos (`ads` → `ads_archive`)
+
+Anúncios em estado final ficariam em `ads` para sempre, e os índices e as
+varreduras da tabela cresceriam com o histórico. Este job move para
+`ads_archive` os concluídos/cancelados sem alteração há mais de
+`AD_ARCHIVE_MIN_AGE_DAYS` dias, em lotes pequenos com uma transação cada:
+`INSERT ... SELECT` copia as linhas (com o mesmo id) para o arquivo e só as
+copiadas saem de `ads`, na mesma transação. Os favoritos desses anúncios são
+descartados; os comentários ficam em `comments` (sem chave estrangeira para
+`ads` desde a migração v0008, então nada é apagado em cascata). A leitura por
+id e `/api/ads/me` enxergam também o arquivo; editar ou mudar o status de um
+arquivado responde 409 e apagá-lo remove também os comentários.
+
+Uso manual:
+    python -m app.jobs.ad_archive            # arquiva
+    python -m app.jobs.ad_archive --dry-run  # só conta
+"""
+import argparse
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable
+
+from sqlalchemy import delete, exists, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.archived_ads import TERMINAL_STATUSES
+from app.core.config import settings
+from app.db import models
+from app.db.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ArchiveReport:
+    """Resultado de uma execução"""
+    archived: int = 0
+    favorites: int = 0
+    batches: int = 0
+
+
+def _archivable_filter(cutoff: datetime):
+    ad = models.Ad
+    archive = models.ArchivedAd
+    return (
+        ad.status.in_(TERMINAL_STATUSES),
+        func.coalesce(ad.updated_at, ad.created_at) < cutoff,
+        # Ids de `ads` nunca são reaproveitados (AUTOINCREMENT, migração v0007);
+        # ainda assim, nunca sobrescreve o arquivo
+        ~exists().where(archive.id == ad.id),
+    )
+
+
+def count_archivable(db: Session, cutoff: datetime) -> int:
+    return db.scalar(select(func.count()).select_from(models.Ad).where(*_archivable_filter(cutoff)))
+
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int, report: ArchiveReport) -> int:
+    """Move um lote para o arquivo (sem commit)"""
+    ad_ids = list(db.scalars(
+        select(models.Ad.id).where(*_archivable_filter(cutoff)).order_by(models.Ad.id).limit(batch_size)
+    ))
+    if not ad_ids:
+        return 0
+
+    # INSERT ... SELECT copia os valores como estão no banco (as datas mantêm o
+    # formato original, do qual depende a paginação por cursor no SQLite)
+    ad = models.Ad.__table__
+    archive = models.ArchivedAd.__table__
+    columns = [column.name for column in ad.columns]
+    db.execute(
+        insert(archive).from_select(
+            columns,
+            select(*ad.columns).where(ad.c.id.in_(ad_ids), ad.c.status.in_(TERMINAL_STATUSES)),
+        )
+    )
+    archived_ids = list(db.scalars(select(archive.c.id).where(archive.c.id.in_(ad_ids))))
+    if not archived_ids:
+        return 0
+
+    favorites = models.favorites_table
+    report.favorites += db.execute(delete(favorites).where(favorites.c.ad_id.in_(archived_ids))).rowcount
+    db.execute(delete(ad).where(ad.c.id.in_(archived_ids), ad.c.status.in_(TERMINAL_STATUSES)))
+    return len(archived_ids)
+
+
+def archive_ads(
+    min_age_days: float,
+    batch_size: int = 200,
+    pause_seconds: float = 0.05,
+    session_factory: Callable[[], Session] = SessionLocal,
+    dry_run: bool = False,
+) -> ArchiveReport:
+    """Arquiva todos os anúncios em estado final sem alteração há mais de `min_age_days` dias"""
+    cutoff = datetime.utcnow() - timedelta(days=min_age_days)
+    report = ArchiveReport()
+
+    if dry_run:
+        with session_factory() as db:
+            report.archived = count_archivable(db, cutoff)
+        return report
+
+    while True:
+        with session_factory() as db:
+            archived = archive_batch(db, cutoff, batch_size, report)
+            db.commit()
+        if not archived:
+            break
+        report.archived += archived
+        report.batches += 1
+        if archived < batch_size:
+            break
+        time.sleep(pause_seconds)
+    return report
+
+
+def run_ad_archive() -> ArchiveReport:
+    """Ponto de entrada do agendador"""
+    report = archive_ads(
+        min_age_days=settings.AD_ARCHIVE_MIN_AGE_DAYS,
+        batch_size=settings.AD_ARCHIVE_BATCH_SIZE,
+        pause_seconds=settings.AD_ARCHIVE_PAUSE_SECONDS,
+    )
+    if report.archived:
+        logger.info("Arquivamento de anúncios: %d anúncio(s) em %d lote(s)", report.archived, report.batches)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move anúncios concluídos/cancelados antigos para o arquivo")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas conta, não move")
+    parser.add_argument("--min-age-days", type=float, default=settings.AD_ARCHIVE_MIN_AGE_DAYS)
+    parser.add_argument("--batch-size", type=int, default=settings.AD_ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=settings.AD_ARCHIVE_PAUSE_SECONDS)
+    args = parser.parse_args()
+
+    report = archive_ads(
+        min_age_days=args.min_age_days,
+        batch_size=args.batch_size,
+        pause_seconds=args.pause,
+        dry_run=args.dry_run,
+    )
+    if args.dry_run:
+        print(f"Anúncios que seriam arquivados: {report.archived}")
+    else:
+        print(f"Anúncios arquivados: {report.archived} ({report.batches} lote(s))")
+        print(f"Favoritos descartados: {report.favorites}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Expiração automática de anúncios publicados há muito tempo
+
+Anúncios esquecidos em `published` entram em toda listagem e aumentam o
+conjunto varrido pelas consultas. Este job move para `cancelled` (transição
+permitida a partir de `published` em app.domain.entities.ad) os anúncios
+publicados há mais de `AD_EXPIRY_MAX_AGE_DAYS` dias, em lotes pequenos com
+uma transação cada. A idade conta a partir de `published_at` (última
+publicação) ou, se o anúncio nunca foi republicado, de `created_at`.
+O dono pode republicá-lo depois (`cancelled` → `published`).
+
+Uso manual:
+    python -m app.jobs.ad_expiry            # expira os anúncios antigos
+    python -m app.jobs.ad_expiry --dry-run  # só conta
+"""
+import argparse
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.db.counters import adjust_category_counts
+from app.db.database import SessionLocal
+from app.domain.entities.ad import AdStatus, VALID_TRANSITIONS
+
+logger = logging.getLogger(__name__)
+
+EXPIRED_STATUS = AdStatus.CANCELLED
+
+
+@dataclass
+class ExpiryReport:
+    """Resultado de uma execução"""
+    expired: int = 0
+    batches: int = 0
+
+
+def _stale_filter(cutoff: datetime):
+    """Publicados cuja última publicação (ou criação) é anterior a `cutoff`"""
+    return and_(
+        models.Ad.status == AdStatus.PUBLISHED.value,
+        or_(
+            models.Ad.published_at < cutoff,
+            and_(models.Ad.published_at.is_(None), models.Ad.created_at < cutoff),
+        ),
+    )
+
+
+def count_stale(db: Session, cutoff: datetime) -> int:
+    return db.scalar(select(func.count()).select_from(models.Ad).where(_stale_filter(cutoff)))
+
+
+def expire_batch(db: Session, cutoff: datetime, batch_size: int, now: Optional[datetime] = None) -> int:
+    """Expira um lote e ajusta as contagens por categoria (sem commit)"""
+    ad_ids = list(db.scalars(
+        select(models.Ad.id).where(_stale_filter(cutoff)).order_by(models.Ad.id).limit(batch_size)
+    ))
+    if not ad_ids:
+        return 0
+    now = now or datetime.utcnow()
+    # Repete a condição de status: um anúncio alterado entre o SELECT e o UPDATE fica como está
+    rows = db.execute(
+        update(models.Ad)
+        .where(models.Ad.id.in_(ad_ids), models.Ad.status == AdStatus.PUBLISHED.value)
+        .values(status=EXPIRED_STATUS.value, updated_at=now)
+        .returning(models.Ad.category_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    deltas: Dict[int, int] = defaultdict(int)
+    for (category_id,) in rows:
+        deltas[category_id] -= 1
+    adjust_category_counts(db, deltas)
+    return len(rows)
+
+
+def expire_stale_ads(
+    max_age_days: float,
+    batch_size: int = 200,
+    pause_seconds: float = 0.05,
+    session_factory: Callable[[], Session] = SessionLocal,
+    dry_run: bool = False,
+) -> ExpiryReport:
+    """Expira todos os anúncios publicados há mais de `max_age_days` dias"""
+    if EXPIRED_STATUS not in VALID_TRANSITIONS[AdStatus.PUBLISHED]:
+        raise ValueError(f"Transição published → {EXPIRED_STATUS.value} não é permitida")
+    cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+    report = ExpiryReport()
+
+    if dry_run:
+        with session_factory() as db:
+            report.expired = count_stale(db, cutoff)
+        return report
+
+    while True:
+        with session_factory() as db:
+            expired = expire_batch(db, cutoff, batch_size)
+            db.commit()
+        if not expired:
+            break
+        report.expired += expired
+        report.batches += 1
+        if expired < batch_size:
+            break
+        time.sleep(pause_seconds)
+    return report
+
+
+def run_ad_expiry() -> ExpiryReport:
+    """Ponto de entrada do agendador"""
+    report = expire_stale_ads(
+        max_age_days=settings.AD_EXPIRY_MAX_AGE_DAYS,
+        batch_size=settings.AD_EXPIRY_BATCH_SIZE,
+        pause_seconds=settings.AD_EXPIRY_PAUSE_SECONDS,
+    )
+    if report.expired:
+        logger.info("Expiração de anúncios: %d anúncio(s) em %d lote(s)", report.expired, report.batches)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Expira anúncios publicados há muito tempo")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas conta, não altera")
+    parser.add_argument("--max-age-days", type=float, default=settings.AD_EXPIRY_MAX_AGE_DAYS)
+    parser.add_argument("--batch-size", type=int, default=settings.AD_EXPIRY_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=settings.AD_EXPIRY_PAUSE_SECONDS)
+    args = parser.parse_args()
+
+    report = expire_stale_ads(
+        max_age_days=args.max_age_days,
+        batch_size=args.batch_size,
+        pause_seconds=args.pause,
+        dry_run=args.dry_run,
+    )
+    if args.dry_run:
+        print(f"Anúncios que seriam expirados: {report.expired}")
+    else:
+        print(f"Anúncios expirados: {report.expired} ({report.batches} lote(s))")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""Reconciliação dos contadores desnormalizados dos anúncios
+
+`favorites_count`, `comments_count`, soma/quantidade/histograma das
+avaliações dos anúncios e o histograma das avaliações recebidas por cada
+dono são mantidos por incrementos na mesma transação das escritas (app.db.counters),
+mas escritas fora da API (SQL manual, scripts antigos, cascatas do banco)
+podem desviá-los. Este job percorre anúncios e usuários por id, em lotes pequenos com
+uma transação cada, recalcula os valores reais e corrige só os divergentes.
+As contagens de anúncios publicados por categoria (poucas linhas) são
+conferidas de uma vez.
+
+Uso manual:
+    python -m app.jobs.counter_reconcile            # corrige os desvios
+    python -m app.jobs.counter_reconcile --dry-run  # só relata
+"""
+import argparse
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import Select, func, insert, select, union_all, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.db.counters import PUBLISHED, RATING_STARS, STAR_COLUMNS, star_column
+from app.db.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+AD_COLUMNS = ("favorites_count", "comments_count", "rating_sum", "rating_count") + STAR_COLUMNS
+
+
+@dataclass
+class ReconcileReport:
+    """Resultado de uma passada de reconciliação"""
+    scanned: int = 0
+    drifted: int = 0
+    fixed: int = 0
+    owners_scanned: int = 0
+    owners_drifted: int = 0
+    owners_fixed: int = 0
+    categories_drifted: int = 0
+    categories_fixed: int = 0
+
+
+def _star_counts(comment_filter, group_column) -> Select:
+    """Contagem de comentários por nota, agrupada por `group_column`"""
+    return select(group_column, models.Comment.rating, func.count(models.Comment.id)).where(
+        comment_filter, models.Comment.rating.isnot(None)
+    ).group_by(group_column, models.Comment.rating)
+
+
+def _actual_ad_counters(db: Session, ad_ids: List[int]) -> Dict[int, Tuple[int, ...]]:
+    """Valores reais, em consultas agrupadas para o lote inteiro"""
+    actual = {ad_id: dict.fromkeys(AD_COLUMNS, 0) for ad_id in ad_ids}
+    for ad_id, count in db.execute(
+        select(models.favorites_table.c.ad_id, func.count())
+        .where(models.favorites_table.c.ad_id.in_(ad_ids))
+        .group_by(models.favorites_table.c.ad_id)
+    ).all():
+        actual[ad_id]["favorites_count"] = count
+    for ad_id, count in db.execute(
+        select(models.Comment.ad_id, func.count(models.Comment.id))
+        .where(models.Comment.ad_id.in_(ad_ids))
+        .group_by(models.Comment.ad_id)
+    ).all():
+        actual[ad_id]["comments_count"] = count
+    for ad_id, rating, count in db.execute(
+        _star_counts(models.Comment.ad_id.in_(ad_ids), models.Comment.ad_id)
+    ).all():
+        if rating in RATING_STARS:
+            actual[ad_id][star_column(rating)] = count
+        actual[ad_id]["rating_sum"] += rating * count
+        actual[ad_id]["rating_count"] += count
+    return {ad_id: tuple(values[c] for c in AD_COLUMNS) for ad_id, values in actual.items()}
+
+
+def _ad_owners():
+    """(id, user_id) dos anúncios ativos e arquivados (comentários valem para ambos)"""
+    return union_all(
+        select(models.Ad.id, models.Ad.user_id),
+        select(models.ArchivedAd.id, models.ArchivedAd.user_id),
+    ).subquery("ad_owners")
+
+
+def _actual_owner_histograms(db: Session, user_ids: List[int]) -> Dict[int, Tuple[int, ...]]:
+    """Histograma real das avaliações recebidas por cada dono do lote"""
+    actual = {user_id: dict.fromkeys(STAR_COLUMNS, 0) for user_id in user_ids}
+    owners = _ad_owners()
+    rows = db.execute(
+        _star_counts(owners.c.user_id.in_(user_ids), owners.c.user_id)
+        .join_from(models.Comment, owners, models.Comment.ad_id == owners.c.id)
+    ).all()
+    for user_id, rating, count in rows:
+        if rating in RATING_STARS:
+            actual[user_id][star_column(rating)] = count
+    return {user_id: tuple(values[c] for c in STAR_COLUMNS) for user_id, values in actual.items()}
+
+
+def _star_subquery(star: int, correlate, owners=None):
+    """Subconsulta correlacionada: quantos comentários com nota `star`"""
+    query = select(func.count(models.Comment.id))
+    if owners is not None:
+        query = query.join(owners, models.Comment.ad_id == owners.c.id)
+    return query.where(correlate, models.Comment.rating == star).scalar_subquery()
+
+
+def _recount(db: Session, ad_ids: List[int]) -> int:
+    """Regrava os contadores a partir de subconsultas correlacionadas
+
+    Calcular no próprio UPDATE (e não com os valores lidos antes) evita
+    sobrescrever um incremento concorrente que aconteceu no meio do caminho.
+    """
+    ad = models.Ad
+    favorites = models.favorites_table
+    comment = models.Comment
+    same_ad = comment.ad_id == ad.id
+    result = db.execute(
+        update(ad)
+        .where(ad.id.in_(ad_ids))
+        .values(
+            favorites_count=select(func.count())
+            .where(favorites.c.ad_id == ad.id).scalar_subquery(),
+            comments_count=select(func.count(comment.id))
+            .where(same_ad).scalar_subquery(),
+            rating_sum=select(func.coalesce(func.sum(comment.rating), 0))
+            .where(same_ad).scalar_subquery(),
+            rating_count=select(func.count(comment.rating))
+            .where(same_ad).scalar_subquery(),
+            **{star_column(star): _star_subquery(star, same_ad) for star in RATING_STARS}
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def _recount_owners(db: Session, user_ids: List[int]) -> int:
+    """Regrava o histograma dos donos (mesma estratégia de `_recount`)"""
+    user = models.User
+    owners = _ad_owners()
+    same_owner = owners.c.user_id == user.id
+    result = db.execute(
+        update(user)
+        .where(user.id.in_(user_ids))
+        .values(**{
+            star_column(star): _star_subquery(star, same_owner, owners)
+            for star in RATING_STARS
+        })
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def _reconcile_table(
+    session_factory: Callable[[], Session],
+    model,
+    columns: Tuple[str, ...],
+    actual_counters: Callable[[Session, List[int]], Dict[int, Tuple[int, ...]]],
+    recount: Callable[[Session, List[int]], int],
+    batch_size: int,
+    pause_seconds: float,
+    dry_run: bool
+) -> Tuple[int, int, int]:
+    """Percorre a tabela por id, um lote (e uma transação curta) por vez
+
+    Retorna (examinados, com desvio, corrigidos).
+    """
+    scanned = drifted_total = fixed = 0
+    last_id = 0
+    while True:
+        db = session_factory()
+        try:
+            rows = db.execute(
+                select(model.id, *[getattr(model, column) for column in columns])
+                .where(model.id > last_id)
+                .order_by(model.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            last_id = rows[-1][0]
+            scanned += len(rows)
+            actual = actual_counters(db, [row[0] for row in rows])
+            drifted = [
+                row_id for row_id, *stored in rows
+                if tuple(stored) != actual[row_id]
+            ]
+            drifted_total += len(drifted)
+            if drifted and not dry_run:
+                fixed += recount(db, drifted)
+                db.commit()
+        finally:
+            db.close()
+
+        if len(rows) < batch_size:
+            break
+        time.sleep(pause_seconds)
+    return scanned, drifted_total, fixed
+
+
+def reconcile_category_counts(db: Session, dry_run: bool = False) -> Tuple[int, int]:
+    """Confere a contagem de anúncios publicados de cada categoria
+
+    Cria as linhas que faltarem (categorias anteriores à tabela) e retorna
+    (com desvio, corrigidas); o commit fica com quem chama.
+    """
+    counts = models.CategoryAdCount
+    actual = dict(db.execute(
+        select(models.Ad.category_id, func.count(models.Ad.id))
+        .where(models.Ad.status == PUBLISHED)
+        .group_by(models.Ad.category_id)
+    ).all())
+    stored = dict(db.execute(select(counts.category_id, counts.published_count)).all())
+    category_ids = db.scalars(select(models.Category.id)).all()
+
+    drifted = [
+        category_id for category_id in category_ids
+        if stored.get(category_id) != actual.get(category_id, 0)
+    ]
+    if dry_run or not drifted:
+        return len(drifted), 0
+
+    for category_id in drifted:
+        if category_id not in stored:
+            db.execute(insert(counts).values(category_id=category_id, published_count=0))
+    db.execute(
+        update(counts)
+        .where(counts.category_id.in_(drifted))
+        .values(published_count=select(func.count(models.Ad.id)).where(
+            models.Ad.category_id == counts.category_id,
+            models.Ad.status == PUBLISHED
+        ).scalar_subquery())
+        .execution_options(synchronize_session=False)
+    )
+    return len(drifted), len(drifted)
+
+
+def reconcile_counters(
+    session_factory: Callable[[], Session] = SessionLocal,
+    batch_size: int = 500,
+    pause_seconds: float = 0.1,
+    dry_run: bool = False
+) -> ReconcileReport:
+    """Confere os contadores de todos os anúncios e o histograma de todos os donos"""
+    report = ReconcileReport()
+    report.scanned, report.drifted, report.fixed = _reconcile_table(
+        session_factory, models.Ad, AD_COLUMNS, _actual_ad_counters, _recount,
+        batch_size, pause_seconds, dry_run
+    )
+    report.owners_scanned, report.owners_drifted, report.owners_fixed = _reconcile_table(
+        session_factory, models.User, STAR_COLUMNS, _actual_owner_histograms, _recount_owners,
+        batch_size, pause_seconds, dry_run
+    )
+    db = session_factory()
+    try:
+        report.categories_drifted, report.categories_fixed = reconcile_category_counts(db, dry_run)
+        db.commit()
+    finally:
+        db.close()
+    return report
+
+
+def run_counter_reconcile() -> ReconcileReport:
+    """Ponto de entrada do agendador"""
+    report = reconcile_counters(
+        batch_size=settings.COUNTER_RECONCILE_BATCH_SIZE,
+        pause_seconds=settings.COUNTER_RECONCILE_PAUSE_SECONDS,
+    )
+    if report.fixed or report.owners_fixed or report.categories_fixed:
+        logger.info(
+            "Reconciliação de contadores: %d anúncio(s), %d dono(s) e %d categoria(s) corrigido(s)",
+            report.fixed, report.owners_fixed, report.categories_fixed
+        )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Corrige os contadores desnormalizados dos anúncios")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas relata, não corrige")
+    parser.add_argument("--batch-size", type=int, default=settings.COUNTER_RECONCILE_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=settings.COUNTER_RECONCILE_PAUSE_SECONDS)
+    args = parser.parse_args()
+
+    report = reconcile_counters(
+        batch_size=args.batch_size,
+        pause_seconds=args.pause,
+        dry_run=args.dry_run,
+    )
+    action = "seriam corrigidos" if args.dry_run else "corrigidos"
+    print(f"Anúncios examinados: {report.scanned} (com desvio: {report.drifted})")
+    print(f"Donos examinados: {report.owners_scanned} (com desvio: {report.owners_drifted})")
+    print(f"Anúncios {action}: {report.drifted if args.dry_run else report.fixed}")
+    print(f"Histogramas de donos {action}: {report.owners_drifted if args.dry_run else report.owners_fixed}")
+    print(f"Contagens por categoria {action}: {report.categories_drifted if args.dry_run else report.categories_fixed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Agendador simples de jobs periódicos
+
+Cada job roda em uma thread (via asyncio.to_thread) para não bloquear o event
+loop, e dorme `interval_seconds` entre execuções. `trigger` acorda um job antes
+da hora (ex.: logo após um pedido de exclusão de conta).
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PeriodicJob:
+    """Job executado periodicamente em segundo plano"""
+    name: str
+    func: Callable[[], Any]
+    interval_seconds: float
+    initial_delay_seconds: float = 0
+
+
+class JobScheduler:
+    """Executa os jobs registrados enquanto a aplicação estiver de pé"""
+
+    def __init__(self):
+        self._jobs: List[PeriodicJob] = []
+        self._tasks: List[asyncio.Task] = []
+        self._wakeups: Dict[str, asyncio.Event] = {}
+
+    def register(self, job: PeriodicJob) -> None:
+        """Registra um job (antes de `start`)"""
+        self._jobs.append(job)
+
+    def start(self) -> None:
+        """Inicia um loop por job no event loop atual"""
+        for job in self._jobs:
+            self._wakeups[job.name] = asyncio.Event()
+            self._tasks.append(asyncio.create_task(self._run(job), name=f"job:{job.name}"))
+
+    async def stop(self) -> None:
+        """Cancela os loops (uma execução em andamento termina na sua thread)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._jobs.clear()
+        self._wakeups.clear()
+
+    def trigger(self, name: str) -> None:
+        """Antecipa a próxima execução de um job (sem efeito se não estiver rodando)
+
+        Chame a partir do event loop (rotas `async def`).
+        """
+        wakeup = self._wakeups.get(name)
+        if wakeup is not None:
+            wakeup.set()
+
+    async def _run(self, job: PeriodicJob) -> None:
+        wakeup = self._wakeups[job.name]
+        await self._sleep(wakeup, job.initial_delay_seconds)
+        while True:
+            wakeup.clear()
+            try:
+                result = await asyncio.to_thread(job.func)
+                logger.info("Job %s concluído: %s", job.name, result)
+            except Exception:
+                logger.exception("Job %s falhou", job.name)
+            await self._sleep(wakeup, job.interval_seconds)
+
+    @staticmethod
+    async def _sleep(wakeup: asyncio.Event, seconds: float) -> None:
+        """Dorme `seconds` ou até o job ser acionado por `trigger`"""
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+
+scheduler = JobScheduler()
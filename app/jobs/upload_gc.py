@@ -0,0 +1,263 @@
+"""Coleta incremental de uploads órfãos
+
+Imagens enviadas por /api/upload/upload mas nunca associadas a um anúncio
+(rascunhos abandonados, edições que removeram fotos) ficam para sempre no
+armazenamento. Este job percorre os objetos aos poucos (um cursor guarda onde
+parou), cruza cada arquivo com o índice de imagens referenciadas pelos anúncios
+e apaga, em lotes com pausa entre eles, os órfãos mais antigos que o período
+de carência (um original e seus derivados são apagados juntos, contando a
+carência pelo arquivo mais novo do grupo).
+
+Uso manual:
+    python -m app.jobs.upload_gc            # uma passada completa
+    python -m app.jobs.upload_gc --dry-run  # só relata o que seria apagado
+"""
+import argparse
+import json
+import logging
+import time
+from dataclasses import dataclass
+from itertools import chain
+from typing import Callable, List, Optional, Set
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.db.database import SessionLocal
+from app.infrastructure.storage import IFileStorage, StoredObject, get_storage
+
+logger = logging.getLogger(__name__)
+
+INDEX_BATCH_SIZE = 1000
+
+
+@dataclass
+class GCReport:
+    """Resultado de uma execução do coletor"""
+    scanned: int = 0
+    orphans: int = 0
+    deleted: int = 0
+    bytes_reclaimed: int = 0
+    skipped_recent: int = 0
+    pass_completed: bool = False
+
+
+def owner_key(rel_path: str) -> str:
+    """Chave do original a que um arquivo pertence: 'ab/cd/<hash>.thumb.webp' -> 'ab/cd/<hash>'
+
+    Cobre o original, seus derivados e variantes pré-comprimidas (hash/uuid não têm ponto).
+    """
+    head, _, name = rel_path.rpartition("/")
+    stem = name.split(".", 1)[0]
+    return f"{head}/{stem}" if head else stem
+
+
+def _url_to_key(storage: IFileStorage, url: str) -> Optional[str]:
+    key = storage.key_from_url(url)
+    return owner_key(key) if key else None
+
+
+def build_reference_index(db: Session, storage: IFileStorage) -> Set[str]:
+    """Índice com a chave de todas as imagens referenciadas por anúncios (ativos ou arquivados)"""
+    referenced: Set[str] = set()
+    rows = chain.from_iterable(
+        db.query(model.images).filter(model.images.isnot(None)).yield_per(INDEX_BATCH_SIZE)
+        for model in (models.Ad, models.ArchivedAd)
+    )
+    for (images,) in rows:
+        try:
+            urls = json.loads(images)
+        except (json.JSONDecodeError, TypeError):
+            continue
+        for url in urls if isinstance(urls, list) else []:
+            key = _url_to_key(storage, url)
+            if key:
+                referenced.add(key)
+    return referenced
+
+
+def still_referenced(db: Session, storage: IFileStorage, keys: List[str]) -> Set[str]:
+    """Confere no banco, logo antes de apagar, quais chaves passaram a ser usadas"""
+    if not keys:
+        return set()
+    prefixes = {key: f'"{storage.url_for(key)}.' for key in keys}
+    rows = [
+        row
+        for model in (models.Ad, models.ArchivedAd)
+        for row in db.query(model.images).filter(
+            or_(*[model.images.like(f"%{prefix}%") for prefix in prefixes.values()])
+        )
+    ]
+    referenced = set()
+    for (images,) in rows:
+        for key, prefix in prefixes.items():
+            if prefix in images:
+                referenced.add(key)
+    return referenced
+
+
+class OrphanUploadCollector:
+    """Coletor incremental: cada `run_once` examina no máximo `scan_limit` arquivos"""
+
+    def __init__(
+        self,
+        storage: IFileStorage,
+        session_factory: Callable[[], Session] = SessionLocal,
+        grace_period_seconds: float = 24 * 3600,
+        batch_size: int = 100,
+        pause_seconds: float = 1.0,
+        scan_limit: int = 5000,
+        dry_run: bool = False,
+    ):
+        self._storage = storage
+        self._session_factory = session_factory
+        self._grace_period_seconds = grace_period_seconds
+        self._batch_size = batch_size
+        self._pause_seconds = pause_seconds
+        self._scan_limit = scan_limit
+        self._dry_run = dry_run
+        self._cursor = ""
+        self._referenced: Optional[Set[str]] = None
+
+    def run_once(self) -> GCReport:
+        """Avança a varredura a partir do cursor e apaga os órfãos encontrados"""
+        report = GCReport()
+        db = self._session_factory()
+        try:
+            if self._referenced is None:
+                # Início de uma passada: índice construído uma vez por passada
+                self._referenced = build_reference_index(db, self._storage)
+
+            cutoff = time.time() - self._grace_period_seconds
+            batch: List[StoredObject] = []
+            group: List[StoredObject] = []
+            exhausted = True
+            for obj in self._storage.iter_objects(after=self._cursor):
+                # Original e derivados têm chaves adjacentes: o grupo inteiro é
+                # decidido junto, e o limite só interrompe entre grupos
+                if group and owner_key(obj.key) != owner_key(group[0].key):
+                    batch = self._collect_group(db, group, cutoff, batch, report)
+                    group = []
+                    if report.scanned >= self._scan_limit:
+                        exhausted = False
+                        break
+                report.scanned += 1
+                self._cursor = obj.key
+                group.append(obj)
+
+            if group:
+                batch = self._collect_group(db, group, cutoff, batch, report)
+            self._delete_batch(db, batch, report)
+            if exhausted:
+                report.pass_completed = True
+                self._cursor = ""
+                self._referenced = None
+        finally:
+            db.close()
+        return report
+
+    def run_pass(self) -> GCReport:
+        """Executa `run_once` até completar uma passada, somando os relatórios"""
+        total = GCReport()
+        while True:
+            report = self.run_once()
+            total.scanned += report.scanned
+            total.orphans += report.orphans
+            total.deleted += report.deleted
+            total.bytes_reclaimed += report.bytes_reclaimed
+            total.skipped_recent += report.skipped_recent
+            if report.pass_completed:
+                total.pass_completed = True
+                return total
+
+    def _collect_group(
+        self, db: Session, group: List[StoredObject], cutoff: float, batch: List[StoredObject], report: GCReport
+    ) -> List[StoredObject]:
+        """Enfileira um original e seus derivados para remoção; devolve o lote pendente"""
+        if owner_key(group[0].key) in self._referenced:
+            return batch
+        # A carência vale para o arquivo mais novo do grupo: reenviar a imagem
+        # renova só o original, e um derivado recém-gerado também protege o grupo
+        if max(obj.modified for obj in group) > cutoff:
+            report.skipped_recent += len(group)
+            return batch
+
+        report.orphans += len(group)
+        batch.extend(group)
+        if len(batch) >= self._batch_size:
+            self._delete_batch(db, batch, report)
+            time.sleep(self._pause_seconds)
+            return []
+        return batch
+
+    def _delete_batch(self, db: Session, batch: List[StoredObject], report: GCReport) -> None:
+        if not batch:
+            return
+        keys = sorted({owner_key(obj.key) for obj in batch})
+        # Um blob antigo pode ter sido reaproveitado (deduplicação) depois do índice
+        revived = still_referenced(db, self._storage, keys)
+        self._referenced.update(revived)
+        for obj in batch:
+            if owner_key(obj.key) in revived:
+                continue
+            if not self._dry_run and not self._storage.delete(obj.key):
+                continue
+            report.deleted += 1
+            report.bytes_reclaimed += obj.size
+
+
+_collector: Optional[OrphanUploadCollector] = None
+
+
+def get_collector() -> OrphanUploadCollector:
+    """Coletor do processo (mantém o cursor entre execuções agendadas)"""
+    global _collector
+    if _collector is None:
+        _collector = OrphanUploadCollector(
+            storage=get_storage(),
+            grace_period_seconds=settings.UPLOAD_GC_GRACE_HOURS * 3600,
+            batch_size=settings.UPLOAD_GC_BATCH_SIZE,
+            pause_seconds=settings.UPLOAD_GC_PAUSE_SECONDS,
+            scan_limit=settings.UPLOAD_GC_SCAN_LIMIT,
+        )
+    return _collector
+
+
+def run_upload_gc() -> GCReport:
+    """Ponto de entrada do agendador"""
+    report = get_collector().run_once()
+    if report.deleted:
+        logger.info(
+            "Coleta de uploads: %d órfão(s) apagado(s), %d bytes recuperados",
+            report.deleted, report.bytes_reclaimed
+        )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Remove uploads não referenciados por anúncios")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas relata, não apaga")
+    parser.add_argument("--grace-hours", type=float, default=settings.UPLOAD_GC_GRACE_HOURS)
+    parser.add_argument("--batch-size", type=int, default=settings.UPLOAD_GC_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=settings.UPLOAD_GC_PAUSE_SECONDS)
+    args = parser.parse_args()
+
+    collector = OrphanUploadCollector(
+        storage=get_storage(),
+        grace_period_seconds=args.grace_hours * 3600,
+        batch_size=args.batch_size,
+        pause_seconds=args.pause,
+        scan_limit=settings.UPLOAD_GC_SCAN_LIMIT,
+        dry_run=args.dry_run,
+    )
+    report = collector.run_pass()
+    action = "seriam apagados" if args.dry_run else "apagados"
+    print(f"Arquivos examinados: {report.scanned}")
+    print(f"Órfãos recentes (dentro da carência): {report.skipped_recent}")
+    print(f"Órfãos {action}: {report.deleted} ({report.bytes_reclaimed / 1024 / 1024:.2f} MB)")
+
+
+if __name__ == "__main__":
+    main()
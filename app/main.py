@@ -1,18 +1,40 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
-from app.db.database import engine
-from app.db import models
+from app.db.database import engine, SessionLocal
+from app.db.migrations.runner import warn_pending_migrations
 from app.routers import auth, users, ads, favorites, categories, upload, comments
-from app.routers import ads_refactored  # Router refatorado com Clean Architecture
+from app.core.images import derivative_worker
+from app.core.category_registry import category_registry
+from app.core.static_files import ImmutableStaticFiles
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.metrics import MetricsMiddleware
+from app.jobs import register_jobs
+from app.jobs.scheduler import scheduler
 from pathlib import Path
 
-# Criar tabelas
-models.Base.metadata.create_all(bind=engine)
+# O esquema é criado/atualizado por `python migrate.py`, não na inicialização
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Inicialização e finalização dos recursos de background"""
+    warn_pending_migrations(engine)
+    if settings.STORAGE_BACKEND == "local":
+        Path(settings.UPLOAD_DIR).mkdir(exist_ok=True)
+    with SessionLocal() as db:
+        category_registry.load(db)
+    if settings.BACKGROUND_JOBS_ENABLED:
+        register_jobs(scheduler)
+        scheduler.start()
+    yield
+    await scheduler.stop()
+    # Aguarda os derivados de imagem pendentes antes de encerrar o worker
+    derivative_worker.shutdown(wait=True)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
     docs_url="/docs",
     redoc_url="/redoc"
@@ -25,18 +47,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],  # Cursor da próxima página nas listagens
 )
 
-# Servir arquivos estáticos (uploads)
-uploads_dir = Path("uploads")
-uploads_dir.mkdir(exist_ok=True)
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Métricas (adicionado por último = mais externo: mede também o CORS e os erros 500)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, engine=engine, path=settings.METRICS_PATH)
+
+# Servir arquivos estáticos (uploads) - nomes endereçados por conteúdo, cache imutável.
+# Com STORAGE_BACKEND=s3 as imagens são servidas direto do bucket/CDN.
+# O diretório é criado no lifespan (nada de I/O no import do módulo).
+if settings.STORAGE_BACKEND == "local":
+    app.mount("/uploads", ImmutableStaticFiles(directory=settings.UPLOAD_DIR, check_dir=False), name="uploads")
 
 # Routers
 app.include_router(auth.router, prefix=f"{settings.API_V1_PREFIX}/auth", tags=["Autenticação"])
 app.include_router(users.router, prefix=f"{settings.API_V1_PREFIX}/users", tags=["Usuários"])
 app.include_router(ads.router, prefix=f"{settings.API_V1_PREFIX}/ads", tags=["Anúncios"])
-app.include_router(ads_refactored.router, prefix=f"{settings.API_V1_PREFIX}/ads-refactored", tags=["Anúncios Refatorados (Clean Architecture)"])
+if settings.ADS_REFACTORED_ENABLED:
+    # Importado só quando habilitado: traz junto toda a camada de serviços/repositórios
+    from app.routers import ads_refactored  # Router refatorado com Clean Architecture
+    app.include_router(ads_refactored.router, prefix=f"{settings.API_V1_PREFIX}/ads-refactored", tags=["Anúncios Refatorados (Clean Architecture)"])
 app.include_router(favorites.router, prefix=f"{settings.API_V1_PREFIX}/favorites", tags=["Favoritos"])
 app.include_router(categories.router, prefix=f"{settings.API_V1_PREFIX}/categories", tags=["Categorias"])
 app.include_router(upload.router, prefix=f"{settings.API_V1_PREFIX}/upload", tags=["Upload"])
@@ -1,12 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 import json
 from app.db.database import get_db
 from app.db import models
+from app.db.counters import record_listing_change, release_ad_ratings
+from app.core.ad_import import ImportFormatError, ImportTooLargeError, detect_format, import_ads, parse_rows, read_body
+from app.core.archived_ads import ARCHIVED_READ_ONLY, delete_archived_ad, get_ad_or_archived, user_ads_page
+from app.core.category_registry import category_registry
+from app.core.config import settings
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, set_next_cursor
 from app.schemas import ad as schemas
 from app.routers.auth import get_current_user
+from app.domain.entities.ad import AdStatus as DomainAdStatus, StatusChangeOutcome
 
 router = APIRouter()
 
@@ -47,20 +54,33 @@ async def get_ads(
 
 @router.get("/me", response_model=List[schemas.AdRead])
 async def get_my_ads(
+    response: Response,
+    status: Optional[schemas.AdStatus] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Lista anúncios do usuário autenticado"""
-    ads = db.query(models.Ad).filter(
-        models.Ad.user_id == current_user.id
-    ).order_by(models.Ad.created_at.desc()).all()
+    """Lista anúncios do usuário autenticado (mais recentes primeiro)
     
+    Paginado por cursor: se houver mais anúncios, a resposta traz o
+    cabeçalho `X-Next-Cursor`; envie-o em `cursor` para buscar a próxima página.
+    Inclui os anúncios concluídos/cancelados já arquivados.
+    """
+    try:
+        ads, next_cursor = user_ads_page(
+            db, current_user.id, status.value if status else None, limit, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    set_next_cursor(response, next_cursor)
     return [schemas.AdRead.model_validate(ad) for ad in ads]
 
 @router.get("/{ad_id}", response_model=schemas.AdReadWithOwner)
 async def get_ad(ad_id: int, db: Session = Depends(get_db)):
-    """Retorna um anúncio específico com informações do dono"""
-    ad = db.query(models.Ad).filter(models.Ad.id == ad_id).first()
+    """Retorna um anúncio específico com informações do dono (também os arquivados)"""
+    ad = get_ad_or_archived(db, ad_id)
     if not ad:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -93,11 +113,8 @@ async def create_ad(
                 detail="Campo 'location' é obrigatório para anúncios publicados"
             )
     
-    # Verifica se categoria existe
-    category = db.query(models.Category).filter(
-        models.Category.id == ad_data.category_id
-    ).first()
-    if not category:
+    # Verifica se categoria existe (registro em memória, sem consultar a tabela)
+    if not category_registry.exists(db, ad_data.category_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Categoria não encontrada"
@@ -116,11 +133,42 @@ async def create_ad(
     new_ad = models.Ad(**ad_dict, user_id=current_user.id)
     
     db.add(new_ad)
+    record_listing_change(db, new_status=new_ad.status, new_category_id=new_ad.category_id)
     db.commit()
     db.refresh(new_ad)
     
     return schemas.AdRead.model_validate(new_ad)
 
+@router.post("/import", response_model=schemas.AdImportReport)
+async def import_ads_endpoint(
+    request: Request,
+    format: Optional[str] = Query(None, description="ndjson ou csv (padrão: pelo Content-Type)"),
+    dry_run: bool = Query(False, description="Só valida, sem gravar"),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Importa anúncios em massa (NDJSON ou CSV no corpo da requisição)
+    
+    Cada linha passa pelas mesmas validações do `POST /api/ads`; as válidas
+    são gravadas em lotes de `AD_IMPORT_BATCH_SIZE`. A resposta traz o
+    resultado de cada linha (id criado ou erros), na ordem do arquivo.
+    Corpos acima de `AD_IMPORT_MAX_BYTES` são recusados com 413 durante a leitura.
+    """
+    try:
+        fmt = detect_format(request.headers.get("content-type"), format)
+        body = await read_body(
+            request.stream(), settings.AD_IMPORT_MAX_BYTES, request.headers.get("content-length")
+        )
+        rows = parse_rows(body, fmt, settings.AD_IMPORT_MAX_ROWS)
+    except ImportTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except ImportFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Arquivo vazio")
+    
+    return import_ads(db, current_user.id, rows, settings.AD_IMPORT_BATCH_SIZE, dry_run=dry_run)
+
 @router.put("/{ad_id}", response_model=schemas.AdRead)
 async def update_ad(
     ad_id: int,
@@ -129,7 +177,7 @@ async def update_ad(
     db: Session = Depends(get_db)
 ):
     """Atualiza um anúncio (apenas o dono pode atualizar)"""
-    ad = db.query(models.Ad).filter(models.Ad.id == ad_id).first()
+    ad = get_ad_or_archived(db, ad_id)
     if not ad:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -143,12 +191,16 @@ async def update_ad(
             detail="Você não tem permissão para editar este anúncio"
         )
     
+    # Arquivados (ads_archive) são somente leitura
+    if isinstance(ad, models.ArchivedAd):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=ARCHIVED_READ_ONLY
+        )
+    
     # Verifica categoria se fornecida
     if ad_data.category_id:
-        category = db.query(models.Category).filter(
-            models.Category.id == ad_data.category_id
-        ).first()
-        if not category:
+        if not category_registry.exists(db, ad_data.category_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Categoria não encontrada"
@@ -165,10 +217,12 @@ async def update_ad(
     if 'images' in update_data and update_data['images'] is not None:
         update_data['images'] = json.dumps(update_data['images'])
     
+    old_status, old_category_id = ad.status, ad.category_id
     for field, value in update_data.items():
         setattr(ad, field, value)
     
     ad.updated_at = datetime.utcnow()
+    record_listing_change(db, old_status, old_category_id, ad.status, ad.category_id)
     
     db.commit()
     db.refresh(ad)
@@ -182,7 +236,7 @@ async def delete_ad(
     db: Session = Depends(get_db)
 ):
     """Deleta um anúncio (apenas o dono pode deletar)"""
-    ad = db.query(models.Ad).filter(models.Ad.id == ad_id).first()
+    ad = get_ad_or_archived(db, ad_id)
     if not ad:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -196,11 +250,56 @@ async def delete_ad(
             detail="Você não tem permissão para deletar este anúncio"
         )
     
+    # Arquivado: já fora das contagens por categoria
+    if isinstance(ad, models.ArchivedAd):
+        delete_archived_ad(db, ad)
+        db.commit()
+        return None
+    
+    # As avaliações somem junto com os comentários do anúncio
+    release_ad_ratings(db, ad)
+    record_listing_change(db, old_status=ad.status, old_category_id=ad.category_id)
     db.delete(ad)
     db.commit()
     
     return None
 
+@router.patch("/status", response_model=schemas.AdBulkStatusReport)
+async def update_ads_status(
+    payload: schemas.AdBulkStatusUpdate,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Atualiza o status de vários anúncios de uma vez
+    
+    Mesmas regras do `PATCH /api/ads/{id}/status` (dono e transições válidas),
+    aplicadas com um UPDATE por status atual em uma única transação. Anúncios
+    que não passam nas verificações não impedem os demais: a resposta traz o
+    resultado de cada ID.
+    """
+    # Sob demanda: a camada de serviços/repositórios fica fora do boot
+    from app.core.dependencies import get_service_container
+
+    container = get_service_container(db)
+    results = await container.get_ad_service().bulk_change_ad_status(
+        ad_ids=payload.ad_ids,
+        new_status=DomainAdStatus(payload.new_status.value),
+        current_user_id=current_user.id
+    )
+    updated = sum(1 for result in results if result.outcome == StatusChangeOutcome.UPDATED)
+    return schemas.AdBulkStatusReport(
+        updated=updated,
+        failed=len(results) - updated,
+        results=[
+            schemas.AdStatusChangeResult(
+                id=result.ad_id,
+                outcome=result.outcome.value,
+                status=schemas.AdStatus(result.status.value) if result.status else None
+            )
+            for result in results
+        ]
+    )
+
 @router.patch("/{ad_id}/status", response_model=schemas.AdRead)
 async def update_ad_status(
     ad_id: int,
@@ -213,7 +312,7 @@ async def update_ad_status(
     Fluxo: draft → published → reserved → completed
     Apenas o dono pode mudar o status.
     """
-    ad = db.query(models.Ad).filter(models.Ad.id == ad_id).first()
+    ad = get_ad_or_archived(db, ad_id)
     if not ad:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -227,6 +326,13 @@ async def update_ad_status(
             detail="Você não tem permissão para alterar o status deste anúncio"
         )
     
+    # Arquivados (ads_archive) são somente leitura
+    if isinstance(ad, models.ArchivedAd):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=ARCHIVED_READ_ONLY
+        )
+    
     # Valida transições de status
     valid_transitions = {
         "draft": ["published", "cancelled"],
@@ -244,6 +350,7 @@ async def update_ad_status(
         )
     
     # Atualiza status
+    record_listing_change(db, current_status, ad.category_id, new_status, ad.category_id)
     ad.status = new_status
     ad.updated_at = datetime.utcnow()
     
@@ -4,7 +4,7 @@ Ads Router - Refactored following Clean Architecture
 - Delegates to service layer
 - Handles only HTTP concerns
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
@@ -13,12 +13,15 @@ from app.db import models
 from app.schemas import ad as schemas
 from app.routers.auth import get_current_user
 from app.core.dependencies import get_service_container
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, set_next_cursor
+from app.core.archived_ads import get_ad_or_archived
 from app.core.exceptions import (
     NotFoundException,
     ForbiddenException,
-    BusinessRuleException
+    BusinessRuleException,
+    ConflictException
 )
-from app.domain.entities.ad import Ad as DomainAd, AdStatus
+from app.domain.entities.ad import Ad as DomainAd, AdStatus, StatusChangeOutcome
 
 router = APIRouter()
 
@@ -29,6 +32,8 @@ def _map_exception_to_http(e: Exception) -> HTTPException:
         return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     elif isinstance(e, ForbiddenException):
         return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    elif isinstance(e, ConflictException):
+        return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     elif isinstance(e, BusinessRuleException):
         return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     elif isinstance(e, ValueError):
@@ -81,15 +86,25 @@ async def get_ads(
 
 @router.get("/me", response_model=List[schemas.AdRead])
 async def get_my_ads(
+    response: Response,
+    status_param: Optional[schemas.AdStatus] = Query(None, alias="status"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """List current user's ads"""
+    """List current user's ads - cursor paginated (see X-Next-Cursor header)"""
     try:
         container = get_service_container(db)
         ad_service = container.get_ad_service()
         
-        domain_ads = await ad_service.list_user_ads(current_user.id)
+        domain_ads, next_cursor = await ad_service.list_user_ads(
+            current_user.id,
+            status=AdStatus(status_param.value) if status_param else None,
+            limit=limit,
+            cursor=cursor
+        )
+        set_next_cursor(response, next_cursor)
         return [_domain_ad_to_schema(ad) for ad in domain_ads]
     
     except Exception as e:
@@ -110,7 +125,7 @@ async def get_ad(
         
         # Get owner info from database (for now, still coupled to DB)
         # TODO: Move to service layer
-        ad_orm = db.query(models.Ad).filter(models.Ad.id == ad_id).first()
+        ad_orm = get_ad_or_archived(db, ad_id)
         
         return schemas.AdReadWithOwner.model_validate(ad_orm)
     
@@ -129,11 +144,6 @@ async def create_ad(
         container = get_service_container(db)
         ad_service = container.get_ad_service()
         
-        # Check if category exists (still coupled to DB - TODO: move to service)
-        category_exists = db.query(models.Category).filter(
-            models.Category.id == ad_data.category_id
-        ).first() is not None
-        
         # Convert schema to domain entity
         domain_ad = DomainAd(
             title=ad_data.title,
@@ -155,7 +165,7 @@ async def create_ad(
         )
         
         # Call service
-        created_ad = await ad_service.create_ad(domain_ad, category_exists)
+        created_ad = await ad_service.create_ad(domain_ad)
         
         return _domain_ad_to_schema(created_ad)
     
@@ -175,13 +185,6 @@ async def update_ad(
         container = get_service_container(db)
         ad_service = container.get_ad_service()
         
-        # Check category if provided
-        category_exists = True
-        if ad_data.category_id:
-            category_exists = db.query(models.Category).filter(
-                models.Category.id == ad_data.category_id
-            ).first() is not None
-        
         # Prepare updates dict
         updates = ad_data.model_dump(exclude_unset=True)
         
@@ -189,8 +192,7 @@ async def update_ad(
         updated_ad = await ad_service.update_ad(
             ad_id=ad_id,
             updates=updates,
-            current_user_id=current_user.id,
-            category_exists=category_exists
+            current_user_id=current_user.id
         )
         
         return _domain_ad_to_schema(updated_ad)
@@ -216,6 +218,41 @@ async def delete_ad(
         raise _map_exception_to_http(e)
 
 
+@router.patch("/status", response_model=schemas.AdBulkStatusReport)
+async def change_ads_status(
+    payload: schemas.AdBulkStatusUpdate,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Change the status of many ads - Outcome reported per id"""
+    try:
+        container = get_service_container(db)
+        ad_service = container.get_ad_service()
+        
+        results = await ad_service.bulk_change_ad_status(
+            ad_ids=payload.ad_ids,
+            new_status=AdStatus(payload.new_status.value),
+            current_user_id=current_user.id
+        )
+    
+    except Exception as e:
+        raise _map_exception_to_http(e)
+    
+    updated = sum(1 for result in results if result.outcome == StatusChangeOutcome.UPDATED)
+    return schemas.AdBulkStatusReport(
+        updated=updated,
+        failed=len(results) - updated,
+        results=[
+            schemas.AdStatusChangeResult(
+                id=result.ad_id,
+                outcome=result.outcome.value,
+                status=schemas.AdStatus(result.status.value) if result.status else None
+            )
+            for result in results
+        ]
+    )
+
+
 @router.patch("/{ad_id}/status", response_model=schemas.AdRead)
 async def change_ad_status(
     ad_id: int,
@@ -265,5 +302,9 @@ def _domain_ad_to_schema(ad: DomainAd) -> schemas.AdRead:
         status=schemas.AdStatus(ad.status.value),
         user_id=ad.user_id,
         created_at=ad.created_at,
-        updated_at=ad.updated_at
+        updated_at=ad.updated_at,
+        favorites_count=ad.favorites_count,
+        comments_count=ad.comments_count,
+        rating_count=ad.rating_count,
+        rating_average=ad.rating_average
     )
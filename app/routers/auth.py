@@ -32,7 +32,8 @@ async def get_current_user(
         raise credentials_exception
     
     user = db.query(models.User).filter(models.User.id == user_id).first()
-    if user is None:
+    # Conta desativada (exclusão em andamento): tokens antigos deixam de valer
+    if user is None or not user.is_active:
         raise credentials_exception
     
     return user
@@ -75,7 +76,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
     """Autentica um usuário e retorna token JWT"""
     # Busca usuário
     user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    if not user or not user.is_active or not security.verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou senha incorretos",
@@ -97,7 +98,7 @@ async def login_json(user_data: schemas.UserLogin, db: Session = Depends(get_db)
     """Autentica um usuário via JSON (alternativa ao form)"""
     # Busca usuário
     user = db.query(models.User).filter(models.User.email == user_data.email).first()
-    if not user or not security.verify_password(user_data.password, user.hashed_password):
+    if not user or not user.is_active or not security.verify_password(user_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou senha incorretos"
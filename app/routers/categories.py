@@ -1,34 +1,54 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Union
 from app.db.database import get_db
 from app.db import models
 from app.schemas import category as schemas
+from app.core.category_registry import category_registry
 from app.routers.auth import get_current_user
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.CategoryRead])
+# Sem with_counts a resposta não traz o campo (nem como null)
+@router.get("/", response_model=Union[List[schemas.CategoryReadWithCount], List[schemas.CategoryRead]])
 async def get_categories(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    with_counts: bool = Query(False, description="Inclui a quantidade de anúncios publicados de cada categoria"),
     db: Session = Depends(get_db)
 ):
-    """Lista todas as categorias"""
-    categories = db.query(models.Category).offset(skip).limit(limit).all()
-    return [schemas.CategoryRead.model_validate(cat) for cat in categories]
+    """Lista todas as categorias (servidas do registro em memória)
+    
+    Com `with_counts=true`, as quantidades vêm da tabela de contagens mantida a
+    cada publicação/remoção (uma leitura só, sem COUNT por categoria).
+    """
+    categories = category_registry.all(db)[skip:skip + limit]
+    if not with_counts:
+        return categories
+    
+    counts = dict(db.query(
+        models.CategoryAdCount.category_id,
+        models.CategoryAdCount.published_count
+    ).all())
+    return [
+        schemas.CategoryReadWithCount(
+            **category.model_dump(),
+            published_ads_count=counts.get(category.id, 0)
+        )
+        for category in categories
+    ]
 
 @router.get("/{category_id}", response_model=schemas.CategoryRead)
 async def get_category(category_id: int, db: Session = Depends(get_db)):
     """Retorna uma categoria específica"""
-    category = db.query(models.Category).filter(models.Category.id == category_id).first()
+    category = category_registry.get(db, category_id)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Categoria não encontrada"
         )
     
-    return schemas.CategoryRead.model_validate(category)
+    return category
 
 @router.post("/", response_model=schemas.CategoryRead, status_code=status.HTTP_201_CREATED)
 async def create_category(
@@ -49,8 +69,12 @@ async def create_category(
     
     new_category = models.Category(**category_data.model_dump())
     db.add(new_category)
+    db.flush()
+    db.add(models.CategoryAdCount(category_id=new_category.id, published_count=0))
+    category_registry.changed(db)
     db.commit()
     db.refresh(new_category)
+    category_registry.load(db)
     
     return schemas.CategoryRead.model_validate(new_category)
 
@@ -86,8 +110,10 @@ async def update_category(
     for field, value in update_data.items():
         setattr(category, field, value)
     
+    category_registry.changed(db)
     db.commit()
     db.refresh(category)
+    category_registry.load(db)
     
     return schemas.CategoryRead.model_validate(category)
 
@@ -105,15 +131,22 @@ async def delete_category(
             detail="Categoria não encontrada"
         )
     
-    # Verifica se há anúncios usando esta categoria
+    # Verifica se há anúncios usando esta categoria (inclusive os arquivados,
+    # que continuam sendo exibidos com ela)
     ads_count = db.query(models.Ad).filter(models.Ad.category_id == category_id).count()
+    ads_count += db.query(models.ArchivedAd).filter(models.ArchivedAd.category_id == category_id).count()
     if ads_count > 0:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Não é possível deletar. Existem {ads_count} anúncios usando esta categoria"
         )
     
+    db.query(models.CategoryAdCount).filter(
+        models.CategoryAdCount.category_id == category_id
+    ).delete()
     db.delete(category)
+    category_registry.changed(db)
     db.commit()
+    category_registry.load(db)
     
     return None
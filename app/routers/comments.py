@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional
 from app.db.database import get_db
 from app.db import models
+from app.db.counters import record_comment_change
+from app.core.archived_ads import ad_exists
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_page, set_next_cursor
 from app.schemas import comment as schemas
 from app.routers.auth import get_current_user
 from datetime import datetime
@@ -10,20 +13,36 @@ from datetime import datetime
 router = APIRouter()
 
 @router.get("/ad/{ad_id}", response_model=List[schemas.CommentReadWithUser])
-async def get_ad_comments(ad_id: int, db: Session = Depends(get_db)):
-    """Lista comentários de um anúncio"""
-    # Verifica se anúncio existe
-    ad = db.query(models.Ad).filter(models.Ad.id == ad_id).first()
-    if not ad:
+async def get_ad_comments(
+    ad_id: int,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Lista comentários de um anúncio (mais recentes primeiro)
+    
+    Paginado por cursor: se houver mais comentários, a resposta traz o
+    cabeçalho `X-Next-Cursor`; envie-o em `cursor` para buscar a próxima página.
+    """
+    # Verifica se anúncio existe (ativo ou arquivado)
+    if not ad_exists(db, ad_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Anúncio não encontrado"
         )
     
-    comments = db.query(models.Comment).filter(
-        models.Comment.ad_id == ad_id
-    ).order_by(models.Comment.created_at.desc()).all()
+    query = db.query(models.Comment).options(
+        joinedload(models.Comment.user)
+    ).filter(models.Comment.ad_id == ad_id)
+    try:
+        comments, next_cursor = keyset_page(
+            query, models.Comment.created_at, models.Comment.id, limit, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
+    set_next_cursor(response, next_cursor)
     return [schemas.CommentReadWithUser.model_validate(comment) for comment in comments]
 
 @router.get("/{comment_id}", response_model=schemas.CommentReadWithUser)
@@ -60,6 +79,7 @@ async def create_comment(
     )
     
     db.add(new_comment)
+    record_comment_change(db, new_comment.ad_id, None, new_comment.rating, comments=1)
     db.commit()
     db.refresh(new_comment)
     
@@ -88,10 +108,13 @@ async def update_comment(
         )
     
     # Atualiza campos
+    old_rating = comment.rating
     update_data = comment_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(comment, field, value)
     
+    record_comment_change(db, comment.ad_id, old_rating, comment.rating)
+    
     comment.updated_at = datetime.utcnow()
     
     db.commit()
@@ -120,6 +143,7 @@ async def delete_comment(
             detail="Você não tem permissão para deletar este comentário"
         )
     
+    record_comment_change(db, comment.ad_id, comment.rating, None, comments=-1)
     db.delete(comment)
     db.commit()
     
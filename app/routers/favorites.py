@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import literal, select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.db.database import get_db
 from app.db import models
+from app.db.counters import adjust_ad_counters, dialect_insert
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_page, set_next_cursor
 from app.schemas import favorite as schemas
 from app.schemas.ad import AdRead
 from app.routers.auth import get_current_user
@@ -11,19 +14,35 @@ router = APIRouter()
 
 @router.get("/", response_model=List[AdRead])
 async def get_my_favorites(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Lista anúncios favoritados pelo usuário autenticado"""
+    """Lista anúncios favoritados pelo usuário autenticado (favoritados mais recentemente primeiro)
+    
+    Paginado por cursor: se houver mais favoritos, a resposta traz o
+    cabeçalho `X-Next-Cursor`; envie-o em `cursor` para buscar a próxima página.
+    """
+    favorites = models.favorites_table
     # Busca anúncios favoritados através da relação many-to-many
-    favorites = db.query(models.Ad).join(
-        models.favorites_table,
-        models.Ad.id == models.favorites_table.c.ad_id
+    query = db.query(models.Ad, favorites.c.created_at).join(
+        favorites,
+        models.Ad.id == favorites.c.ad_id
     ).filter(
-        models.favorites_table.c.user_id == current_user.id
-    ).order_by(models.favorites_table.c.created_at.desc()).all()
+        favorites.c.user_id == current_user.id
+    )
+    try:
+        rows, next_cursor = keyset_page(
+            query, favorites.c.created_at, favorites.c.ad_id, limit, cursor,
+            position=lambda row: (row.created_at, row.Ad.id)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
-    return [AdRead.model_validate(ad) for ad in favorites]
+    set_next_cursor(response, next_cursor)
+    return [AdRead.model_validate(row.Ad) for row in rows]
 
 @router.post("/{ad_id}/toggle", response_model=schemas.FavoriteToggleResponse)
 async def toggle_favorite(
@@ -31,49 +50,52 @@ async def toggle_favorite(
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Adiciona ou remove anúncio dos favoritos (toggle)"""
-    # Verifica se anúncio existe
-    ad = db.query(models.Ad).filter(models.Ad.id == ad_id).first()
-    if not ad:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Anúncio não encontrado"
-        )
-    
-    # Verifica se já está nos favoritos
-    is_favorited = db.query(models.favorites_table).filter(
-        models.favorites_table.c.user_id == current_user.id,
-        models.favorites_table.c.ad_id == ad_id
-    ).first()
+    """Adiciona ou remove anúncio dos favoritos (toggle)
     
-    if is_favorited:
-        # Remove dos favoritos
-        db.execute(
-            models.favorites_table.delete().where(
-                (models.favorites_table.c.user_id == current_user.id) &
-                (models.favorites_table.c.ad_id == ad_id)
-            )
+    Sem SELECT prévio: tenta remover; se não havia favorito, insere a partir
+    de `ads` com ON CONFLICT DO NOTHING, e o contador soma só as linhas de
+    fato inseridas. Nenhuma linha inserida = anúncio inexistente, ou outro
+    request (clique duplo) inseriu o mesmo favorito antes.
+    """
+    favorites = models.favorites_table
+    removed = db.execute(
+        favorites.delete().where(
+            (favorites.c.user_id == current_user.id) &
+            (favorites.c.ad_id == ad_id)
         )
+    ).rowcount
+    
+    if removed:
+        adjust_ad_counters(db, ad_id, favorites=-removed)
         db.commit()
-        
         return schemas.FavoriteToggleResponse(
             favorited=False,
             message="Anúncio removido dos favoritos"
         )
-    else:
-        # Adiciona aos favoritos
-        db.execute(
-            models.favorites_table.insert().values(
-                user_id=current_user.id,
-                ad_id=ad_id
-            )
-        )
-        db.commit()
-        
-        return schemas.FavoriteToggleResponse(
-            favorited=True,
-            message="Anúncio adicionado aos favoritos"
+    
+    inserted = db.execute(
+        dialect_insert(db)(favorites).from_select(
+            ["user_id", "ad_id"],
+            select(literal(current_user.id), models.Ad.id).where(models.Ad.id == ad_id)
+        ).on_conflict_do_nothing()
+    ).rowcount
+    if inserted:
+        adjust_ad_counters(db, ad_id, favorites=inserted)
+    db.commit()
+    
+    # Só quando nada foi inserido: distingue o clique duplo do anúncio inexistente
+    if not inserted and db.execute(
+        select(favorites.c.ad_id).where(favorites.c.user_id == current_user.id, favorites.c.ad_id == ad_id)
+    ).first() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Anúncio não encontrado"
         )
+    
+    return schemas.FavoriteToggleResponse(
+        favorited=True,
+        message="Anúncio adicionado aos favoritos"
+    )
 
 @router.delete("/{ad_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def remove_favorite(
@@ -82,29 +104,48 @@ async def remove_favorite(
     db: Session = Depends(get_db)
 ):
     """Remove anúncio dos favoritos"""
-    # Verifica se está nos favoritos
-    is_favorited = db.query(models.favorites_table).filter(
-        models.favorites_table.c.user_id == current_user.id,
-        models.favorites_table.c.ad_id == ad_id
-    ).first()
+    removed = db.execute(
+        models.favorites_table.delete().where(
+            (models.favorites_table.c.user_id == current_user.id) &
+            (models.favorites_table.c.ad_id == ad_id)
+        )
+    ).rowcount
     
-    if not is_favorited:
+    if not removed:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Anúncio não está nos favoritos"
         )
     
-    # Remove dos favoritos
-    db.execute(
-        models.favorites_table.delete().where(
-            (models.favorites_table.c.user_id == current_user.id) &
-            (models.favorites_table.c.ad_id == ad_id)
-        )
-    )
+    adjust_ad_counters(db, ad_id, favorites=-1)
     db.commit()
-    
     return None
 
+@router.post("/check", response_model=schemas.FavoriteCheckResponse)
+async def check_favorites(
+    request: schemas.FavoriteCheckRequest,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Verifica, em uma consulta, quais dos anúncios informados estão nos favoritos
+    
+    Use nas listagens em vez de chamar /check/{ad_id} para cada card.
+    """
+    if not request.ad_ids:
+        return schemas.FavoriteCheckResponse(favorited_ad_ids=[])
+    
+    # Coberto pela chave primária (user_id, ad_id)
+    rows = db.query(models.favorites_table.c.ad_id).filter(
+        models.favorites_table.c.user_id == current_user.id,
+        models.favorites_table.c.ad_id.in_(set(request.ad_ids))
+    ).all()
+    favorited = {ad_id for (ad_id,) in rows}
+    
+    return schemas.FavoriteCheckResponse(
+        favorited_ad_ids=[ad_id for ad_id in dict.fromkeys(request.ad_ids) if ad_id in favorited]
+    )
+
 @router.get("/check/{ad_id}", response_model=bool)
 async def check_is_favorited(
     ad_id: int,
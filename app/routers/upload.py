@@ -1,17 +1,23 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
-from typing import List
-import os
-import uuid
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import List, Tuple
 from pathlib import Path
-import shutil
+from app.db.database import get_db
+from app.db import models
+from app.core.config import settings
+from app.core.images import derivative_worker, image_dimensions, missing_derivatives, remove_derivatives
+from app.core.image_probe import ImageInfo, InvalidImageError, check_limits, probe_image, probe_stream
+from app.core.upload_store import store_stream, blob_key, count_references
+from app.infrastructure.storage import get_storage
+from app.routers.auth import get_current_user
+from app.schemas import upload as schemas
 
 router = APIRouter()
 
 # Configurações
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+EXTENSION_FORMATS = {".jpg": "jpeg", ".jpeg": "jpeg", ".png": "png", ".webp": "webp"}
 MAX_FILES_PER_AD = 5
 
 def validate_image(file: UploadFile) -> None:
@@ -31,18 +37,33 @@ def validate_image(file: UploadFile) -> None:
             detail="O arquivo deve ser uma imagem"
         )
 
-def save_upload_file(upload_file: UploadFile) -> str:
-    """Salva arquivo e retorna o caminho relativo"""
-    # Gera nome único
-    file_ext = Path(upload_file.filename or "").suffix.lower()
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    file_path = UPLOAD_DIR / unique_filename
-    
-    # Salva arquivo
-    with file_path.open("wb") as buffer:
-        shutil.copyfileobj(upload_file.file, buffer)
-    
-    return f"/uploads/{unique_filename}"
+def inspect_image(file: UploadFile) -> ImageInfo:
+    """Confere o conteúdo real pelo cabeçalho (magic bytes e dimensões), sem decodificar"""
+    try:
+        return probe_stream(file.file)
+    except InvalidImageError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Arquivo {file.filename}: {e}"
+        )
+
+def save_upload_file(upload_file: UploadFile, info: ImageInfo) -> Tuple[str, bool]:
+    """Salva arquivo sob o hash do conteúdo e retorna (URL, criado)
+    
+    Se o mesmo conteúdo já foi enviado antes, reaproveita o blob existente.
+    A extensão vem do formato detectado, não do nome enviado pelo cliente.
+    """
+    storage = get_storage()
+    key, created = store_stream(
+        upload_file.file, storage, info.extension, info.width, info.height
+    )
+    
+    # Gera miniatura e versão média em segundo plano (não bloqueia a resposta).
+    # Blob reaproveitado: os derivados podem ter falhado ou sido coletados.
+    if created or missing_derivatives(key):
+        derivative_worker.submit(key)
+    
+    return storage.url_for(key), created
 
 @router.post("/upload", response_model=dict)
 async def upload_images(files: List[UploadFile] = File(...)):
@@ -59,6 +80,8 @@ async def upload_images(files: List[UploadFile] = File(...)):
         )
     
     uploaded_urls = []
+    uploaded_images = []
+    created_urls = []
     
     for file in files:
         # Valida arquivo
@@ -75,16 +98,22 @@ async def upload_images(files: List[UploadFile] = File(...)):
                 detail=f"Arquivo {file.filename} excede o tamanho máximo de 5MB"
             )
         
+        info = inspect_image(file)
+        
         # Salva arquivo
         try:
-            file_url = save_upload_file(file)
+            file_url, created = save_upload_file(file, info)
             uploaded_urls.append(file_url)
+            uploaded_images.append({"url": file_url, "width": info.width, "height": info.height})
+            if created:
+                created_urls.append(file_url)
         except Exception as e:
-            # Remove arquivos já salvos em caso de erro
-            for url in uploaded_urls:
-                file_path = UPLOAD_DIR / Path(url).name
-                if file_path.exists():
-                    file_path.unlink()
+            # Remove apenas os blobs criados nesta requisição (os demais já existiam)
+            storage = get_storage()
+            for url in created_urls:
+                key = storage.key_from_url(url)
+                storage.delete(key)
+                remove_derivatives(key)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Erro ao salvar arquivo: {str(e)}"
@@ -92,25 +121,155 @@ async def upload_images(files: List[UploadFile] = File(...)):
     
     return {
         "message": f"{len(uploaded_urls)} imagem(ns) enviada(s) com sucesso",
-        "urls": uploaded_urls
+        "urls": uploaded_urls,
+        "images": uploaded_images
     }
 
-@router.delete("/upload/{filename}")
-async def delete_image(filename: str):
-    """Deleta uma imagem do servidor"""
-    file_path = UPLOAD_DIR / filename
+@router.post("/presign", response_model=schemas.PresignResponse)
+async def presign_upload(
+    request: schemas.PresignRequest,
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Prepara um upload direto para o armazenamento (sem passar pela API).
+    O cliente calcula o SHA-256 do arquivo; se o conteúdo já existir, não
+    precisa enviar nada. Caso contrário, faz o PUT na URL assinada com os
+    cabeçalhos retornados e depois chama /complete.
+    """
+    file_ext = Path(request.filename).suffix.lower()
+    if file_ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tipo de arquivo não permitido. Use: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+    if not request.content_type.startswith("image/"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="O arquivo deve ser uma imagem"
+        )
+    if request.size > MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Arquivo {request.filename} excede o tamanho máximo de 5MB"
+        )
+    
+    # As dimensões declaradas entram na chave e são conferidas em /complete
+    declared = ImageInfo(EXTENSION_FORMATS[file_ext], request.width, request.height)
+    try:
+        check_limits(declared)
+    except InvalidImageError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    storage = get_storage()
+    key = blob_key(request.sha256, declared.extension, declared.width, declared.height)
+    if storage.exists(key):
+        storage.touch(key)
+        if missing_derivatives(key):
+            derivative_worker.submit(key)
+        return schemas.PresignResponse(key=key, url=storage.url_for(key), exists=True)
     
-    if not file_path.exists():
+    try:
+        presigned = storage.presign_upload(
+            key=key,
+            content_type=request.content_type,
+            content_length=request.size,
+            checksum_sha256=request.sha256,
+            expires_in=settings.S3_PRESIGN_EXPIRES_SECONDS
+        )
+    except NotImplementedError:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Upload direto não suportado por este armazenamento. Use /api/upload/upload"
+        )
+    
+    return schemas.PresignResponse(
+        key=key,
+        url=storage.url_for(key),
+        exists=False,
+        upload=schemas.PresignedUploadRead(
+            url=presigned.url,
+            method=presigned.method,
+            headers=presigned.headers,
+            expires_in=presigned.expires_in
+        )
+    )
+
+@router.post("/complete", response_model=schemas.UploadCompleteResponse)
+async def complete_upload(
+    request: schemas.UploadCompleteRequest,
+    current_user: models.User = Depends(get_current_user)
+):
+    """Confirma um upload direto, confere o conteúdo e agenda a geração dos derivados"""
+    storage = get_storage()
+    try:
+        exists = storage.exists(request.key)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Arquivo não encontrado"
         )
     
+    # O upload foi direto ao bucket: confere só o cabeçalho (leitura parcial) contra a chave
+    declared = image_dimensions(request.key)
+    if declared is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Chave não gerada por /api/upload/presign"
+        )
+    try:
+        info = probe_image(lambda n: storage.read_head(request.key, n))
+        if declared != (info.width, info.height) or not request.key.endswith(info.extension):
+            raise InvalidImageError("Conteúdo não corresponde ao formato/dimensões declarados")
+    except InvalidImageError as e:
+        storage.delete(request.key)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    derivative_worker.submit(request.key)
+    return schemas.UploadCompleteResponse(
+        key=request.key,
+        url=storage.url_for(request.key),
+        width=info.width,
+        height=info.height
+    )
+
+@router.delete("/upload/{filename:path}")
+async def delete_image(
+    filename: str,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Descarta uma imagem enviada (requer autenticação)
+    
+    Os blobs são deduplicados: outro usuário pode ter acabado de enviar o
+    mesmo conteúdo e ainda não ter salvo o anúncio. Por isso o arquivo nunca
+    é apagado aqui; sem referências, a coleta de órfãos (`app.jobs.upload_gc`)
+    o remove depois do período de carência.
+    """
+    storage = get_storage()
     try:
-        file_path.unlink()
-        return {"message": "Imagem deletada com sucesso"}
-    except Exception as e:
+        exists = storage.exists(filename)
+    except ValueError as e:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erro ao deletar arquivo: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
+    
+    if not exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Arquivo não encontrado"
+        )
+    
+    references = count_references(db, storage.url_for(filename))
+    if references > 0:
+        return {
+            "message": f"Imagem mantida: ainda usada por {references} anúncio(s)",
+            "deleted": False
+        }
+    
+    return {
+        "message": "Imagem sem anúncios: será removida pela coleta de órfãos",
+        "deleted": False
+    }
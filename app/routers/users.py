@@ -1,17 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
+from datetime import datetime
 from app.db.database import get_db
 from app.db import models
+from app.jobs.scheduler import scheduler
 from app.schemas import user as schemas
 from app.routers.auth import get_current_user
 
 router = APIRouter()
 
-@router.get("/me", response_model=schemas.UserRead)
+@router.get("/me", response_model=schemas.UserProfile)
 async def get_my_profile(current_user: models.User = Depends(get_current_user)):
     """Retorna perfil do usuário autenticado"""
-    return schemas.UserRead.model_validate(current_user)
+    return schemas.UserProfile.model_validate(current_user)
 
 @router.put("/me", response_model=schemas.UserRead)
 async def update_my_profile(
@@ -48,34 +50,31 @@ async def delete_my_account(
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Deleta conta do usuário autenticado"""
-    # Deleta anúncios do usuário
-    db.query(models.Ad).filter(models.Ad.user_id == current_user.id).delete()
-    
-    # Deleta comentários do usuário
-    db.query(models.Comment).filter(models.Comment.user_id == current_user.id).delete()
-    
-    # Deleta favoritos do usuário
-    db.execute(
-        models.favorites_table.delete().where(
-            models.favorites_table.c.user_id == current_user.id
-        )
-    )
+    """Deleta conta do usuário autenticado
     
-    # Deleta usuário
-    db.delete(current_user)
+    A conta é desativada na hora (login e tokens deixam de valer) e marcada
+    para exclusão; anúncios, comentários, favoritos e a conta são apagados em
+    segundo plano, em lotes pequenos (app.jobs.account_purge), sem segurar o
+    banco durante a requisição. As imagens ficam para a coleta de órfãos.
+    """
+    current_user.is_active = False
+    current_user.deletion_requested_at = datetime.utcnow()
     db.commit()
+    scheduler.trigger("account_purge")
     
     return None
 
-@router.get("/{user_id}", response_model=schemas.UserRead)
+@router.get("/{user_id}", response_model=schemas.UserProfile)
 async def get_user_by_id(user_id: int, db: Session = Depends(get_db)):
     """Retorna informações públicas de um usuário"""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = db.query(models.User).filter(
+        models.User.id == user_id,
+        models.User.is_active.is_(True)
+    ).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Usuário não encontrado"
         )
     
-    return schemas.UserRead.model_validate(user)
+    return schemas.UserProfile.model_validate(user)
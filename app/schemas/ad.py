@@ -1,8 +1,9 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List
+from pydantic import BaseModel, Field, field_validator, computed_field
+from typing import Dict, Optional, List
 from datetime import datetime
 from enum import Enum
 import json
+from app.core.images import image_variants
 
 class AdStatus(str, Enum):
     DRAFT = "draft"
@@ -48,12 +49,50 @@ class AdUpdate(BaseModel):
     images: Optional[List[str]] = None
     status: Optional[AdStatus] = None
 
+class AdImportRowResult(BaseModel):
+    row: int = Field(..., description="Linha de dados no arquivo (1 = primeira)")
+    status: str = Field(..., description="created, valid (dry_run) ou error")
+    id: Optional[int] = Field(None, description="ID do anúncio criado")
+    errors: List[str] = Field(default_factory=list)
+
+class AdImportReport(BaseModel):
+    total: int
+    created: int
+    failed: int
+    dry_run: bool = False
+    results: List[AdImportRowResult]
+
+class AdBulkStatusUpdate(BaseModel):
+    ad_ids: List[int] = Field(..., min_length=1, max_length=500, description="IDs dos anúncios (até 500)")
+    new_status: AdStatus = Field(..., description="Novo status")
+
+class AdStatusChangeResult(BaseModel):
+    id: int
+    outcome: str = Field(..., description="updated, not_found, forbidden ou invalid_transition")
+    status: Optional[AdStatus] = Field(None, description="Status atual após a operação (nulo se não encontrado ou de outro dono)")
+
+class AdBulkStatusReport(BaseModel):
+    updated: int
+    failed: int
+    results: List[AdStatusChangeResult]
+
+class ImageVariants(BaseModel):
+    original: str = Field(..., description="URL da imagem original")
+    thumb: str = Field(..., description="Miniatura WebP (cards/listagens)")
+    medium: str = Field(..., description="Versão média WebP (galeria)")
+    width: Optional[int] = Field(None, description="Largura do original em pixels (quando conhecida)")
+    height: Optional[int] = Field(None, description="Altura do original em pixels (quando conhecida)")
+
 class AdRead(AdBase):
     id: int
     user_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
     published_at: Optional[datetime] = None  # Data da última publicação/republicação
+    favorites_count: int = 0
+    comments_count: int = 0
+    rating_count: int = 0
+    rating_average: Optional[float] = None
     
     @field_validator('rules', 'amenities', 'images', mode='before')
     @classmethod
@@ -71,16 +110,22 @@ class AdRead(AdBase):
             return v
         return []
     
+    @computed_field
+    @property
+    def image_variants(self) -> List[ImageVariants]:
+        """Derivados (thumb/medium) de cada imagem, na mesma ordem de `images`"""
+        return [ImageVariants(**image_variants(url)) for url in self.images or []]
+    
     class Config:
         from_attributes = True
 
 class AdReadWithOwner(AdRead):
     owner: 'UserRead'
     category: 'CategoryRead'
+    rating_histogram: Dict[int, int] = Field(default_factory=dict, description="Avaliações por nota (1-5)")
     
 class AdReadWithDetails(AdReadWithOwner):
     is_favorited: bool = False
-    comments_count: int = 0
 
 # Import necessário para evitar circular import
 from app.schemas.user import UserRead
@@ -21,3 +21,6 @@ class CategoryRead(CategoryBase):
     
     class Config:
         from_attributes = True
+
+class CategoryReadWithCount(CategoryRead):
+    published_ads_count: int = Field(..., description="Anúncios publicados")
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import List
 
 class FavoriteCreate(BaseModel):
     ad_id: int
@@ -15,3 +16,9 @@ class FavoriteRead(BaseModel):
 class FavoriteToggleResponse(BaseModel):
     favorited: bool
     message: str
+
+class FavoriteCheckRequest(BaseModel):
+    ad_ids: List[int] = Field(..., max_length=200, description="IDs dos anúncios exibidos na tela")
+
+class FavoriteCheckResponse(BaseModel):
+    favorited_ad_ids: List[int] = Field(..., description="Subconjunto de ad_ids que está nos favoritos")
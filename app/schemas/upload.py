@@ -0,0 +1,31 @@
+from pydantic import BaseModel, Field
+from typing import Dict, Optional
+
+class PresignRequest(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255, description="Nome original do arquivo")
+    content_type: str = Field(..., description="Tipo MIME da imagem")
+    size: int = Field(..., gt=0, description="Tamanho em bytes")
+    sha256: str = Field(..., pattern=r"^[0-9a-f]{64}$", description="SHA-256 do conteúdo (hex)")
+    width: int = Field(..., gt=0, description="Largura em pixels")
+    height: int = Field(..., gt=0, description="Altura em pixels")
+
+class PresignedUploadRead(BaseModel):
+    url: str
+    method: str
+    headers: Dict[str, str]
+    expires_in: int
+
+class PresignResponse(BaseModel):
+    key: str
+    url: str = Field(..., description="URL pública da imagem após o envio")
+    exists: bool = Field(..., description="Conteúdo já armazenado: não é preciso enviar")
+    upload: Optional[PresignedUploadRead] = None
+
+class UploadCompleteRequest(BaseModel):
+    key: str = Field(..., min_length=1, max_length=300)
+
+class UploadCompleteResponse(BaseModel):
+    key: str
+    url: str
+    width: int
+    height: int
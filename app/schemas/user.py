@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, field_validator
-from typing import Optional
+from typing import Dict, Optional
 from datetime import datetime
 
 # User Schemas
@@ -33,6 +33,12 @@ class UserRead(UserBase):
     class Config:
         from_attributes = True
 
+class UserProfile(UserRead):
+    """Perfil com o resumo das avaliações recebidas nos anúncios do usuário"""
+    rating_count: int = 0
+    rating_average: Optional[float] = None
+    rating_histogram: Dict[int, int] = Field(default_factory=dict, description="Avaliações por nota (1-5)")
+
 class UserInDB(UserRead):
     hashed_password: str
 
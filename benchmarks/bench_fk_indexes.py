@@ -0,0 +1,134 @@
+"""Benchmark: consultas por chave estrangeira antes/depois dos índices
+
+Cria um banco SQLite temporário com dados sintéticos, remove os índices que a
+migração `v0003_foreign_key_indexes` cria (simulando um banco antigo), mede as
+consultas que dependem deles, aplica a migração e mede de novo.
+
+Uso:
+    python -m benchmarks.bench_fk_indexes --users 2000 --ads 20000 --comments 100000 --favorites 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, insert, select, text
+
+from app.db import models
+from app.db.migrations.operations import create_missing_indexes
+
+MIGRATED_INDEXES = (
+    "ix_ads_category_id",
+    "ix_comments_user_id",
+    "ix_favorites_ad_id",
+    "ix_ads_user_id_created_at",
+    "ix_comments_ad_id_created_at",
+    "ix_favorites_user_id_created_at",
+)
+
+
+def populate(engine, users: int, ads: int, comments: int, favorites: int, categories: int = 12) -> None:
+    rng = random.Random(42)
+    start = datetime(2025, 1, 1)
+
+    def moment() -> datetime:
+        return start + timedelta(seconds=rng.randrange(300 * 24 * 3600), microseconds=rng.randrange(1, 10**6))
+
+    with engine.begin() as conn:
+        conn.execute(insert(models.Category), [
+            {"id": i, "name": f"Categoria {i}", "slug": f"categoria-{i}"} for i in range(1, categories + 1)
+        ])
+        conn.execute(insert(models.User), [
+            {"id": i, "email": f"user{i}@example.com", "hashed_password": "x"} for i in range(1, users + 1)
+        ])
+        conn.execute(insert(models.Ad), [
+            {
+                "id": i, "user_id": rng.randint(1, users), "category_id": rng.randint(1, categories),
+                "title": f"Anúncio {i}", "description": "...", "price": 100.0,
+                "location": "Cidade", "created_at": moment(),
+            }
+            for i in range(1, ads + 1)
+        ])
+        conn.execute(insert(models.Comment), [
+            {
+                "ad_id": rng.randint(1, ads), "user_id": rng.randint(1, users),
+                "content": "...", "rating": rng.choice([None, 1, 2, 3, 4, 5]), "created_at": moment(),
+            }
+            for _ in range(comments)
+        ])
+        pairs = {(rng.randint(1, users), rng.randint(1, ads)) for _ in range(favorites)}
+        conn.execute(insert(models.favorites_table), [
+            {"user_id": user_id, "ad_id": ad_id, "created_at": moment()} for user_id, ad_id in pairs
+        ])
+
+
+def queries(users: int, ads: int, categories: int = 12) -> dict:
+    ad, comment, fav = models.Ad, models.Comment, models.favorites_table
+    return {
+        "comentários do anúncio": lambda r: select(comment.id).where(comment.ad_id == r.randint(1, ads))
+        .order_by(comment.created_at.desc(), comment.id.desc()).limit(20),
+        "meus anúncios": lambda r: select(ad.id).where(ad.user_id == r.randint(1, users))
+        .order_by(ad.created_at.desc(), ad.id.desc()).limit(20),
+        "meus favoritos": lambda r: select(fav.c.ad_id).where(fav.c.user_id == r.randint(1, users))
+        .order_by(fav.c.created_at.desc(), fav.c.ad_id.desc()).limit(20),
+        "anúncios da categoria": lambda r: select(func.count(ad.id)).where(ad.category_id == r.randint(1, categories)),
+        "favoritos do anúncio (cascata)": lambda r: select(func.count()).where(fav.c.ad_id == r.randint(1, ads)),
+        "comentários do usuário (exclusão de conta)": lambda r: select(
+            comment.ad_id, comment.rating, func.count(comment.id)
+        ).where(comment.user_id == r.randint(1, users)).group_by(comment.ad_id, comment.rating),
+    }
+
+
+def measure(engine, scenarios: dict, repeat: int) -> dict:
+    results = {}
+    with engine.connect() as conn:
+        for name, build in scenarios.items():
+            rng = random.Random(7)
+            latencies = []
+            for _ in range(repeat):
+                statement = build(rng)
+                started = time.perf_counter()
+                conn.execute(statement).all()
+                latencies.append(time.perf_counter() - started)
+            results[name] = statistics.median(latencies) * 1000
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--ads", type=int, default=20000)
+    parser.add_argument("--comments", type=int, default=100000)
+    parser.add_argument("--favorites", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        models.Base.metadata.create_all(bind=engine)
+        populate(engine, args.users, args.ads, args.comments, args.favorites)
+        with engine.begin() as conn:
+            for name in MIGRATED_INDEXES:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+        scenarios = queries(args.users, args.ads)
+        before = measure(engine, scenarios, args.repeat)
+        created = create_missing_indexes(engine, models.Base.metadata)
+        after = measure(engine, scenarios, args.repeat)
+        engine.dispose()
+
+    print("Índices criados pela migração:")
+    for name, seconds in created:
+        print(f"  {name:<34} {seconds * 1000:8.1f} ms")
+    print()
+    print(f"{'consulta (mediana)':<44}{'antes':>12}{'depois':>12}{'ganho':>10}")
+    for name in scenarios:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<44}{before[name]:>10.3f}ms{after[name]:>10.3f}ms{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
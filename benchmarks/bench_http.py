@@ -0,0 +1,641 @@
+"""Benchmark HTTP de ponta a ponta com comparação contra uma linha de base
+
+Exercita todas as rotas de `ads`, `ads-refactored`, `favorites`, `comments`,
+`categories`, `auth` e `upload` e, para cada nível de concorrência, informa
+p50/p95/p99 e vazão (req/s) de cada rota.
+
+Modos:
+- padrão: a aplicação roda no próprio processo (ASGI, sem rede), com o
+  lifespan completo, sobre um banco temporário gerado por
+  `benchmarks.generate_data` (ou sobre `--database`, que será alterado);
+- `--socket`: sobe o uvicorn numa porta local e mede pela rede (HTTP real);
+- `--url`: mede um servidor já em execução.
+
+A preparação de cada requisição (criar o anúncio que será apagado, garantir o
+favorito que será removido...) é feita pela API antes do nível começar e fica
+fora da medição. Jobs em segundo plano ficam desligados.
+
+Linha de base: `--save-baseline arquivo.json` grava os resultados;
+`--baseline arquivo.json` compara e sai com código 1 se alguma rota piorar
+além dos limites (p95 acima de `--max-latency-regression`, com diferença
+mínima de `--min-delta-ms`, ou vazão abaixo de `--max-throughput-drop`) ou
+responder com status inesperado.
+
+Uso:
+    python -m benchmarks.bench_http --save-baseline bench-base.json
+    python -m benchmarks.bench_http --baseline bench-base.json --max-latency-regression 0.2
+    python -m benchmarks.bench_http --concurrency 1,16 --requests 300 --only "ads/"
+    python -m benchmarks.bench_http --socket
+    python -m benchmarks.bench_http --url http://127.0.0.1:8000 --only "GET"
+"""
+import argparse
+import asyncio
+import hashlib
+import io
+import itertools
+import json
+import math
+import os
+import platform
+import re
+import socket
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+PASSWORD = "senha123"
+API = "/api"
+
+# (método, caminho, argumentos do httpx)
+RequestSpec = Tuple[str, str, dict]
+
+
+@dataclass
+class Scenario:
+    """Uma rota (ou variação de uma rota) medida"""
+    name: str
+    build: Callable[[int], Awaitable[RequestSpec]]
+    expect: Tuple[int, ...] = (200,)
+    scale: float = 1.0  # Fração de --requests (rotas com bcrypt são caras)
+    after: Optional[Callable[[httpx.Response], None]] = None
+
+
+@dataclass
+class Result:
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    req_s: float
+    requests: int
+    errors: int
+    statuses: Dict[str, int] = field(default_factory=dict)
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Percentil pelo posto mais próximo (valores já ordenados)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+def make_jpeg(width: int = 640, height: int = 480) -> bytes:
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (30, 120, 200)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+class Fixtures:
+    """Usuários, anúncios, comentários e imagens usados pelas rotas medidas
+
+    Tudo é criado pela API (funciona igual nos três modos); nomes e e-mails
+    levam um prefixo da execução para não colidir com execuções anteriores.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, concurrency: int):
+        self.client = client
+        # Cada anúncio/grupo só recebe uma requisição por vez, mesmo na maior concorrência
+        self.pool_size = max(32, concurrency)
+        self.group_count = concurrency
+        self.run = f"b{int(time.time() * 1000) % 10**9:x}"
+        self.sequence = itertools.count(1)
+        self.owner: Dict[str, str] = {}
+        self.visitor: Dict[str, str] = {}
+        self.category_ids: List[int] = []
+        self.public_ad_ids: List[int] = []
+        self.own_ad_ids: List[int] = []
+        self.ad_groups: List[List[int]] = []
+        self.status: Dict[int, str] = {}
+        self.comment_ids: List[int] = []
+        self.editable_category_id = 0
+        self.pools: Dict[str, List[int]] = {}
+        self.login_email = ""
+        self.image_size = (640, 480)
+        self.image = make_jpeg(*self.image_size)
+        self.image_key = ""
+
+    def unique(self, label: str) -> str:
+        return f"{self.run}-{label}-{next(self.sequence)}"
+
+    async def call(self, method: str, url: str, expect: Tuple[int, ...] = (200, 201), **kwargs) -> httpx.Response:
+        response = await self.client.request(method, url, **kwargs)
+        if response.status_code not in expect:
+            raise RuntimeError(f"Preparação falhou: {method} {url} -> {response.status_code} {response.text[:200]}")
+        return response
+
+    async def register(self, label: str) -> Dict[str, str]:
+        email = f"{self.unique(label)}@example.com"
+        await self.call("POST", f"{API}/auth/register", json={"email": email, "password": PASSWORD, "name": label})
+        return await self.login(email)
+
+    async def login(self, email: str) -> Dict[str, str]:
+        response = await self.call("POST", f"{API}/auth/login/json", json={"email": email, "password": PASSWORD})
+        return {"Authorization": f"Bearer {response.json()['token']['access_token']}"}
+
+    def ad_payload(self, **overrides) -> dict:
+        payload = {
+            "title": f"Quarto perto do campus {next(self.sequence)}",
+            "description": "Quarto mobiliado, contas inclusas, a cinco minutos da universidade.",
+            "seller": "Anunciante do benchmark",
+            "location": "Centro, Viçosa - MG",
+            "cep": "36570-000",
+            "price": 850,
+            "category_id": self.category_ids[0],
+            "bedrooms": 1,
+            "bathrooms": 1,
+            "rules": ["Não fumante"],
+            "amenities": ["Wi-Fi", "Mobiliado"],
+        }
+        payload.update(overrides)
+        return payload
+
+    async def create_ad(self, **overrides) -> int:
+        response = await self.call("POST", f"{API}/ads/", headers=self.owner, json=self.ad_payload(**overrides))
+        return response.json()["id"]
+
+    async def create_comment(self, ad_id: int) -> int:
+        response = await self.call(
+            "POST", f"{API}/comments/", headers=self.visitor,
+            json={"ad_id": ad_id, "content": "Ainda está disponível?", "rating": 4},
+        )
+        return response.json()["id"]
+
+    async def create_category(self) -> int:
+        slug = self.unique("categoria")
+        response = await self.call(
+            "POST", f"{API}/categories/", headers=self.owner,
+            json={"name": slug, "slug": slug, "description": "Categoria do benchmark"},
+        )
+        return response.json()["id"]
+
+    async def take(self, pool: str, factory: Callable[[], Awaitable[int]]) -> int:
+        """Um id criado por uma rota anterior (ou um novo, se não houver)"""
+        ids = self.pools.setdefault(pool, [])
+        return ids.pop() if ids else await factory()
+
+    def give(self, pool: str) -> Callable[[httpx.Response], None]:
+        def store(response: httpx.Response) -> None:
+            if response.status_code in (200, 201):
+                self.pools.setdefault(pool, []).append(response.json()["id"])
+        return store
+
+    def presign_payload(self) -> dict:
+        width, height = self.image_size
+        return {
+            "filename": "foto.jpg", "content_type": "image/jpeg", "size": len(self.image),
+            "sha256": hashlib.sha256(self.image).hexdigest(), "width": width, "height": height,
+        }
+
+    async def setup(self) -> None:
+        self.owner = await self.register("dono")
+        self.visitor = await self.register("visitante")
+        self.login_email = f"{self.unique('login')}@example.com"
+        await self.call("POST", f"{API}/auth/register", json={"email": self.login_email, "password": PASSWORD})
+
+        categories = (await self.call("GET", f"{API}/categories/")).json()
+        self.category_ids = [category["id"] for category in categories] or [await self.create_category()]
+        self.editable_category_id = await self.create_category()
+
+        upload = await self.call(
+            "POST", f"{API}/upload/upload", files=[("files", ("foto.jpg", self.image, "image/jpeg"))]
+        )
+        image_url = upload.json()["urls"][0]
+        # Conteúdo já armazenado: o presign devolve a chave sem pedir novo envio
+        presign = await self.call("POST", f"{API}/upload/presign", headers=self.owner, json=self.presign_payload())
+        self.image_key = presign.json()["key"]
+
+        # A imagem fica referenciada: DELETE /upload a mantém e pode ser repetido
+        self.own_ad_ids = [await self.create_ad(images=[image_url]) for _ in range(self.pool_size)]
+        self.ad_groups = [[await self.create_ad() for _ in range(10)] for _ in range(self.group_count)]
+        for ad_id in self.own_ad_ids + [ad_id for group in self.ad_groups for ad_id in group]:
+            self.status[ad_id] = "published"
+
+        listed = (await self.call("GET", f"{API}/ads/", params={"limit": 100})).json()
+        self.public_ad_ids = [ad["id"] for ad in listed] or self.own_ad_ids
+        for index in range(self.pool_size):
+            self.comment_ids.append(await self.create_comment(self.public_ad_ids[index % len(self.public_ad_ids)]))
+
+    def next_status(self, ad_id: int) -> str:
+        """Alterna published <-> reserved (transição válida nos dois sentidos)"""
+        new_status = "reserved" if self.status[ad_id] == "published" else "published"
+        self.status[ad_id] = new_status
+        return new_status
+
+
+def build_scenarios(fx: Fixtures) -> List[Scenario]:
+    """Todas as rotas medidas, na ordem de execução (criações antes das exclusões)"""
+
+    def pick(ids: List[int], i: int) -> int:
+        return ids[i % len(ids)]
+
+    def spec(method: str, url: str, **kwargs) -> Callable[[int], Awaitable[RequestSpec]]:
+        async def build(i: int) -> RequestSpec:
+            return method, url, kwargs
+        return build
+
+    scenarios: List[Scenario] = []
+
+    # Autenticação (register/login calculam bcrypt: poucas requisições)
+    async def register(i):
+        email = f"{fx.unique('cadastro')}@example.com"
+        return "POST", f"{API}/auth/register", {"json": {"email": email, "password": PASSWORD, "name": "Bench"}}
+
+    login_email = fx.login_email
+
+    async def login_form(i):
+        return "POST", f"{API}/auth/login", {"data": {"username": login_email, "password": PASSWORD}}
+
+    scenarios += [
+        Scenario("POST /api/auth/register", register, expect=(201,), scale=0.1),
+        Scenario("POST /api/auth/login", login_form, scale=0.1),
+        Scenario("POST /api/auth/login/json", spec(
+            "POST", f"{API}/auth/login/json", json={"email": login_email, "password": PASSWORD}
+        ), scale=0.1),
+        Scenario("GET /api/auth/me", spec("GET", f"{API}/auth/me", headers=fx.owner)),
+    ]
+
+    # Anúncios: as mesmas rotas no router original e no refatorado
+    for router in ("ads", "ads-refactored"):
+        base = f"{API}/{router}"
+
+        async def get_ad(i, base=base):
+            return "GET", f"{base}/{pick(fx.public_ad_ids, i)}", {}
+
+        async def update_ad(i, base=base):
+            return "PUT", f"{base}/{pick(fx.own_ad_ids, i)}", {"headers": fx.owner, "json": {"price": 800 + i % 200}}
+
+        async def change_status(i, base=base):
+            ad_id = pick(fx.own_ad_ids, i)
+            return "PATCH", f"{base}/{ad_id}/status", {
+                "headers": fx.owner, "params": {"new_status": fx.next_status(ad_id)}
+            }
+
+        async def bulk_status(i, base=base):
+            # Grupos de 10 anúncios que mudam juntos (sempre no mesmo estado)
+            group = pick(fx.ad_groups, i)
+            new_status = fx.next_status(group[0])
+            for ad_id in group[1:]:
+                fx.status[ad_id] = new_status
+            return "PATCH", f"{base}/status", {
+                "headers": fx.owner, "json": {"ad_ids": group, "new_status": new_status}
+            }
+
+        async def create_ad(i, base=base):
+            return "POST", f"{base}/", {"headers": fx.owner, "json": fx.ad_payload()}
+
+        async def delete_ad(i, base=base, router=router):
+            ad_id = await fx.take(f"{router}:ads", fx.create_ad)
+            return "DELETE", f"{base}/{ad_id}", {"headers": fx.owner}
+
+        scenarios += [
+            Scenario(f"GET {base}/", spec("GET", f"{base}/")),
+            Scenario(f"GET {base}/ (filtros)", spec(
+                "GET", f"{base}/", params={"category_id": fx.category_ids[0], "min_price": 500, "max_price": 3000}
+            )),
+            Scenario(f"GET {base}/me", spec("GET", f"{base}/me", headers=fx.owner)),
+            Scenario(f"GET {base}/{{ad_id}}", get_ad),
+            Scenario(f"POST {base}/", create_ad, expect=(201,), after=fx.give(f"{router}:ads")),
+            Scenario(f"PUT {base}/{{ad_id}}", update_ad),
+            Scenario(f"PATCH {base}/{{ad_id}}/status", change_status),
+            Scenario(f"PATCH {base}/status", bulk_status),
+            Scenario(f"DELETE {base}/{{ad_id}}", delete_ad, expect=(204,)),
+        ]
+
+    async def import_ads(i):
+        rows = "\n".join(json.dumps(fx.ad_payload()) for _ in range(20))
+        return "POST", f"{API}/ads/import", {
+            "headers": {**fx.owner, "Content-Type": "application/x-ndjson"}, "content": rows.encode()
+        }
+
+    scenarios.append(Scenario("POST /api/ads/import (20 linhas)", import_ads, scale=0.25))
+
+    # Favoritos
+    async def toggle(i):
+        return "POST", f"{API}/favorites/{pick(fx.public_ad_ids, i)}/toggle", {"headers": fx.visitor}
+
+    async def remove_favorite(i):
+        # Garante (fora da medição) que o anúncio está nos favoritos
+        ad_id = pick(fx.own_ad_ids, i)
+        response = await fx.call("POST", f"{API}/favorites/{ad_id}/toggle", headers=fx.visitor)
+        if not response.json()["favorited"]:
+            await fx.call("POST", f"{API}/favorites/{ad_id}/toggle", headers=fx.visitor)
+        return "DELETE", f"{API}/favorites/{ad_id}", {"headers": fx.visitor}
+
+    scenarios += [
+        Scenario("GET /api/favorites/", spec("GET", f"{API}/favorites/", headers=fx.visitor)),
+        Scenario("POST /api/favorites/{ad_id}/toggle", toggle),
+        Scenario("POST /api/favorites/check", spec(
+            "POST", f"{API}/favorites/check", headers=fx.visitor, json={"ad_ids": fx.public_ad_ids[:50]}
+        )),
+        Scenario("GET /api/favorites/check/{ad_id}", spec(
+            "GET", f"{API}/favorites/check/{fx.public_ad_ids[0]}", headers=fx.visitor
+        )),
+        Scenario("DELETE /api/favorites/{ad_id}", remove_favorite, expect=(204,)),
+    ]
+
+    # Comentários
+    async def ad_comments(i):
+        return "GET", f"{API}/comments/ad/{pick(fx.public_ad_ids, i)}", {}
+
+    async def get_comment(i):
+        return "GET", f"{API}/comments/{pick(fx.comment_ids, i)}", {}
+
+    async def create_comment(i):
+        return "POST", f"{API}/comments/", {
+            "headers": fx.visitor,
+            "json": {"ad_id": pick(fx.public_ad_ids, i), "content": "Aceita contrato semestral?", "rating": 1 + i % 5},
+        }
+
+    async def update_comment(i):
+        return "PUT", f"{API}/comments/{pick(fx.comment_ids, i)}", {
+            "headers": fx.visitor, "json": {"rating": 1 + i % 5}
+        }
+
+    async def delete_comment(i):
+        comment_id = await fx.take("comments", lambda: fx.create_comment(pick(fx.public_ad_ids, i)))
+        return "DELETE", f"{API}/comments/{comment_id}", {"headers": fx.visitor}
+
+    scenarios += [
+        Scenario("GET /api/comments/ad/{ad_id}", ad_comments),
+        Scenario("GET /api/comments/{comment_id}", get_comment),
+        Scenario("POST /api/comments/", create_comment, expect=(201,), after=fx.give("comments")),
+        Scenario("PUT /api/comments/{comment_id}", update_comment),
+        Scenario("DELETE /api/comments/{comment_id}", delete_comment, expect=(204,)),
+    ]
+
+    # Categorias
+    async def get_category(i):
+        return "GET", f"{API}/categories/{pick(fx.category_ids, i)}", {}
+
+    async def create_category(i):
+        slug = fx.unique("categoria")
+        return "POST", f"{API}/categories/", {
+            "headers": fx.owner, "json": {"name": slug, "slug": slug, "description": "Categoria do benchmark"}
+        }
+
+    async def update_category(i):
+        return "PUT", f"{API}/categories/{fx.editable_category_id}", {
+            "headers": fx.owner, "json": {"description": f"Descrição {i}"}
+        }
+
+    async def delete_category(i):
+        category_id = await fx.take("categories", fx.create_category)
+        return "DELETE", f"{API}/categories/{category_id}", {"headers": fx.owner}
+
+    scenarios += [
+        Scenario("GET /api/categories/", spec("GET", f"{API}/categories/")),
+        Scenario("GET /api/categories/{category_id}", get_category),
+        Scenario("POST /api/categories/", create_category, expect=(201,), after=fx.give("categories")),
+        Scenario("PUT /api/categories/{category_id}", update_category),
+        Scenario("DELETE /api/categories/{category_id}", delete_category, expect=(204,)),
+    ]
+
+    # Upload (conteúdo repetido: mede validação, hash e deduplicação)
+    async def upload(i):
+        return "POST", f"{API}/upload/upload", {"files": [("files", ("foto.jpg", fx.image, "image/jpeg"))]}
+
+    scenarios += [
+        Scenario("POST /api/upload/upload", upload),
+        Scenario("POST /api/upload/presign (existente)", spec(
+            "POST", f"{API}/upload/presign", headers=fx.owner, json=fx.presign_payload()
+        )),
+        Scenario("POST /api/upload/complete", spec(
+            "POST", f"{API}/upload/complete", headers=fx.owner, json={"key": fx.image_key}
+        )),
+        # A imagem é usada pelos anúncios de apoio: a rota confere as referências e a mantém
+        Scenario("DELETE /api/upload/upload/{filename}", spec(
+            "DELETE", f"{API}/upload/upload/{fx.image_key}", headers=fx.owner
+        )),
+    ]
+    return scenarios
+
+
+async def run_level(client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int) -> Result:
+    """`requests` requisições com `concurrency` clientes simultâneos (preparação fora da medição)"""
+    specs = [await scenario.build(i) for i in range(requests)]
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+    pending = iter(specs)
+
+    async def worker() -> None:
+        nonlocal errors
+        for method, url, kwargs in pending:
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            if response.status_code not in scenario.expect:
+                errors += 1
+            if scenario.after:
+                scenario.after(response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return Result(
+        p50_ms=percentile(latencies, 50) * 1000,
+        p95_ms=percentile(latencies, 95) * 1000,
+        p99_ms=percentile(latencies, 99) * 1000,
+        req_s=len(latencies) / elapsed if elapsed else 0.0,
+        requests=len(latencies),
+        errors=errors,
+        statuses=statuses,
+    )
+
+
+async def run_suite(client: httpx.AsyncClient, args) -> Dict[str, Dict[str, Result]]:
+    fixtures = Fixtures(client, concurrency=max(args.concurrency))
+    await fixtures.setup()
+    scenarios = build_scenarios(fixtures)
+    if args.only:
+        pattern = re.compile(args.only)
+        scenarios = [scenario for scenario in scenarios if pattern.search(scenario.name)]
+
+    results: Dict[str, Dict[str, Result]] = {scenario.name: {} for scenario in scenarios}
+    for scenario in scenarios:
+        if args.warmup:
+            await run_level(client, scenario, max(1, int(args.warmup * scenario.scale)), 1)
+    for concurrency in args.concurrency:
+        print(f"\nConcorrência {concurrency}")
+        print(f"  {'rota':<48} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'erros':>6}")
+        for scenario in scenarios:
+            requests = max(concurrency, int(args.requests * scenario.scale))
+            result = await run_level(client, scenario, requests, concurrency)
+            results[scenario.name][str(concurrency)] = result
+            print(
+                f"  {scenario.name:<48} {result.p50_ms:8.2f} {result.p95_ms:8.2f} {result.p99_ms:8.2f} "
+                f"{result.req_s:8.0f} {result.errors:>6}"
+                + (f"  status={result.statuses}" if result.errors else "")
+            )
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Result]], baseline: dict, args) -> List[str]:
+    """Regressões em relação à linha de base (lista vazia se nenhuma)"""
+    problems = []
+    for name, levels in results.items():
+        for concurrency, result in levels.items():
+            if result.errors:
+                problems.append(f"{name} (c={concurrency}): {result.errors} resposta(s) com status inesperado")
+            base = baseline.get("results", {}).get(name, {}).get(concurrency)
+            if base is None:
+                continue
+            limit = base["p95_ms"] * (1 + args.max_latency_regression)
+            if result.p95_ms > limit and result.p95_ms - base["p95_ms"] > args.min_delta_ms:
+                problems.append(
+                    f"{name} (c={concurrency}): p95 {result.p95_ms:.2f} ms > {base['p95_ms']:.2f} ms "
+                    f"+{args.max_latency_regression:.0%}"
+                )
+            if result.req_s < base["req_s"] * (1 - args.max_throughput_drop):
+                problems.append(
+                    f"{name} (c={concurrency}): {result.req_s:.0f} req/s < {base['req_s']:.0f} req/s "
+                    f"-{args.max_throughput_drop:.0%}"
+                )
+    return problems
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, Result]], args, mode: str) -> None:
+    data = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "mode": mode,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": {
+            name: {concurrency: result.__dict__ for concurrency, result in levels.items()}
+            for name, levels in results.items()
+        },
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    print(f"\nLinha de base gravada em {path}")
+
+
+def prepare_environment(args, directory: str) -> None:
+    """Configura a aplicação (antes de importá-la) e gera o banco temporário"""
+    database = args.database or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    os.environ["DATABASE_URL"] = database
+    os.environ["UPLOAD_DIR"] = os.path.join(directory, "uploads")
+    os.environ["STORAGE_BACKEND"] = "local"
+    os.environ["BACKGROUND_JOBS_ENABLED"] = "false"
+    os.environ["ADS_REFACTORED_ENABLED"] = "true"
+    if args.database:
+        from app.db.database import engine
+        from app.db.migrations.runner import upgrade
+
+        upgrade(engine)
+    else:
+        from benchmarks.generate_data import generate
+
+        generate(database, users=args.users, ads=args.ads, favorites=args.ads * 4, comments=args.ads * 2)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def in_process(args) -> Dict[str, Dict[str, Result]]:
+    from app.main import app
+
+    # httpx.ASGITransport não executa o lifespan: roda o da própria aplicação
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await run_suite(client, args)
+
+
+async def over_network(args, url: str) -> Dict[str, Dict[str, Result]]:
+    limits = httpx.Limits(max_connections=max(args.concurrency) + 4, max_keepalive_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        return await run_suite(client, args)
+
+
+def start_server():
+    """Uvicorn numa thread, na porta local livre (lifespan completo)"""
+    import uvicorn
+
+    from app.main import app
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+def parse_levels(value: str) -> List[int]:
+    return [int(level) for level in value.split(",") if level.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=parse_levels, default=[1, 8, 32], help="Níveis, ex.: 1,8,32")
+    parser.add_argument("--requests", type=int, default=200, help="Requisições por rota e por nível")
+    parser.add_argument("--warmup", type=int, default=20, help="Requisições de aquecimento por rota")
+    parser.add_argument("--only", help="Expressão regular: mede só as rotas cujo nome combina")
+    parser.add_argument("--socket", action="store_true", help="Mede por HTTP real (uvicorn numa porta local)")
+    parser.add_argument("--url", help="Mede um servidor já em execução (não gera banco)")
+    parser.add_argument("--database", help="Banco a usar em vez do temporário (será alterado!)")
+    parser.add_argument("--users", type=int, default=500, help="Usuários do banco temporário")
+    parser.add_argument("--ads", type=int, default=5000, help="Anúncios do banco temporário")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--save-baseline", help="Grava os resultados como linha de base")
+    parser.add_argument("--max-latency-regression", type=float, default=0.25, help="Aumento tolerado do p95 (0.25 = 25%%)")
+    parser.add_argument("--max-throughput-drop", type=float, default=0.25, help="Queda tolerada da vazão (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Diferença de p95 abaixo disso é ruído")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.url:
+            mode = "url"
+            results = asyncio.run(over_network(args, args.url.rstrip("/")))
+        else:
+            prepare_environment(args, directory)
+            if args.socket:
+                mode = "socket"
+                server, thread, url = start_server()
+                try:
+                    results = asyncio.run(over_network(args, url))
+                finally:
+                    server.should_exit = True
+                    thread.join()
+            else:
+                mode = "asgi"
+                results = asyncio.run(in_process(args))
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results, args, mode)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("mode") != mode:
+            print(f"\nAviso: linha de base medida no modo {baseline.get('meta', {}).get('mode')}, esta em {mode}")
+        problems = compare(results, baseline, args)
+        if problems:
+            print("\nRegressões:")
+            for problem in problems:
+                print(f"  - {problem}")
+            sys.exit(1)
+        print("\nSem regressões em relação à linha de base")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""Microbenchmark: mapeamento e serialização de anúncios (tempo por 1.000 linhas)
+
+Isola cada etapa que toda linha de `ads` percorre até virar JSON, nos dois
+caminhos da API:
+
+- `/api/ads-refactored`: `SQLAlchemyAdRepository._to_domain` (com os três
+  `json.loads` e o `Ad.__post_init__` medidos também em separado),
+  `_domain_ad_to_schema` e a resposta;
+- `/api/ads`: `AdRead.model_validate` direto do ORM e a resposta.
+
+"Resposta" é o que o FastAPI faz com o retorno da rota: `serialize_response`
+com o `response_model` da própria rota (`List[AdRead]`) e a renderização do
+`JSONResponse`.
+
+As linhas são anúncios ORM montados em memória, com listas e imagens no
+formato real (`--database` lê as linhas de um banco, ex.: o gerado por
+`benchmarks.generate_data`). Cada etapa roda `--repeat` vezes com o GC
+desligado, como no `timeit`; o relatório mostra mediana e mínimo por 1.000
+linhas e a fatia de cada etapa no total do caminho.
+
+Uso:
+    python -m benchmarks.bench_serialization --rows 1000 --repeat 30
+    python -m benchmarks.bench_serialization --database sqlite:///./carga.db --rows 5000
+    python -m benchmarks.bench_serialization --save resultado.json
+    python -m benchmarks.bench_serialization --baseline resultado.json
+"""
+import argparse
+import gc
+import hashlib
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Sequence
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.core.upload_store import blob_key
+from app.db import models
+from app.domain.entities.ad import Ad as DomainAd
+from app.infrastructure.repositories.ad_repository import SQLAlchemyAdRepository
+from app.infrastructure.storage import get_storage
+from app.routers import ads, ads_refactored
+from app.schemas.ad import AdRead
+
+RULES = ["Não fumante", "Sem festas", "Silêncio após 22h", "Apenas estudantes"]
+AMENITIES = ["Wi-Fi", "Mobiliado", "Máquina de lavar", "Garagem", "Água e luz inclusas"]
+
+
+def make_rows(count: int, seed: int) -> List[models.Ad]:
+    """Anúncios ORM em memória (sem sessão), com JSON e imagens como no banco"""
+    rng = random.Random(seed)
+    storage = get_storage()
+    start = datetime(2025, 1, 1, 12, 0, 0, 1)
+    rows = []
+    for ad_id in range(1, count + 1):
+        images = [
+            storage.url_for(blob_key(hashlib.sha256(f"{ad_id}-{n}".encode()).hexdigest(), ".jpg", 1600, 1200))
+            for n in range(rng.randint(1, 8))
+        ]
+        created_at = start + timedelta(minutes=ad_id, microseconds=rng.randrange(1, 10**6))
+        rating_count = rng.randint(0, 20)
+        rows.append(models.Ad(
+            id=ad_id,
+            user_id=rng.randint(1, 500),
+            category_id=rng.randint(1, 5),
+            title=f"Quarto mobiliado perto do campus {ad_id}",
+            description="Quarto mobiliado, contas inclusas, a cinco minutos da universidade. " * 3,
+            seller="Anunciante",
+            location="Centro, Viçosa - MG",
+            cep="36570-000",
+            price=float(rng.randrange(500, 3000, 10)),
+            bedrooms=rng.randint(1, 4),
+            bathrooms=rng.randint(1, 2),
+            rules=json.dumps(rng.sample(RULES, rng.randint(0, len(RULES)))),
+            amenities=json.dumps(rng.sample(AMENITIES, rng.randint(0, len(AMENITIES)))),
+            custom_rules=None,
+            custom_amenities=None,
+            images=json.dumps(images),
+            status="published",
+            created_at=created_at,
+            updated_at=created_at + timedelta(days=2),
+            published_at=created_at,
+            favorites_count=rng.randint(0, 50),
+            comments_count=rating_count + rng.randint(0, 5),
+            rating_sum=rating_count * rng.randint(3, 5),
+            rating_count=rating_count,
+        ))
+    return rows
+
+
+def load_rows(database: str, count: int) -> List[models.Ad]:
+    """Linhas reais de um banco (carregadas e desanexadas da sessão)"""
+    engine = create_engine(database)
+    with Session(engine) as db:
+        rows = list(db.scalars(select(models.Ad).order_by(models.Ad.id.desc()).limit(count)))
+        db.expunge_all()
+    engine.dispose()
+    return rows
+
+
+def route_field(router, name: str):
+    """`response_field` da rota GET de listagem (o mesmo que o FastAPI usa)"""
+    for route in router.routes:
+        if route.name == name and "GET" in route.methods:
+            return route.response_field
+    raise LookupError(name)
+
+
+def respond(field, items: Sequence[Any]) -> bytes:
+    """Validação/serialização do response_model e renderização, como na rota"""
+    # Com is_coroutine=True nada é enviado a threads: a corrotina termina no primeiro passo
+    coroutine = serialize_response(field=field, response_content=list(items))
+    try:
+        coroutine.send(None)
+    except StopIteration as done:
+        return JSONResponse(done.value).body
+    raise RuntimeError("serialize_response suspendeu a execução")
+
+
+def measure(func: Callable[[], Any], repeat: int, rows: int) -> Dict[str, float]:
+    """Mediana e mínimo, em ms por 1.000 linhas"""
+    func()  # Aquecimento (caches do pydantic, imports tardios)
+    timings = []
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+    finally:
+        if enabled:
+            gc.enable()
+    scale = 1000 * 1000 / rows
+    return {"median_ms": statistics.median(timings) * scale, "min_ms": min(timings) * scale}
+
+
+def run(rows: List[models.Ad], repeat: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    repository = SQLAlchemyAdRepository(db=None)
+    domain_ads = [repository._to_domain(row) for row in rows]
+    schemas_refactored = [ads_refactored._domain_ad_to_schema(ad) for ad in domain_ads]
+    schemas_plain = [AdRead.model_validate(row) for row in rows]
+    refactored_field = route_field(ads_refactored.router, "get_ads")
+    plain_field = route_field(ads.router, "get_ads")
+
+    def json_loads():
+        for row in rows:
+            json.loads(row.rules) if row.rules else []
+            json.loads(row.amenities) if row.amenities else []
+            json.loads(row.images) if row.images else []
+
+    def post_init():
+        for ad in domain_ads:
+            DomainAd.__post_init__(ad)
+
+    count = len(rows)
+    return {
+        "refatorado": {
+            "json.loads (rules, amenities, images)": measure(json_loads, repeat, count),
+            "Ad.__post_init__": measure(post_init, repeat, count),
+            "_to_domain (total)": measure(lambda: [repository._to_domain(row) for row in rows], repeat, count),
+            "_domain_ad_to_schema": measure(
+                lambda: [ads_refactored._domain_ad_to_schema(ad) for ad in domain_ads], repeat, count
+            ),
+            "resposta (List[AdRead] -> JSON)": measure(
+                lambda: respond(refactored_field, schemas_refactored), repeat, count
+            ),
+        },
+        "original": {
+            "AdRead.model_validate (ORM)": measure(
+                lambda: [AdRead.model_validate(row) for row in rows], repeat, count
+            ),
+            "resposta (List[AdRead] -> JSON)": measure(lambda: respond(plain_field, schemas_plain), repeat, count),
+        },
+    }
+
+
+# Etapas que somam o caminho inteiro (as demais são partes de `_to_domain`)
+PATH_STEPS = {
+    "refatorado": ("_to_domain (total)", "_domain_ad_to_schema", "resposta (List[AdRead] -> JSON)"),
+    "original": ("AdRead.model_validate (ORM)", "resposta (List[AdRead] -> JSON)"),
+}
+
+
+def print_results(results, baseline=None) -> None:
+    for path, steps in results.items():
+        total = sum(steps[step]["median_ms"] for step in PATH_STEPS[path])
+        print(f"\nCaminho {path} (ms por 1.000 linhas, o mesmo que µs por linha)")
+        print(f"  {'etapa':<40} {'mediana':>9} {'mínimo':>9} {'% total':>8}" + ("  vs base" if baseline else ""))
+        for step, timing in steps.items():
+            share = f"{timing['median_ms'] / total:7.0%}" if total else "-"
+            line = f"  {step:<40} {timing['median_ms']:9.2f} {timing['min_ms']:9.2f} {share:>8}"
+            base = (baseline or {}).get(path, {}).get(step)
+            if base:
+                line += f"  {timing['median_ms'] / base['median_ms'] - 1:+7.1%}"
+            print(line)
+        print(f"  {'total do caminho':<40} {total:9.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=30, help="Execuções de cada etapa")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database", help="Lê as linhas deste banco em vez de montá-las em memória")
+    parser.add_argument("--save", help="Grava os resultados em JSON")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args()
+
+    rows = load_rows(args.database, args.rows) if args.database else make_rows(args.rows, args.seed)
+    if not rows:
+        parser.error("nenhum anúncio encontrado")
+    print(f"{len(rows)} anúncios, {args.repeat} execuções por etapa")
+    results = run(rows, args.repeat)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados gravados em {args.save}")
+
+
+if __name__ == "__main__":
+    main()
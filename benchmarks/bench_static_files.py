@@ -0,0 +1,114 @@
+"""Benchmark: StaticFiles padrão vs ImmutableStaticFiles para /uploads
+
+Mede, em processo (ASGI, sem rede), latência e bytes transferidos para:
+- GET completo (primeira visita)
+- revalidação condicional (If-None-Match -> 304)
+- leitura parcial (Range: bytes=0-65535)
+- visitas repetidas: com `immutable` o navegador nem envia requisição
+
+Uso:
+    python -m benchmarks.bench_static_files --files 20 --size 500000 --requests 500
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.staticfiles import StaticFiles
+
+from app.core.static_files import ImmutableStaticFiles
+
+
+def build_app(static_cls, directory: str) -> Starlette:
+    return Starlette(routes=[Mount("/uploads", app=static_cls(directory=directory))])
+
+
+def make_files(directory: str, count: int, size: int) -> list:
+    names = []
+    for i in range(count):
+        name = f"{os.urandom(32).hex()}.jpg"
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(os.urandom(size))
+        names.append(name)
+    return names
+
+
+async def run_scenario(client: httpx.AsyncClient, names: list, requests: int, headers_for) -> dict:
+    latencies = []
+    transferred = 0
+    statuses = {}
+    for i in range(requests):
+        name = names[i % len(names)]
+        started = time.perf_counter()
+        response = await client.get(f"/uploads/{name}", headers=headers_for(name))
+        latencies.append(time.perf_counter() - started)
+        transferred += len(response.content)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "req_s": len(latencies) / sum(latencies),
+        "bytes": transferred,
+        "statuses": statuses,
+    }
+
+
+async def bench(static_cls, directory: str, names: list, requests: int) -> dict:
+    transport = httpx.ASGITransport(app=build_app(static_cls, directory))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        etags = {}
+        cache_control = ""
+        for name in names:
+            response = await client.get(f"/uploads/{name}")
+            etags[name] = response.headers["etag"]
+            cache_control = response.headers.get("cache-control", "")
+
+        results = {
+            "full": await run_scenario(client, names, requests, lambda n: {}),
+            "revalidate": await run_scenario(
+                client, names, requests, lambda n: {"if-none-match": etags[n]}
+            ),
+            "range": await run_scenario(
+                client, names, requests, lambda n: {"range": "bytes=0-65535"}
+            ),
+        }
+        # Visitas repetidas dentro do max-age: `immutable` dispensa qualquer requisição
+        results["repeat_view_requests"] = 0 if "immutable" in cache_control else len(names)
+        return results
+
+
+def print_results(label: str, results: dict) -> None:
+    print(f"\n{label}")
+    for scenario in ("full", "revalidate", "range"):
+        r = results[scenario]
+        print(
+            f"  {scenario:<11} p50={r['p50_ms']:.3f}ms p95={r['p95_ms']:.3f}ms "
+            f"{r['req_s']:.0f} req/s bytes={r['bytes']} status={r['statuses']}"
+        )
+    print(f"  requisições por visita repetida: {results['repeat_view_requests']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--size", type=int, default=500_000, help="bytes por arquivo")
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        names = make_files(directory, args.files, args.size)
+        for label, static_cls in (
+            ("StaticFiles (atual)", StaticFiles),
+            ("ImmutableStaticFiles", ImmutableStaticFiles),
+        ):
+            print_results(label, asyncio.run(bench(static_cls, directory, names, args.requests)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,511 @@
+"""Gerador de dados sintéticos em volume de produção (testes de carga)
+
+Preenche um banco (com as migrações aplicadas) com usuários, anúncios,
+favoritos e comentários em distribuições parecidas com as reais:
+
+- cidades universitárias com peso decrescente (Zipf), bairros e CEP por cidade;
+- preço log-normal por categoria e cidade; quartos/banheiros por categoria;
+- comodidades e regras sorteadas com probabilidades próprias;
+- status: maioria publicados, depois concluídos, cancelados, rascunhos e reservados;
+- datas espalhadas pelos últimos `--days` dias, com mais anúncios recentes;
+- popularidade concentrada (poucos anúncios recebem muitos favoritos/comentários)
+  e usuários com atividade desigual; notas puxadas para 4-5.
+
+Velocidade: inserts em massa (executemany) em transações de `--chunk-size`
+linhas, índices secundários recriados só no fim e, no SQLite, `synchronous=OFF`
+durante a carga. Os contadores desnormalizados (favoritos, comentários,
+histogramas de avaliações e anúncios publicados por categoria) são calculados
+durante a geração e gravados no fim, sem recontar no banco.
+
+As datas sempre têm microssegundos diferentes de zero: no SQLite elas ficam
+como texto, e a paginação por cursor compara no mesmo formato.
+
+Todos os usuários têm a senha `senha123` (e-mails `user<n>@example.com`).
+
+Uso:
+    python -m benchmarks.generate_data --database sqlite:///./carga.db
+    python -m benchmarks.generate_data --database sqlite:///./carga.db \\
+        --users 100000 --ads 2000000 --favorites 10000000 --comments 5000000
+"""
+import argparse
+import json
+import math
+import random
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import bindparam, create_engine, event, func, insert, select, text, update
+from sqlalchemy.engine import Engine
+
+from app.core.category_registry import bump_version
+from app.core.security import get_password_hash
+from app.db import models
+from app.db.counters import RATING_STARS, STAR_COLUMNS, star_column
+from app.db.migrations.operations import create_missing_indexes
+from app.db.migrations.runner import upgrade
+
+PASSWORD = "senha123"
+
+# (cidade, UF, prefixo do CEP, custo relativo, bairros)
+CITIES = (
+    ("São Paulo", "SP", "01", 1.45, ("Butantã", "Pinheiros", "Vila Mariana", "Consolação", "Bela Vista", "Liberdade")),
+    ("Rio de Janeiro", "RJ", "22", 1.35, ("Botafogo", "Tijuca", "Flamengo", "Copacabana", "Maracanã")),
+    ("Belo Horizonte", "MG", "30", 1.05, ("Pampulha", "Savassi", "Funcionários", "Centro", "Santo Antônio")),
+    ("Campinas", "SP", "13", 1.10, ("Barão Geraldo", "Cambuí", "Centro", "Taquaral")),
+    ("Porto Alegre", "RS", "90", 1.00, ("Cidade Baixa", "Bom Fim", "Azenha", "Centro Histórico")),
+    ("Curitiba", "PR", "80", 1.00, ("Centro", "Jardim Botânico", "Rebouças", "Água Verde")),
+    ("Recife", "PE", "50", 0.85, ("Várzea", "Boa Vista", "Boa Viagem", "Casa Amarela")),
+    ("Salvador", "BA", "40", 0.85, ("Ondina", "Federação", "Barra", "Rio Vermelho")),
+    ("Florianópolis", "SC", "88", 1.15, ("Trindade", "Pantanal", "Carvoeira", "Córrego Grande")),
+    ("Fortaleza", "CE", "60", 0.80, ("Benfica", "Pici", "Aldeota", "Montese")),
+    ("Viçosa", "MG", "36", 0.70, ("Centro", "Ramos", "Clélia Bernardes")),
+    ("São Carlos", "SP", "13", 0.80, ("Centro", "Jardim Paraíso", "Vila Prado")),
+    ("Santa Maria", "RS", "97", 0.70, ("Camobi", "Centro", "Nossa Senhora de Lourdes")),
+    ("Uberlândia", "MG", "38", 0.80, ("Santa Mônica", "Umuarama", "Centro")),
+    ("Lavras", "MG", "37", 0.65, ("Centro", "Jardim Glória", "Vila Ester")),
+)
+
+# slug -> (preço mediano, quartos possíveis, peso no sorteio)
+CATEGORY_PROFILES = {
+    "quarto": (750, (1,), 0.40),
+    "kitnet": (1100, (1,), 0.20),
+    "apartamento": (2100, (1, 2, 2, 3, 3, 4), 0.25),
+    "casa": (2600, (2, 3, 3, 4, 5), 0.10),
+    "residencial": (1500, (1, 2, 3), 0.05),
+}
+DEFAULT_CATEGORIES = (
+    ("Apartamento", "apartamento", "Apartamentos para alugar"),
+    ("Casa", "casa", "Casas para alugar"),
+    ("Kitnet", "kitnet", "Kitnets e quitinetes"),
+    ("Quarto", "quarto", "Quartos para alugar"),
+    ("Residencial", "residencial", "Outros imóveis residenciais"),
+)
+
+# (item, probabilidade de aparecer)
+AMENITIES = (
+    ("Wi-Fi", 0.85), ("Mobiliado", 0.55), ("Máquina de lavar", 0.45), ("Garagem", 0.30),
+    ("Ar-condicionado", 0.25), ("Academia", 0.10), ("Piscina", 0.08), ("Portaria 24h", 0.20),
+    ("Água e luz inclusas", 0.40), ("Próximo à universidade", 0.60), ("Quintal", 0.12),
+)
+RULES = (
+    ("Não fumante", 0.55), ("Sem animais", 0.35), ("Aceita animais", 0.15), ("Sem festas", 0.45),
+    ("Silêncio após 22h", 0.40), ("Apenas estudantes", 0.30), ("Visitas com aviso prévio", 0.20),
+)
+STATUSES = (("published", 0.60), ("completed", 0.14), ("cancelled", 0.10), ("draft", 0.09), ("reserved", 0.07))
+RATINGS = ((None, 0.20), (5, 0.36), (4, 0.24), (3, 0.10), (2, 0.05), (1, 0.05))
+
+TITLE_PREFIXES = ("Vaga em", "Aluga-se", "Ótima opção:", "Oportunidade:", "Disponível:")
+DESCRIPTION_SENTENCES = (
+    "Ambiente tranquilo e bem iluminado.", "A poucos minutos a pé do campus.",
+    "Próximo a mercados, farmácias e pontos de ônibus.", "Contas divididas entre os moradores.",
+    "Cozinha equipada e área de serviço compartilhada.", "Prédio com portaria e segurança.",
+    "Ideal para estudantes de graduação ou pós.", "Internet de alta velocidade inclusa.",
+    "Quartos com armário embutido.", "Limpeza das áreas comuns semanal.",
+    "Bairro com muitas repúblicas e vida universitária.", "Contrato flexível por semestre.",
+)
+COMMENTS = (
+    "Ótimo lugar, recomendo!", "O dono é muito atencioso.", "Localização excelente.",
+    "Um pouco barulhento à noite.", "Bom custo-benefício.", "As fotos não correspondem muito.",
+    "Ainda está disponível?", "Aceita contrato de seis meses?", "Morei lá por um ano, adorei.",
+)
+
+
+@dataclass
+class AdPlan:
+    """Atributos decididos antes da carga (usados por favoritos e comentários)"""
+    owner: array  # user_id de cada anúncio
+    created: array  # segundos desde o início do período
+    category_index: array
+    status_index: array
+
+
+def _cumulative(weights: Sequence[float]) -> List[float]:
+    total, cumulative = 0.0, []
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    return cumulative
+
+
+def _moment(start: datetime, seconds: float, rng: random.Random) -> datetime:
+    """Data com microssegundos sempre diferentes de zero"""
+    return start + timedelta(seconds=int(seconds), microseconds=rng.randrange(1, 10**6))
+
+
+def _chunks(rows: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    chunk: List[dict] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _skewed_index(rng: random.Random, n: int, skew: float) -> int:
+    """Índice em [0, n) com os maiores (mais recentes) bem mais prováveis"""
+    return n - 1 - min(n - 1, int(n * rng.random() ** skew))
+
+
+class Generator:
+    """Gera e insere os dados, mantendo os contadores em memória"""
+
+    def __init__(self, engine: Engine, seed: int, days: int, chunk_size: int):
+        self.engine = engine
+        self.rng = random.Random(seed)
+        self.chunk_size = chunk_size
+        self.period = days * 24 * 3600
+        self.start = datetime.utcnow() - timedelta(days=days)
+        self.city_weights = _cumulative([1 / (rank + 1) for rank in range(len(CITIES))])
+
+    def _insert(self, table, rows: Iterator[dict], label: str) -> int:
+        total = 0
+        started = time.perf_counter()
+        for chunk in _chunks(rows, self.chunk_size):
+            with self.engine.begin() as conn:
+                conn.execute(insert(table), chunk)
+            total += len(chunk)
+        elapsed = time.perf_counter() - started
+        print(f"  {label:<12} {total:>10} linhas em {elapsed:7.1f} s ({total / elapsed if elapsed else 0:,.0f}/s)")
+        return total
+
+    # Usuários -------------------------------------------------------------
+
+    def users(self, first_id: int, count: int) -> None:
+        password = get_password_hash(PASSWORD)
+        rng = self.rng
+
+        def rows():
+            for user_id in range(first_id, first_id + count):
+                yield {
+                    "id": user_id,
+                    "email": f"user{user_id}@example.com",
+                    "name": f"Usuário {user_id}",
+                    "hashed_password": password,
+                    "is_active": True,
+                    "created_at": _moment(self.start, rng.random() * self.period * 0.5, rng),
+                }
+
+        self._insert(models.User.__table__, rows(), "usuários")
+
+    # Anúncios -------------------------------------------------------------
+
+    def plan_ads(self, count: int, first_user: int, users: int, categories: List[Tuple[int, str]]) -> AdPlan:
+        """Dono, data, categoria e status de cada anúncio (antes de gerar o resto)"""
+        rng = self.rng
+        # Poucos anunciantes com muitos anúncios (proprietários de várias unidades)
+        owner_weights = _cumulative([1 / (rank + 1) ** 0.8 for rank in range(users)])
+        category_weights = _cumulative([CATEGORY_PROFILES.get(slug, (0, (), 0.05))[2] for _, slug in categories])
+        status_weights = _cumulative([weight for _, weight in STATUSES])
+        owners = rng.choices(range(users), cum_weights=owner_weights, k=count)
+        # Crescimento: mais anúncios recentes (raiz quadrada puxa para o fim do período)
+        created = [self.period * math.sqrt(rng.random()) for _ in range(count)]
+        category_index = rng.choices(range(len(categories)), cum_weights=category_weights, k=count)
+        status_index = rng.choices(range(len(STATUSES)), cum_weights=status_weights, k=count)
+        # Ids crescem com a data, como na vida real
+        order = sorted(range(count), key=created.__getitem__)
+        return AdPlan(
+            array("i", (first_user + owners[i] for i in order)),
+            array("d", (created[i] for i in order)),
+            array("i", (category_index[i] for i in order)),
+            array("b", (status_index[i] for i in order)),
+        )
+
+    def _pick(self, items: Sequence[Tuple[str, float]]) -> List[str]:
+        return [item for item, probability in items if self.rng.random() < probability]
+
+    def ads(self, first_id: int, plan: AdPlan, categories: List[Tuple[int, str]], counters: "Counters") -> None:
+        rng = self.rng
+
+        def rows():
+            for index in range(len(plan.owner)):
+                ad_id = first_id + index
+                category_id, slug = categories[plan.category_index[index]]
+                median_price, bedroom_options, _ = CATEGORY_PROFILES.get(slug, (1500, (1, 2), 0))
+                city, state, cep_prefix, cost, districts = CITIES[rng.choices(range(len(CITIES)), cum_weights=self.city_weights)[0]]
+                district = rng.choice(districts)
+                status = STATUSES[plan.status_index[index]][0]
+                created = plan.created[index]
+                created_at = _moment(self.start, created, rng)
+                bedrooms = rng.choice(bedroom_options)
+                draft = status == "draft"
+                updated_at = None
+                if status != "published" or rng.random() < 0.3:
+                    # Alterado (ou encerrado) em até 60 dias, sem passar de agora
+                    updated_at = _moment(self.start, created + rng.uniform(0, min(60 * 86400, self.period - created)), rng)
+                if status == "published":
+                    counters.published[category_id] = counters.published.get(category_id, 0) + 1
+                sentences = rng.sample(DESCRIPTION_SENTENCES, rng.randint(2, 6))
+                yield {
+                    "id": ad_id,
+                    "user_id": plan.owner[index],
+                    "category_id": category_id,
+                    "title": f"{rng.choice(TITLE_PREFIXES)} {slug} em {district}, {city}",
+                    "description": " ".join(sentences),
+                    "seller": None if draft and rng.random() < 0.5 else f"Anunciante {plan.owner[index]}",
+                    "location": None if draft and rng.random() < 0.5 else f"{district}, {city} - {state}",
+                    "cep": f"{cep_prefix}{rng.randrange(0, 1000):03d}-{rng.randrange(0, 1000):03d}",
+                    # Log-normal em torno da mediana da categoria, ajustada pela cidade
+                    "price": round(median_price * cost * math.exp(rng.gauss(0, 0.35)) / 10) * 10,
+                    "bedrooms": bedrooms,
+                    "bathrooms": rng.randint(1, max(1, bedrooms - 1)) if bedrooms > 1 else 1,
+                    "rules": json.dumps(self._pick(RULES)),
+                    "amenities": json.dumps(self._pick(AMENITIES)),
+                    "custom_rules": "Combinar horários de visita pelo chat." if rng.random() < 0.1 else None,
+                    "custom_amenities": None,
+                    "images": json.dumps([
+                        f"https://picsum.photos/seed/anuncio-{ad_id}-{n}/960/720" for n in range(rng.randint(1, 8))
+                    ]),
+                    "status": status,
+                    "created_at": created_at,
+                    "updated_at": updated_at,
+                    "published_at": (updated_at or created_at) if status == "published" else None,
+                }
+
+        self._insert(models.Ad.__table__, rows(), "anúncios")
+
+    # Favoritos e comentários ----------------------------------------------
+
+    def favorites(self, first_user: int, users: int, first_ad: int, ads: int, total: int, plan: AdPlan,
+                  counters: "Counters") -> None:
+        """Cada usuário favorita um número desigual de anúncios distintos (em ordem de usuário)"""
+        rng = self.rng
+        activity = [rng.lognormvariate(0, 1.0) for _ in range(users)]
+        scale = total / sum(activity)
+
+        def rows():
+            for offset, weight in enumerate(activity):
+                user_id = first_user + offset
+                wanted = min(ads, int(round(weight * scale)))
+                if wanted * 2 > ads:
+                    chosen = rng.sample(range(ads), wanted)
+                else:
+                    chosen = set()
+                    while len(chosen) < wanted:
+                        chosen.add(_skewed_index(rng, ads, 2.5))
+                for index in chosen:
+                    counters.favorites[index] += 1
+                    yield {
+                        "user_id": user_id,
+                        "ad_id": first_ad + index,
+                        "created_at": _moment(self.start, rng.uniform(plan.created[index], self.period), rng),
+                    }
+
+        self._insert(models.favorites_table, rows(), "favoritos")
+
+    def comments(self, first_user: int, users: int, first_ad: int, ads: int, total: int, plan: AdPlan,
+                 counters: "Counters") -> None:
+        rng = self.rng
+        rating_weights = _cumulative([weight for _, weight in RATINGS])
+
+        def rows():
+            for _ in range(total):
+                index = _skewed_index(rng, ads, 2.0)
+                rating = RATINGS[rng.choices(range(len(RATINGS)), cum_weights=rating_weights)[0]][0]
+                counters.add_comment(index, plan.owner[index], rating)
+                yield {
+                    "ad_id": first_ad + index,
+                    "user_id": first_user + rng.randrange(users),
+                    "content": rng.choice(COMMENTS),
+                    "rating": rating,
+                    "created_at": _moment(self.start, rng.uniform(plan.created[index], self.period), rng),
+                }
+
+        self._insert(models.Comment.__table__, rows(), "comentários")
+
+
+class Counters:
+    """Contadores desnormalizados acumulados durante a geração"""
+
+    def __init__(self, ads: int):
+        zeros = array("i", bytes(4 * ads))
+        self.favorites = array("i", zeros)
+        self.comments = array("i", zeros)
+        self.rating_sum = array("i", zeros)
+        self.stars = {star: array("i", zeros) for star in RATING_STARS}
+        self.owner_stars: Dict[int, Dict[int, int]] = {}
+        self.published: Dict[int, int] = {}
+
+    def add_comment(self, index: int, owner_id: int, rating) -> None:
+        self.comments[index] += 1
+        if rating is None:
+            return
+        self.rating_sum[index] += rating
+        self.stars[rating][index] += 1
+        histogram = self.owner_stars.setdefault(owner_id, dict.fromkeys(RATING_STARS, 0))
+        histogram[rating] += 1
+
+    def write(self, engine: Engine, first_ad: int, chunk_size: int) -> None:
+        started = time.perf_counter()
+        ad_columns = ("favorites_count", "comments_count", "rating_sum", "rating_count") + STAR_COLUMNS
+        ad = models.Ad.__table__
+        statement = update(ad).where(ad.c.id == bindparam("ad_id")).values(
+            {column: bindparam(column) for column in ad_columns}
+        )
+
+        def ad_rows():
+            for index in range(len(self.comments)):
+                if not (self.favorites[index] or self.comments[index]):
+                    continue
+                stars = {star_column(star): self.stars[star][index] for star in RATING_STARS}
+                yield {
+                    "ad_id": first_ad + index,
+                    "favorites_count": self.favorites[index],
+                    "comments_count": self.comments[index],
+                    "rating_sum": self.rating_sum[index],
+                    "rating_count": sum(stars.values()),
+                    **stars,
+                }
+
+        updated = 0
+        for chunk in _chunks(ad_rows(), chunk_size):
+            with engine.begin() as conn:
+                conn.execute(statement, chunk)
+            updated += len(chunk)
+
+        user = models.User.__table__
+        owner_statement = update(user).where(user.c.id == bindparam("user_id")).values(
+            {column: user.c[column] + bindparam(column) for column in STAR_COLUMNS}
+        )
+        owner_rows = (
+            {"user_id": owner_id, **{star_column(star): count for star, count in histogram.items()}}
+            for owner_id, histogram in self.owner_stars.items()
+        )
+        for chunk in _chunks(owner_rows, chunk_size):
+            with engine.begin() as conn:
+                conn.execute(owner_statement, chunk)
+
+        counts = models.CategoryAdCount.__table__
+        with engine.begin() as conn:
+            for category_id, published in self.published.items():
+                result = conn.execute(
+                    update(counts).where(counts.c.category_id == category_id)
+                    .values(published_count=counts.c.published_count + published)
+                )
+                if result.rowcount == 0:
+                    conn.execute(insert(counts).values(category_id=category_id, published_count=published))
+        print(f"  {'contadores':<12} {updated:>10} anúncios, {len(self.owner_stars)} donos em "
+              f"{time.perf_counter() - started:7.1f} s")
+
+
+def _fast_sqlite(engine: Engine) -> None:
+    """Carga sem fsync a cada transação (o banco gerado é descartável)"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(connection, _record):
+        cursor = connection.cursor()
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-200000")
+        cursor.close()
+
+
+def _drop_secondary_indexes(engine: Engine) -> List[str]:
+    """Remove os índices das tabelas grandes; `create_missing_indexes` os recria no fim"""
+    names = [
+        index.name
+        for table in (models.Ad.__table__, models.Comment.__table__, models.favorites_table)
+        for index in table.indexes
+    ]
+    with engine.begin() as conn:
+        for name in names:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    return names
+
+
+def _ensure_categories(engine: Engine) -> List[Tuple[int, str]]:
+    """Categorias existentes (as padrão do init_db se não houver nenhuma)"""
+    with engine.begin() as conn:
+        rows = conn.execute(select(models.Category.id, models.Category.slug).order_by(models.Category.id)).all()
+        if not rows:
+            conn.execute(insert(models.Category.__table__), [
+                {"name": name, "slug": slug, "description": description}
+                for name, slug, description in DEFAULT_CATEGORIES
+            ])
+            conn.execute(insert(models.CategoryAdCount.__table__).from_select(
+                ["category_id"], select(models.Category.id)
+            ))
+            bump_version(conn)
+            rows = conn.execute(select(models.Category.id, models.Category.slug).order_by(models.Category.id)).all()
+    return [tuple(row) for row in rows]
+
+
+def _next_id(engine: Engine, column) -> int:
+    with engine.connect() as conn:
+        return (conn.scalar(select(func.max(column))) or 0) + 1
+
+
+def generate(
+    database: str,
+    users: int,
+    ads: int,
+    favorites: int,
+    comments: int,
+    days: int = 365,
+    seed: int = 42,
+    chunk_size: int = 20000,
+    keep_indexes: bool = False,
+) -> None:
+    """Aplica as migrações em `database` e acrescenta os dados (também usado por bench_http)"""
+    engine = create_engine(database)
+    _fast_sqlite(engine)
+    upgrade(engine)
+    categories = _ensure_categories(engine)
+    first_user = _next_id(engine, models.User.id)
+    first_ad = max(_next_id(engine, models.Ad.id), _next_id(engine, models.ArchivedAd.id))
+    dropped = [] if keep_indexes else _drop_secondary_indexes(engine)
+
+    started = time.perf_counter()
+    generator = Generator(engine, seed, days, chunk_size)
+    counters = Counters(ads)
+    print(f"Gerando em {database}")
+    generator.users(first_user, users)
+    plan = generator.plan_ads(ads, first_user, users, categories)
+    generator.ads(first_ad, plan, categories, counters)
+    if ads:
+        generator.favorites(first_user, users, first_ad, ads, favorites, plan, counters)
+        generator.comments(first_user, users, first_ad, ads, comments, plan, counters)
+    counters.write(engine, first_ad, chunk_size)
+
+    if dropped:
+        index_started = time.perf_counter()
+        created = create_missing_indexes(engine, models.Base.metadata)
+        print(f"  {'índices':<12} {len(created):>10} recriados em {time.perf_counter() - index_started:7.1f} s")
+    engine.dispose()
+    print(f"Concluído em {time.perf_counter() - started:.1f} s (senha dos usuários: {PASSWORD})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", required=True, help="URL do banco a preencher (ex.: sqlite:///./carga.db)")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--ads", type=int, default=20000)
+    parser.add_argument("--favorites", type=int, default=100000)
+    parser.add_argument("--comments", type=int, default=50000)
+    parser.add_argument("--days", type=int, default=365, help="Período coberto pelas datas")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=20000, help="Linhas por transação")
+    parser.add_argument("--keep-indexes", action="store_true", help="Não remove os índices durante a carga")
+    args = parser.parse_args()
+
+    generate(
+        args.database,
+        users=args.users,
+        ads=args.ads,
+        favorites=args.favorites,
+        comments=args.comments,
+        days=args.days,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+        keep_indexes=args.keep_indexes,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Perfil de importação e orçamento de cold start de `app.main`
+
+Cada medição roda em um processo Python novo (cache de módulos vazio, como um
+worker do uvicorn subindo):
+
+- relatório do `python -X importtime`: módulos mais caros (tempo acumulado e
+  próprio) e o total por pacote de topo;
+- cold start: tempo de `import app.main` (criação do objeto `app`), mediana
+  de várias execuções, comparado com o orçamento. Sai com código 1 se
+  estourar, então serve de checagem no CI.
+
+Mede o boot na configuração em uso (padrão, `.env` e ambiente), inclusive
+o router `/ads-refactored` quando ligado (`ADS_REFACTORED_ENABLED`, padrão
+true); só os jobs em segundo plano ficam desligados.
+
+Uso:
+    python -m benchmarks.startup_profile                  # relatório + checagem
+    python -m benchmarks.startup_profile --budget-ms 800  # orçamento (ou STARTUP_BUDGET_MS)
+    python -m benchmarks.startup_profile --runs 10 --top 30
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BUDGET_MS = 2000
+COLD_START_SNIPPET = (
+    "import time; started = time.perf_counter(); import app.main; "
+    "print((time.perf_counter() - started) * 1000)"
+)
+# Nunca devem ser importados no boot (carregados sob demanda)
+# Camada de serviços: só o router /ads-refactored a importa no boot
+SERVICE_LAYER = ("app.application", "app.infrastructure.repositories")
+LAZY_MODULES = ("jose", "bcrypt", "PIL", "boto3", *SERVICE_LAYER)
+REFACTORED_ROUTER = "app.routers.ads_refactored"
+
+
+def _run(args: List[str]) -> subprocess.CompletedProcess:
+    # Jobs desligados: só o custo de montar a aplicação
+    env = dict(os.environ, BACKGROUND_JOBS_ENABLED="false")
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def import_times() -> List[Tuple[str, int, int]]:
+    """(módulo, próprio µs, acumulado µs) de cada import feito por `import app.main`"""
+    stderr = _run(["-X", "importtime", "-c", "import app.main"]).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def cold_start_ms(runs: int) -> List[float]:
+    return [float(_run(["-c", COLD_START_SNIPPET]).stdout.strip().splitlines()[-1]) for _ in range(runs)]
+
+
+def by_package(rows: List[Tuple[str, int, int]]) -> Dict[str, int]:
+    totals: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in rows:
+        totals[name.split(".")[0]] += self_us
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Perfil de importação e orçamento de cold start")
+    parser.add_argument("--budget-ms", type=float, default=float(os.environ.get("STARTUP_BUDGET_MS", DEFAULT_BUDGET_MS)))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = import_times()
+    print(f"Módulos mais caros (acumulado) - {len(rows)} módulos importados")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: -row[2])[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  (próprio {self_us / 1000:6.1f} ms)  {name}")
+
+    print("\nPor pacote (tempo próprio)")
+    for package, self_us in sorted(by_package(rows).items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {package}")
+
+    imported = {name for name, _, _ in rows}
+    lazy = LAZY_MODULES
+    if REFACTORED_ROUTER in imported:
+        # Router refatorado ligado: a camada de serviços entra no boot por ele
+        print("\nRouter /ads-refactored ligado (ADS_REFACTORED_ENABLED)")
+        lazy = tuple(module for module in LAZY_MODULES if module not in SERVICE_LAYER)
+    eager = [module for module in lazy if module in imported]
+    if eager:
+        print(f"\n⚠ Importados no boot (deveriam ser sob demanda): {', '.join(eager)}")
+
+    samples = cold_start_ms(args.runs)
+    median = statistics.median(samples)
+    print(f"\nCold start de app.main: mediana {median:.0f} ms (mín. {min(samples):.0f}, máx. {max(samples):.0f}, {args.runs} execuções)")
+    print(f"Orçamento: {args.budget_ms:.0f} ms")
+    if median > args.budget_ms or eager:
+        print("✗ Acima do orçamento" if median > args.budget_ms else "✗ Módulos pesados carregados no boot")
+        sys.exit(1)
+    print("✓ Dentro do orçamento")
+
+
+if __name__ == "__main__":
+    main()
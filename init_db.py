@@ -1,14 +1,17 @@
 """Script para inicializar o banco de dados com dados iniciais"""
 from app.db.database import engine, SessionLocal
-from app.db.models import Base, Category, User, Ad
+from app.db.models import Category, CategoryAdCount, User, Ad
+from app.db.migrations.runner import upgrade
 from app.core.security import get_password_hash
+from app.core.category_registry import bump_version
+from app.db.counters import record_listing_change
 import json
 
 def init_db():
-    """Cria as tabelas e insere dados iniciais"""
-    print("Criando tabelas...")
-    Base.metadata.create_all(bind=engine)
-    print("✓ Tabelas criadas com sucesso!")
+    """Aplica as migrações e insere dados iniciais"""
+    print("Aplicando migrações...")
+    applied = upgrade(engine)
+    print(f"✓ Banco atualizado ({len(applied)} migração(ões) aplicada(s))")
     
     db = SessionLocal()
     
@@ -27,7 +30,13 @@ def init_db():
             
             for category in categories:
                 db.add(category)
+            db.flush()
+            # Linha de contagem criada junto com a categoria (app.db.counters só a incrementa)
+            for category in categories:
+                db.add(CategoryAdCount(category_id=category.id, published_count=0))
             
+            # Avisa os workers em execução (registro de categorias em memória)
+            bump_version(db)
             db.commit()
             print(f"✓ {len(categories)} categorias criadas!")
         else:
@@ -92,6 +101,7 @@ def init_db():
                 
                 for ad in ads:
                     db.add(ad)
+                    record_listing_change(db, new_status=ad.status, new_category_id=ad.category_id)
                 
                 db.commit()
                 print(f"✓ {len(ads)} anúncios de exemplo criados!")
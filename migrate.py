@@ -0,0 +1,46 @@
+"""Script para aplicar as migrações do banco de dados
+
+Uso:
+    python migrate.py            # aplica as migrações pendentes
+    python migrate.py status     # lista aplicadas/pendentes e FKs sem índice
+    python migrate.py --to 0002  # aplica até a versão indicada
+"""
+import argparse
+import logging
+
+from app.db.database import engine
+from app.db.index_audit import audit_database
+from app.db.migrations.runner import applied_versions, discover, upgrade
+
+
+def status():
+    """Mostra o estado das migrações"""
+    applied = set(applied_versions(engine))
+    for migration in discover():
+        mark = "✓" if migration.version in applied else "·"
+        print(f"{mark} {migration.name} - {migration.description}")
+    missing = audit_database(engine)
+    for fk in missing:
+        print(f"⚠ Chave estrangeira sem índice: {fk}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aplica as migrações do banco de dados")
+    parser.add_argument("command", nargs="?", choices=["upgrade", "status"], default="upgrade")
+    parser.add_argument("--to", dest="target", help="Versão final (ex.: 0002)")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        status()
+        return
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    applied = upgrade(engine, target=args.target)
+    if applied:
+        print(f"✓ {len(applied)} migração(ões) aplicada(s)")
+    else:
+        print("✓ Banco já está atualizado")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 @echo off
 echo Iniciando Backend TemVagaAi...
 echo.
+py migrate.py
 py -m uvicorn app.main:app --reload --host 0.0.0.0 --port 8000
@@ -1,4 +1,5 @@
 #!/bin/bash
 echo "Iniciando Backend TemVagaAi..."
 echo ""
+python3 migrate.py
 python3 -m uvicorn app.main:app --reload --host 0.0.0.0 --port 8000